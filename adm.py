@@ -1,13 +1,153 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+import csv
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from history_stats import summarize_entries
+from profiles import count_profiles, local_profile, match_profiles, open_profile, profile_query, scan_profiles
+from query_engine import SORTS, cursor, make_query
+from tk_worker import TkScheduler, TkStorageWorker
+
+# Filas por página en los resultados de la consulta y al exportar
+PAGINA = 200
+PAGINA_EXPORTAR = 2000
+# Cada cuánto se actualizan las estadísticas mientras están a la vista (ms)
+REFRESCO_ESTADISTICAS = 60000
+
+# Hilo de consultas y trabajos repetidos del panel (existen mientras hay sesión abierta)
+worker = None
+scheduler = None
+
+# Prioridades del widget: (nombre, color de las barras)
+COLORES = {
+    "red": ("🔴 Alta", "#FF6B6B"),
+    "yellow": ("🟡 Media", "#FFD966"),
+    "blue": ("🔵 Informativa", "#66CCFF"),
+    "green": ("🟢 Normal", "#90EE90"),
+}
+
+
+def dibujar_barras(canvas, barras, ancho, alto):
+    """Barras apiladas: barras = [(etiqueta, [(valor, color), ...])]"""
+    maximo = max([sum(v for v, _ in partes) for _, partes in barras] + [1])
+    paso = ancho / max(len(barras), 1)
+    base = alto - 18
+    for i, (etiqueta, partes) in enumerate(barras):
+        x0, x1 = i * paso + paso * 0.2, (i + 1) * paso - paso * 0.2
+        y = base
+        for valor, color in partes:
+            h = (base - 14) * valor / maximo
+            if h > 0:
+                canvas.create_rectangle(x0, y - h, x1, y, fill=color, width=0)
+                y -= h
+        total = sum(v for v, _ in partes)
+        if total:
+            canvas.create_text((x0 + x1) / 2, y - 7, text=str(total), fill="white", font=("Segoe UI", 7))
+        canvas.create_text((x0 + x1) / 2, base + 9, text=etiqueta, fill="#99AAB5", font=("Segoe UI", 7))
+
+
+# ==========================
+# OPERACIONES EN SEGUNDO PLANO
+# ==========================
+# Corren en el hilo de TkStorageWorker como fn(storage, job, *args): nunca
+# tocan widgets, solo devuelven datos o informan el avance con job.progress
+
+def abrir(storage, perfil):
+    # El perfil de este equipo usa el almacenamiento del panel (se puede
+    # interrumpir); los exportados se abren solo para la operación
+    return storage if perfil.get("local") else open_profile(perfil)
+
+
+def cerrar(storage, abierto):
+    if abierto is not storage:
+        abierto.close()
+
+
+def buscar_perfiles(storage, job, carpeta):
+    return scan_profiles(carpeta, job.progress)
+
+
+def contar(storage, job, consulta, perfiles):
+    """[{"profile", "counts", "error"}]: con varios perfiles, en paralelo"""
+    if len(perfiles) != 1:
+        return count_profiles(perfiles, consulta, job.progress)
+    abierto = abrir(storage, perfiles[0])
+    try:
+        return [{"profile": perfiles[0], "counts": abierto.count_history(profile_query(consulta, perfiles[0])),
+                 "error": None}]
+    finally:
+        cerrar(storage, abierto)
+
+
+def leer_pagina(storage, job, consulta, despues, perfil):
+    abierto = abrir(storage, perfil)
+    try:
+        return abierto.query_history(consulta, limit=PAGINA, after=despues)
+    finally:
+        cerrar(storage, abierto)
+
+
+def exportar_csv(storage, job, consulta, perfiles, total, ruta):
+    """Escribe la consulta completa por perfil y por páginas; si se cancela
+    no queda archivo"""
+    temporal = ruta + ".tmp"
+    hechos = 0
+    try:
+        with open(temporal, "w", newline="", encoding="utf-8-sig") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["Usuario", "ID Usuario", "Fecha", "Prioridad", "Tarea", "Completada"])
+            for perfil in perfiles:
+                de_usuario = profile_query(consulta, perfil)
+                abierto = abrir(storage, perfil)
+                try:
+                    despues = None
+                    while True:
+                        filas = abierto.query_history(de_usuario, limit=PAGINA_EXPORTAR, after=despues)
+                        if not filas:
+                            break
+                        for fecha, tarea in filas:
+                            escritor.writerow([perfil["user_name"], perfil["user_id"], fecha,
+                                               COLORES.get(tarea["color"], (tarea.get("color_name"),))[0],
+                                               tarea["text"], tarea.get("completed") or ""])
+                        hechos += len(filas)
+                        despues = cursor(de_usuario, *filas[-1])
+                        job.progress(hechos, total)
+                finally:
+                    cerrar(storage, abierto)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return hechos
+
+
+def leer_estadisticas(storage, job):
+    return storage.history_stats()
+
+
+def recalcular_estadisticas(storage, job):
+    # El panel abre la base en solo lectura: recuenta sin tocar los contadores
+    historial = storage.history_range("", "9999-12-31")
+    job.check()
+    return summarize_entries(historial)
+
 
 # ==========================
 # FUNCIÓN PRINCIPAL DEL PANEL
 # ==========================
 def abrir_panel_admin():
+    global worker, scheduler
     for widget in root.winfo_children():
         widget.destroy()
+    # Los after repetidos se cancelan al cambiar de vista o al cerrar sesión
+    scheduler = TkScheduler(root)
+    # Las consultas corren fuera del mainloop: el reloj y la ventana no se
+    # congelan. El panel solo lee los datos de este equipo: no crea la
+    # carpeta, la base ni perfil.json, ni migra el JSON (eso queda para el widget)
+    worker = TkStorageWorker(scheduler, lambda: open_profile(local_profile()), owner="sesion")
 
     root.title("Panel de Administración")
     root.geometry("900x500")
@@ -23,11 +163,11 @@ def abrir_panel_admin():
     def actualizar_hora():
         hora_actual = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         lbl_fecha.config(text=hora_actual)
-        lbl_fecha.after(1000, actualizar_hora)
 
     lbl_fecha = tk.Label(top_frame, bg="#23272A", fg="#99AAB5", font=("Segoe UI", 10))
     lbl_fecha.place(x=650, y=20)
     actualizar_hora()
+    scheduler.every(1000, actualizar_hora, owner="sesion")
 
     btn_logout = ttk.Button(top_frame, text="Cerrar sesión", command=volver_a_login)
     btn_logout.place(x=780, y=18)
@@ -38,81 +178,588 @@ def abrir_panel_admin():
 
     main_frame = tk.Frame(root, bg="#40444B")
     main_frame.pack(fill="both", expand=True)
+    main_frame.grid_rowconfigure(0, weight=1)
+    main_frame.grid_columnconfigure(0, weight=1)
 
     # ======== FUNCIONES DE CONTENIDO ========
+    # Cada vista se construye la primera vez que se abre, en su propio frame
+    # dentro de main_frame. Después solo se trae al frente con tkraise: su
+    # estado (formulario, resultados, operaciones en curso) se conserva.
+    # Devuelven lo que hay que hacer cada vez que se muestran (o None).
 
-    def mostrar_bienvenida():
-        for w in main_frame.winfo_children():
-            w.destroy()
+    def construir_bienvenida(vista):
         lbl_bienvenida = tk.Label(
-            main_frame,
+            vista,
             text="Bienvenido al panel del administrador 👋",
             bg="#40444B", fg="white", font=("Segoe UI", 14, "bold")
         )
         lbl_bienvenida.pack(pady=40)
 
-    def mostrar_consulta_tareas():
-        for w in main_frame.winfo_children():
-            w.destroy()
-
-        lbl_titulo = tk.Label(main_frame, text="📋 Consulta de Tareas", bg="#40444B", fg="white", font=("Segoe UI", 13, "bold"))
-        lbl_titulo.pack(pady=20)
+    def construir_consulta(vista):
+        lbl_titulo = tk.Label(vista, text="📋 Consulta de Tareas", bg="#40444B", fg="white", font=("Segoe UI", 13, "bold"))
+        lbl_titulo.pack(pady=(12, 4))
 
-        frame_form = tk.Frame(main_frame, bg="#40444B")
-        frame_form.pack(pady=10)
+        frame_form = tk.Frame(vista, bg="#40444B")
+        frame_form.pack(pady=4)
 
         # Tipo de consulta
         lbl_tipo = tk.Label(frame_form, text="Tipo de consulta:", bg="#40444B", fg="white", font=("Segoe UI", 11))
-        lbl_tipo.grid(row=0, column=0, sticky="e", padx=5, pady=5)
+        lbl_tipo.grid(row=0, column=0, sticky="e", padx=5, pady=3)
 
-        combo_tipo = ttk.Combobox(frame_form, values=["Usuario", "ID Usuario", "Nombre Usuario"], width=25)
-        combo_tipo.grid(row=0, column=1, padx=5, pady=5)
+        tipos = {"Usuario": "user", "ID Usuario": "id", "Nombre Usuario": "name"}
+        combo_tipo = ttk.Combobox(frame_form, values=list(tipos), width=25, state="readonly")
+        combo_tipo.grid(row=0, column=1, padx=5, pady=3)
         combo_tipo.set("Usuario")
 
+        # Usuario buscado (vacío: todos los de la carpeta)
+        lbl_usuario = tk.Label(frame_form, text="Usuario:", bg="#40444B", fg="white", font=("Segoe UI", 11))
+        lbl_usuario.grid(row=1, column=0, sticky="e", padx=5, pady=3)
+
+        entry_usuario = ttk.Entry(frame_form, width=28)
+        entry_usuario.grid(row=1, column=1, padx=5, pady=3)
+
+        # Perfiles: los de este equipo o los exportados a una carpeta
+        lbl_perfiles = tk.Label(frame_form, text="Perfiles:", bg="#40444B", fg="white", font=("Segoe UI", 11))
+        lbl_perfiles.grid(row=1, column=2, sticky="e", padx=5, pady=3)
+
+        frame_perfiles = tk.Frame(frame_form, bg="#40444B")
+        frame_perfiles.grid(row=1, column=3, sticky="w", padx=5, pady=3)
+        lbl_origen = tk.Label(frame_perfiles, text="Este equipo", bg="#40444B", fg="#99AAB5", font=("Segoe UI", 10))
+        lbl_origen.pack(side="left")
+
         # Fecha desde
         lbl_desde = tk.Label(frame_form, text="Fecha desde:", bg="#40444B", fg="white", font=("Segoe UI", 11))
-        lbl_desde.grid(row=1, column=0, sticky="e", padx=5, pady=5)
+        lbl_desde.grid(row=2, column=0, sticky="e", padx=5, pady=3)
 
         entry_desde = ttk.Entry(frame_form, width=28)
-        entry_desde.grid(row=1, column=1, padx=5, pady=5)
+        entry_desde.grid(row=2, column=1, padx=5, pady=3)
         entry_desde.insert(0, "dd/mm/aaaa")
 
         # Fecha hasta
         lbl_hasta = tk.Label(frame_form, text="Fecha hasta:", bg="#40444B", fg="white", font=("Segoe UI", 11))
-        lbl_hasta.grid(row=2, column=0, sticky="e", padx=5, pady=5)
+        lbl_hasta.grid(row=2, column=2, sticky="e", padx=5, pady=3)
 
         entry_hasta = ttk.Entry(frame_form, width=28)
-        entry_hasta.grid(row=2, column=1, padx=5, pady=5)
+        entry_hasta.grid(row=2, column=3, padx=5, pady=3)
         entry_hasta.insert(0, "dd/mm/aaaa")
 
-        # Botón consultar
-        btn_consultar = ttk.Button(frame_form, text="Consultar", command=lambda: messagebox.showinfo("Consulta", "Consulta realizada correctamente"))
-        btn_consultar.grid(row=3, column=0, columnspan=2, pady=15)
-
-    def mostrar_prueba2():
-        for w in main_frame.winfo_children():
-            w.destroy()
-        lbl = tk.Label(main_frame, text="📊 Aquí irá el módulo 2", bg="#40444B", fg="white", font=("Segoe UI", 13))
+        # Prioridad
+        lbl_prioridad = tk.Label(frame_form, text="Prioridad:", bg="#40444B", fg="white", font=("Segoe UI", 11))
+        lbl_prioridad.grid(row=0, column=2, sticky="e", padx=5, pady=3)
+
+        prioridades = {"Todas": None, **{nombre: color for color, (nombre, _) in COLORES.items()}}
+        combo_prioridad = ttk.Combobox(frame_form, values=list(prioridades), width=25, state="readonly")
+        combo_prioridad.grid(row=0, column=3, padx=5, pady=3)
+        combo_prioridad.set("Todas")
+
+        # Texto (sin distinguir mayúsculas ni tildes)
+        lbl_texto = tk.Label(frame_form, text="Texto:", bg="#40444B", fg="white", font=("Segoe UI", 11))
+        lbl_texto.grid(row=3, column=0, sticky="e", padx=5, pady=3)
+
+        entry_texto = ttk.Entry(frame_form, width=28)
+        entry_texto.grid(row=3, column=1, padx=5, pady=3)
+
+        lbl_resultado = tk.Label(vista, text="", bg="#40444B", fg="#99AAB5", font=("Segoe UI", 10))
+
+        # Avance de la operación en curso (corre en el hilo del panel)
+        frame_progreso = tk.Frame(vista, bg="#40444B")
+        barra = ttk.Progressbar(frame_progreso, length=220, mode="indeterminate")
+        barra.pack(side="left", padx=5)
+        lbl_progreso = tk.Label(frame_progreso, text="", bg="#40444B", fg="#99AAB5", font=("Segoe UI", 9))
+        lbl_progreso.pack(side="left", padx=5)
+        btn_cancelar = ttk.Button(frame_progreso, text="Cancelar")
+        btn_cancelar.pack(side="left", padx=5)
+
+        # Resultados: Treeview paginado por clave. Solo hay en memoria las
+        # páginas ya vistas; la siguiente se pide al acercarse al final
+        frame_tabla = tk.Frame(vista, bg="#40444B")
+        columnas = {"date": ("Fecha", 100), "color": ("Prioridad", 120), "text": ("Tarea", 360), "hora": ("Hora", 70)}
+        tabla = ttk.Treeview(frame_tabla, columns=list(columnas), show="headings", selectmode="browse")
+        scroll = ttk.Scrollbar(frame_tabla, orient="vertical", command=tabla.yview)
+        for color, (_, hexa) in COLORES.items():
+            tabla.tag_configure(color, foreground=hexa)
+
+        # Con varios usuarios: una fila por usuario (doble clic: sus tareas)
+        columnas_usuarios = {"user_name": ("Usuario", 160), "user_id": ("ID Usuario", 150),
+                             **{c: (nombre, 90) for c, (nombre, _) in COLORES.items()}, "total": ("Total", 70)}
+        tabla_usuarios = ttk.Treeview(frame_tabla, columns=list(columnas_usuarios), show="headings", selectmode="browse")
+        tabla_usuarios.tag_configure("error", foreground="#FF6B6B")
+
+        estado = {"consulta": None, "cursor": None, "agotado": True, "pagina": None, "tarea": None,
+                  "perfiles": [local_profile()], "base": None, "resultados": [], "perfil": None, "orden_usuarios": ("total", True)}
+
+        def empezar(texto, job):
+            estado["tarea"] = job
+            lbl_progreso.config(text=texto)
+            barra.config(mode="indeterminate", value=0)
+            barra.start(15)
+            btn_cancelar.config(command=job.cancel)
+            frame_progreso.pack(before=frame_tabla, pady=(0, 4))
+
+        def avanzar(hechos, total):
+            if total:
+                barra.stop()
+                barra.config(mode="determinate", maximum=total, value=hechos)
+                lbl_progreso.config(text=f"{hechos} de {total}")
+
+        def terminar():
+            estado["tarea"] = None
+            barra.stop()
+            frame_progreso.pack_forget()
+
+        def fallo(titulo, error):
+            terminar()
+            messagebox.showerror(titulo, f"No se pudo completar: {error}")
+
+        def agregar_filas(consulta, filas):
+            if consulta is not estado["consulta"]:
+                return
+            for fecha, tarea in filas:
+                completada = tarea.get("completed") or ""
+                try:
+                    fecha = datetime.strptime(fecha, "%Y-%m-%d").strftime("%d/%m/%Y")
+                except (TypeError, ValueError):
+                    # Una fecha mal guardada se muestra tal cual
+                    pass
+                tabla.insert("", "end", values=(
+                    fecha,
+                    COLORES.get(tarea["color"], (tarea.get("color_name") or "",))[0],
+                    tarea["text"],
+                    completada[11:16]), tags=(tarea["color"],))
+            if filas:
+                estado["cursor"] = cursor(consulta, *filas[-1])
+            estado["agotado"] = len(filas) < PAGINA
+
+        def soltar_pagina(job):
+            # Una página reemplazada (por ejemplo al reordenar) ya no cuenta
+            if estado["pagina"] is not job:
+                return False
+            estado["pagina"] = None
+            return True
+
+        def cargar_pagina():
+            consulta = estado["consulta"]
+            if consulta is None or estado["agotado"] or estado["pagina"] is not None:
+                return
+
+            def listo(filas):
+                if soltar_pagina(job):
+                    agregar_filas(consulta, filas)
+
+            def error(e):
+                if soltar_pagina(job):
+                    fallo("Consulta", e)
+
+            job = worker.submit(leer_pagina, consulta, estado["cursor"], estado["perfil"], on_done=listo,
+                                on_error=error, on_cancel=lambda: soltar_pagina(job))
+            estado["pagina"] = job
+
+        def al_desplazar(primero, ultimo):
+            scroll.set(primero, ultimo)
+            # Cerca del final: la página siguiente
+            if float(ultimo) > 0.9:
+                cargar_pagina()
+
+        def ver_tabla(actual):
+            for t in (tabla, tabla_usuarios):
+                if t is not actual:
+                    t.pack_forget()
+            scroll.config(command=actual.yview)
+            actual.pack(side="left", fill="both", expand=True, before=scroll)
+
+        def ordenar(columna):
+            consulta = estado["consulta"]
+            if consulta is None or columna not in SORTS:
+                return
+            # El orden lo resuelve la consulta (ORDER BY + cursor), no Python
+            descendente = not consulta["descending"] if consulta["order_by"] == columna else False
+            estado["consulta"] = dict(consulta, order_by=columna, descending=descendente)
+            mostrar_resultados()
+
+        def mostrar_resultados():
+            consulta = estado["consulta"]
+            ver_tabla(tabla)
+            btn_usuarios.pack_forget()
+            if len(estado["resultados"]) > 1:
+                btn_usuarios.pack(side="left", padx=5)
+            for columna, (titulo, _) in columnas.items():
+                flecha = (" ▼" if consulta["descending"] else " ▲") if consulta["order_by"] == columna else ""
+                tabla.heading(columna, text=titulo + flecha)
+            tabla.delete(*tabla.get_children())
+            if estado["pagina"] is not None:
+                estado["pagina"].cancel()
+                estado["pagina"] = None
+            estado["cursor"] = None
+            estado["agotado"] = False
+            tabla.yview_moveto(0)
+            cargar_pagina()
+
+        def mostrar_usuarios():
+            # Los totales ya están en memoria: ordenar es ordenar la lista
+            columna, descendente = estado["orden_usuarios"]
+
+            def clave(r):
+                if columna == "total":
+                    return sum(r["counts"].values())
+                if columna in COLORES:
+                    return r["counts"].get(columna, 0)
+                return (r["profile"][columna] or "").casefold()
+
+            for c, (titulo, _) in columnas_usuarios.items():
+                tabla_usuarios.heading(c, text=titulo + ((" ▼" if descendente else " ▲") if c == columna else ""))
+            tabla_usuarios.delete(*tabla_usuarios.get_children())
+            if estado["pagina"] is not None:
+                estado["pagina"].cancel()
+                estado["pagina"] = None
+            for i, r in sorted(enumerate(estado["resultados"]), key=lambda x: clave(x[1]), reverse=descendente):
+                perfil = r["profile"]
+                if r["error"]:
+                    valores = (perfil["user_name"], perfil["user_id"], "⚠ " + r["error"], "", "", "", "")
+                else:
+                    valores = (perfil["user_name"], perfil["user_id"], *(r["counts"].get(c, 0) for c in COLORES),
+                               sum(r["counts"].values()))
+                tabla_usuarios.insert("", "end", iid=str(i), values=valores, tags=("error",) if r["error"] else ())
+            estado["consulta"] = None
+            btn_usuarios.pack_forget()
+            ver_tabla(tabla_usuarios)
+
+        def ordenar_usuarios(columna):
+            anterior, descendente = estado["orden_usuarios"]
+            estado["orden_usuarios"] = (columna, not descendente if anterior == columna else columna == "total")
+            mostrar_usuarios()
+
+        def ver_usuario(evento=None):
+            seleccion = tabla_usuarios.selection()
+            if not seleccion:
+                return
+            resultado = estado["resultados"][int(seleccion[0])]
+            if resultado["error"]:
+                return
+            mostrar_tareas(resultado["profile"])
+
+        def mostrar_tareas(perfil):
+            # Solo se leen las tareas de ese usuario, en su propio almacenamiento
+            estado["perfil"] = perfil
+            estado["consulta"] = profile_query(estado["base"], perfil)
+            mostrar_resultados()
+
+        for columna, (titulo, ancho) in columnas.items():
+            tabla.heading(columna, text=titulo, command=lambda c=columna: ordenar(c))
+            tabla.column(columna, width=ancho, stretch=columna == "text")
+        tabla.configure(yscrollcommand=al_desplazar)
+        for columna, (titulo, ancho) in columnas_usuarios.items():
+            tabla_usuarios.heading(columna, text=titulo, command=lambda c=columna: ordenar_usuarios(c))
+            tabla_usuarios.column(columna, width=ancho, stretch=columna == "user_name")
+        tabla_usuarios.configure(yscrollcommand=scroll.set)
+        tabla_usuarios.bind("<Double-1>", ver_usuario)
+        tabla_usuarios.bind("<Return>", ver_usuario)
+        scroll.pack(side="right", fill="y")
+        ver_tabla(tabla)
+
+        def elegir_carpeta():
+            if estado["tarea"] is not None:
+                return
+            carpeta = filedialog.askdirectory(title="Carpeta de perfiles exportados")
+            if not carpeta:
+                return
+
+            def listo(perfiles):
+                if estado["tarea"] is not job:
+                    return
+                terminar()
+                if not perfiles:
+                    messagebox.showwarning("Perfiles", "La carpeta no tiene perfiles exportados.")
+                    return
+                estado["perfiles"] = perfiles
+                lbl_origen.config(text=f"{os.path.basename(carpeta) or carpeta} ({len(perfiles)} perfiles)")
+                btn_local.pack(side="left", padx=(5, 0))
+
+            def cancelada():
+                if estado["tarea"] is job:
+                    terminar()
+
+            def error(e):
+                if estado["tarea"] is job:
+                    fallo("Perfiles", e)
+
+            job = worker.submit(buscar_perfiles, carpeta, on_done=listo, on_cancel=cancelada,
+                                on_progress=avanzar, on_error=error)
+            empezar("Buscando perfiles...", job)
+
+        def usar_este_equipo():
+            estado["perfiles"] = [local_profile()]
+            lbl_origen.config(text="Este equipo")
+            btn_local.pack_forget()
+
+        btn_carpeta = ttk.Button(frame_perfiles, text="Carpeta...", command=elegir_carpeta)
+        btn_carpeta.pack(side="left", padx=(5, 0))
+        btn_local = ttk.Button(frame_perfiles, text="Este equipo", command=usar_este_equipo)
+
+        def leer_formulario():
+            try:
+                desde = datetime.strptime(entry_desde.get().strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+                hasta = datetime.strptime(entry_hasta.get().strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+            except ValueError:
+                messagebox.showwarning("Consulta", "Ingrese fechas válidas (dd/mm/aaaa).")
+                return None
+            if desde > hasta:
+                messagebox.showwarning("Consulta", "La fecha desde debe ser anterior a la fecha hasta.")
+                return None
+            color = prioridades.get(combo_prioridad.get())
+            anterior = estado["consulta"] or estado["base"] or make_query()
+            return make_query(desde, hasta, [color] if color else None, entry_texto.get(),
+                              anterior["order_by"], anterior["descending"])
+
+        def consultar():
+            consulta = leer_formulario()
+            if consulta is None:
+                return
+            perfiles = match_profiles(estado["perfiles"], tipos[combo_tipo.get()], entry_usuario.get())
+            if not perfiles:
+                messagebox.showinfo("Consulta", "Ningún usuario coincide con la búsqueda.")
+                return
+            # Una consulta nueva reemplaza a la que esté corriendo
+            if estado["tarea"] is not None:
+                estado["tarea"].cancel()
+            inicio = time.perf_counter()
+
+            def listo(resultados):
+                if estado["tarea"] is not job:
+                    return
+                terminar()
+                ms = (time.perf_counter() - inicio) * 1000
+                conteo = {}
+                for r in resultados:
+                    for c, n in r["counts"].items():
+                        conteo[c] = conteo.get(c, 0) + n
+                detalle = " · ".join(f"{COLORES[c][0]} {conteo[c]}" for c in COLORES if conteo.get(c))
+                usuarios = f" de {len(resultados)} usuarios" if len(resultados) > 1 else ""
+                errores = sum(1 for r in resultados if r["error"])
+                lbl_resultado.config(
+                    text=f"{sum(conteo.values())} tareas completadas{usuarios} ({ms:.0f} ms)"
+                         + (f"  ·  {detalle}" if detalle else "")
+                         + (f"  ·  ⚠ {errores} perfiles con error" if errores else ""))
+                estado["base"] = consulta
+                estado["resultados"] = resultados
+                if len(resultados) == 1:
+                    mostrar_tareas(resultados[0]["profile"])
+                else:
+                    mostrar_usuarios()
+
+            def cancelada():
+                # Reemplazada por una consulta nueva: esa sigue mostrando su avance
+                if estado["tarea"] is job:
+                    terminar()
+                    lbl_resultado.config(text="Consulta cancelada")
+
+            def error(e):
+                if estado["tarea"] is job:
+                    fallo("Consulta", e)
+
+            # Cada perfil es un almacenamiento aparte y dentro de él solo se
+            # leen las tareas de su usuario; varios perfiles se cuentan en paralelo
+            job = worker.submit(contar, consulta, perfiles, on_done=listo, on_cancel=cancelada,
+                                on_progress=avanzar, on_error=error)
+            empezar("Consultando...", job)
+
+        def exportar():
+            if not estado["resultados"]:
+                messagebox.showinfo("Exportar", "Primero realice una consulta.")
+                return
+            if estado["tarea"] is not None:
+                return
+            ruta = filedialog.asksaveasfilename(title="Exportar consulta", defaultextension=".csv",
+                                                filetypes=[("CSV", "*.csv")], initialfile="tareas.csv")
+            if not ruta:
+                return
+            # Las tareas del usuario a la vista, o las de todos los de la consulta
+            if estado["consulta"] is not None:
+                consulta = estado["consulta"]
+                resultados = [r for r in estado["resultados"] if r["profile"] is estado["perfil"]]
+            else:
+                consulta = estado["base"]
+                resultados = [r for r in estado["resultados"] if not r["error"]]
+            total = sum(sum(r["counts"].values()) for r in resultados)
+
+            def listo(filas):
+                if estado["tarea"] is job:
+                    terminar()
+                    messagebox.showinfo("Exportar", f"Exportadas {filas} tareas a {ruta}")
+
+            def cancelada():
+                if estado["tarea"] is job:
+                    terminar()
+                    lbl_resultado.config(text="Exportación cancelada")
+
+            def error(e):
+                if estado["tarea"] is job:
+                    fallo("Exportar", e)
+
+            job = worker.submit(exportar_csv, consulta, [r["profile"] for r in resultados], total, ruta,
+                                on_done=listo, on_cancel=cancelada, on_progress=avanzar, on_error=error)
+            empezar("Exportando...", job)
+
+        # Botones
+        frame_botones = tk.Frame(frame_form, bg="#40444B")
+        frame_botones.grid(row=3, column=2, columnspan=2, pady=3)
+        btn_consultar = ttk.Button(frame_botones, text="Consultar", command=consultar)
+        btn_consultar.pack(side="left", padx=5)
+        btn_exportar = ttk.Button(frame_botones, text="Exportar CSV", command=exportar)
+        btn_exportar.pack(side="left", padx=5)
+        btn_usuarios = ttk.Button(frame_botones, text="← Usuarios", command=mostrar_usuarios)
+        entry_texto.bind("<Return>", lambda e: consultar())
+        entry_usuario.bind("<Return>", lambda e: consultar())
+        lbl_resultado.pack(pady=(2, 4))
+        frame_tabla.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def construir_estadisticas(vista):
+        lbl_titulo = tk.Label(vista, text="📊 Estadísticas", bg="#40444B", fg="white", font=("Segoe UI", 13, "bold"))
+        lbl_titulo.pack(pady=(15, 5))
+
+        frame_contenido = tk.Frame(vista, bg="#40444B")
+        frame_contenido.pack(fill="both", expand=True)
+        estado = {"tarea": None, "dibujada": False}
+
+        def cargando(texto, job):
+            for w in frame_contenido.winfo_children():
+                w.destroy()
+            tk.Label(frame_contenido, text=texto, bg="#40444B", fg="#99AAB5", font=("Segoe UI", 10)).pack(pady=(40, 8))
+            barra = ttk.Progressbar(frame_contenido, length=220, mode="indeterminate")
+            barra.pack()
+            barra.start(15)
+            ttk.Button(frame_contenido, text="Cancelar", command=job.cancel).pack(pady=8)
+
+        def fallo(error):
+            for w in frame_contenido.winfo_children():
+                w.destroy()
+            tk.Label(frame_contenido, text=f"No se pudieron leer las estadísticas: {error}", bg="#40444B",
+                     fg="#FF6B6B", font=("Segoe UI", 10)).pack(pady=40)
+
+        def dibujar(stats):
+            estado["dibujada"] = True
+            for w in frame_contenido.winfo_children():
+                w.destroy()
+
+            # Resumen
+            frame_resumen = tk.Frame(frame_contenido, bg="#40444B")
+            frame_resumen.pack(pady=5)
+            resumen = [
+                ("Hoy", stats["today"]),
+                ("Esta semana", stats["this_week"]),
+                ("Este mes", stats["this_month"]),
+                ("Total", stats["total"]),
+                ("Racha actual", f"{stats['streak']} días"),
+                ("Mejor racha", f"{stats['longest_streak']} días"),
+            ]
+            for col, (texto, valor) in enumerate(resumen):
+                tarjeta = tk.Frame(frame_resumen, bg="#2C2F33", padx=12, pady=6)
+                tarjeta.grid(row=0, column=col, padx=4)
+                tk.Label(tarjeta, text=valor, bg="#2C2F33", fg="white", font=("Segoe UI", 13, "bold")).pack()
+                tk.Label(tarjeta, text=texto, bg="#2C2F33", fg="#99AAB5", font=("Segoe UI", 9)).pack()
+
+            # Últimos 14 días por prioridad
+            hoy = date.today()
+            dias = [(hoy - timedelta(days=i)).isoformat() for i in reversed(range(14))]
+            barras = [(f"{d[8:10]}/{d[5:7]}", [(stats["days"].get(d, {}).get(c, 0), COLORES[c][1]) for c in COLORES])
+                      for d in dias]
+            canvas_dias = tk.Canvas(frame_contenido, width=680, height=150, bg="#2C2F33", highlightthickness=0)
+            canvas_dias.pack(pady=8)
+            dibujar_barras(canvas_dias, barras, 680, 150)
+
+            frame_inferior = tk.Frame(frame_contenido, bg="#40444B")
+            frame_inferior.pack()
+
+            frame_colores = tk.Frame(frame_inferior, bg="#40444B")
+            frame_colores.grid(row=0, column=0, padx=(0, 10), sticky="n")
+            for color, (nombre, hexa) in COLORES.items():
+                tk.Label(frame_colores, text=f"{nombre}: {stats['colors'].get(color, 0)}", bg="#40444B",
+                         fg=hexa, font=("Segoe UI", 10)).pack(anchor="w")
+
+            for col, (titulo, filas, etiqueta) in enumerate([
+                    ("Semanas", stats["weeks"], lambda k: k[5:]),
+                    ("Meses", stats["months"], lambda k: f"{k[5:7]}/{k[2:4]}")], start=1):
+                marco = tk.Frame(frame_inferior, bg="#40444B")
+                marco.grid(row=0, column=col, padx=5)
+                tk.Label(marco, text=titulo, bg="#40444B", fg="#99AAB5", font=("Segoe UI", 9)).pack()
+                canvas = tk.Canvas(marco, width=260, height=100, bg="#2C2F33", highlightthickness=0)
+                canvas.pack()
+                dibujar_barras(canvas, [(etiqueta(k), [(n, "#7289DA")]) for k, n in filas], 260, 100)
+
+            btn_recalcular = ttk.Button(frame_contenido, text="Recalcular", command=recalcular)
+            btn_recalcular.pack(pady=8)
+
+        def enviar(fn, texto, al_cancelar):
+            def al_terminar(despues):
+                def callback(*args):
+                    estado["tarea"] = None
+                    despues(*args)
+                return callback
+
+            estado["tarea"] = worker.submit(fn, on_done=al_terminar(dibujar), on_error=al_terminar(fallo),
+                                            on_cancel=al_terminar(al_cancelar))
+            # Sin texto (actualización periódica) queda lo dibujado hasta tener el resultado
+            if texto:
+                cargando(texto, estado["tarea"])
+
+        def cargar(texto="Cargando estadísticas..."):
+            # Solo se leen los contadores pre-agregados, no el historial
+            if estado["tarea"] is None:
+                enviar(leer_estadisticas, texto, lambda: fallo("cancelado"))
+
+        def recalcular():
+            if estado["tarea"] is not None:
+                return
+            if not messagebox.askyesno("Estadísticas", "¿Recalcular las estadísticas desde todo el historial?"):
+                return
+            # Si se cancela se vuelven a leer los contadores
+            enviar(recalcular_estadisticas, "Recalculando desde el historial...", cargar)
+
+        def al_mostrar():
+            # Se actualiza al volver a la vista y cada REFRESCO_ESTADISTICAS
+            # mientras se ve; al salir, mostrar() cancela la repetición
+            cargar(None if estado["dibujada"] else "Cargando estadísticas...")
+            scheduler.every(REFRESCO_ESTADISTICAS, lambda: cargar(None), owner="estadisticas")
+
+        return al_mostrar
+
+    def construir_prueba3(vista):
+        lbl = tk.Label(vista, text="⚙️ Configuración (en desarrollo)", bg="#40444B", fg="white", font=("Segoe UI", 13))
         lbl.pack(pady=40)
 
-    def mostrar_prueba3():
-        for w in main_frame.winfo_children():
-            w.destroy()
-        lbl = tk.Label(main_frame, text="⚙️ Configuración (en desarrollo)", bg="#40444B", fg="white", font=("Segoe UI", 13))
-        lbl.pack(pady=40)
+    constructores = {
+        "bienvenida": construir_bienvenida,
+        "consulta": construir_consulta,
+        "estadisticas": construir_estadisticas,
+        "prueba3": construir_prueba3,
+    }
+    vistas = {}
+    actual = {"vista": None}
+
+    def mostrar(nombre):
+        # Los after repetidos de la vista anterior no siguen corriendo ocultos
+        scheduler.cancel_owner(actual["vista"])
+        if nombre not in vistas:
+            vista = tk.Frame(main_frame, bg="#40444B")
+            vista.grid(row=0, column=0, sticky="nsew")
+            vistas[nombre] = (vista, constructores[nombre](vista))
+        vista, al_mostrar = vistas[nombre]
+        vista.tkraise()
+        actual["vista"] = nombre
+        if al_mostrar is not None:
+            al_mostrar()
 
     # ======== BOTONES DEL MENÚ ========
     menu_items = [
-        ("Consulta tareas", mostrar_consulta_tareas),
-        ("Prueba 2", mostrar_prueba2),
-        ("Prueba 3", mostrar_prueba3)
+        ("Consulta tareas", "consulta"),
+        ("Estadísticas", "estadisticas"),
+        ("Prueba 3", "prueba3")
     ]
 
-    for texto, funcion in menu_items:
-        btn = ttk.Button(side_frame, text=texto, command=funcion)
+    for texto, nombre in menu_items:
+        btn = ttk.Button(side_frame, text=texto, command=lambda n=nombre: mostrar(n))
         btn.pack(fill="x", padx=10, pady=8)
 
-    mostrar_bienvenida()
+    mostrar("bienvenida")
 
 
 # ==========================
@@ -128,11 +775,27 @@ def verificar_codigo():
 
 
 def volver_a_login():
+    global worker, scheduler
+    # Nada de la sesión sigue corriendo: ni el reloj ni las consultas
+    if scheduler is not None:
+        scheduler.cancel_all()
+        scheduler = None
+    if worker is not None:
+        worker.shutdown()
+        worker = None
     for widget in root.winfo_children():
         widget.destroy()
     crear_login()
 
 
+def cerrar_aplicacion():
+    if scheduler is not None:
+        scheduler.cancel_all()
+    if worker is not None:
+        worker.shutdown()
+    root.destroy()
+
+
 def crear_login():
     root.title("Login Administrador")
     root.geometry("400x250")
@@ -161,6 +824,13 @@ style = ttk.Style()
 style.theme_use("clam")
 style.configure("TButton", background="#7289DA", foreground="white", font=("Segoe UI", 10, "bold"))
 style.map("TButton", background=[("active", "#5B6EAE")])
+style.configure("Treeview", background="#2C2F33", fieldbackground="#2C2F33", foreground="white",
+                borderwidth=0, font=("Segoe UI", 10), rowheight=22)
+style.configure("Treeview.Heading", background="#23272A", foreground="white", font=("Segoe UI", 10, "bold"))
+style.map("Treeview.Heading", background=[("active", "#36393F")])
+style.map("Treeview", background=[("selected", "#5B6EAE")])
+
+root.protocol("WM_DELETE_WINDOW", cerrar_aplicacion)
 
 crear_login()
 root.mainloop()
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+from PySide6.QtCore import QObject, QTimer, QDateTime, Qt, Signal
+
+
+# --------------------------
+# Planificador de alarmas
+# --------------------------
+class AlarmScheduler(QObject):
+    """Mantiene las alarmas pendientes en un min-heap ordenado por hora.
+
+    Solo existe un QTimer single-shot armado para la próxima alarma, así que
+    el widget no se despierta entre alarmas. Cuando vence, se disparan en la
+    misma pasada todas las alarmas cuya hora ya pasó.
+    """
+    # object y no list: list pasa por QVariantList y el slot recibiría copias
+    # de los dicts, que WriteBehind y el widget ya no reconocerían como suyos
+    alarms_due = Signal(object)
+
+    # El intervalo de QTimer es un int de 32 bits; se re-arma como máximo cada día
+    MAX_INTERVAL_MS = 24 * 60 * 60 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._heap = []        # entradas [due_ms, seq, alarm, activa]
+        self._entries = {}     # id(alarm) -> entrada, para borrado perezoso
+        self._seq = itertools.count()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._fire_due)
+
+    @staticmethod
+    def due_msecs(alarm):
+        """Convierte reminder_time (ISO) a milisegundos epoch, o None si no es válido"""
+        dt = QDateTime.fromString(alarm.get("reminder_time") or "", Qt.ISODate)
+        if not dt.isValid():
+            return None
+        return dt.toMSecsSinceEpoch()
+
+    def add(self, alarm):
+        due = self.due_msecs(alarm)
+        if due is None:
+            return False
+        # Volver a agregarla la reprograma: la entrada anterior ya no suena
+        old = self._entries.get(id(alarm))
+        if old is not None:
+            old[3] = False
+        entry = [due, next(self._seq), alarm, True]
+        self._entries[id(alarm)] = entry
+        heapq.heappush(self._heap, entry)
+        # Solo hace falta re-armar si la nueva alarma es ahora la primera
+        if self._heap[0] is entry:
+            self._arm()
+        return True
+
+    def remove(self, alarm):
+        entry = self._entries.pop(id(alarm), None)
+        if entry is None:
+            return False
+        entry[3] = False
+        self._arm()
+        return True
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._timer.stop()
+
+    def pending(self):
+        """Alarmas pendientes en orden de vencimiento"""
+        return [entry[2] for entry in sorted(self._entries.values())]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reschedule(self):
+        """Re-arma el timer (por ejemplo tras un cambio de hora del sistema)"""
+        self._arm()
+
+    def _arm(self):
+        # Descartar entradas canceladas que quedaron en la cima
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._timer.stop()
+            return
+        delay = self._heap[0][0] - QDateTime.currentMSecsSinceEpoch()
+        self._timer.start(max(0, min(delay, self.MAX_INTERVAL_MS)))
+
+    def _fire_due(self):
+        now = QDateTime.currentMSecsSinceEpoch()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if entry[3]:
+                self._entries.pop(id(entry[2]), None)
+                due.append(entry[2])
+        self._arm()
+        if due:
+            self.alarms_due.emit(due)
@@ -0,0 +1,89 @@
+# bench_profiles.py
+# Carpeta de perfiles exportados: buscar los perfiles y contar una consulta
+# en todos, con un hilo y en paralelo (profiles.py). También la consulta de
+# un solo usuario en una base con el historial de todos (idx_history_user).
+#
+#   python benchmarks/bench_profiles.py [perfiles] [tareas_por_perfil]
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_search import WORDS, timed  # noqa: E402
+from profiles import WORKERS, count_profiles, profile_query, scan_profiles  # noqa: E402
+from query_engine import make_query  # noqa: E402
+from storage import DB_FILE, PROFILE_FILE, SqliteStorage  # noqa: E402
+
+COLORS = ["red", "yellow", "blue", "green"]
+QUERIES = [
+    ("todo", make_query()),
+    ("1 año, alta", make_query("2025-01-01", "2025-12-31", ["red"])),
+    ("texto", make_query(text="factura")),
+]
+
+
+def rows(rng, user_id, count):
+    return [(f"20{rng.randint(22, 26)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+             " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))),
+             rng.choice(COLORS), "🟢", None, user_id) for _ in range(count)]
+
+
+def insert(storage, data):
+    with storage.conn:
+        storage.conn.executemany(
+            "INSERT INTO history (completed_date, text, color, color_name, completed, user_id)"
+            " VALUES (?, ?, ?, ?, ?, ?)", data)
+
+
+def main(profiles, per_profile):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "perfiles"
+        merged = SqliteStorage(Path(tmp) / "todos.db")
+        for i in range(profiles):
+            user_id = f"u{i:04d}"
+            path = folder / user_id
+            path.mkdir(parents=True)
+            (path / PROFILE_FILE).write_text(json.dumps({"user_id": user_id, "user_name": f"Usuario {i}"}))
+            data = rows(rng, user_id, per_profile)
+            storage = SqliteStorage(path / DB_FILE, user_id=user_id)
+            insert(storage, data)
+            # Las copias exportadas llegan con el índice al día (el panel no lo arma)
+            storage.search.update()
+            storage.close()
+            insert(merged, data)
+        print(f"{profiles} perfiles de {per_profile} tareas ({WORKERS} hilos)")
+
+        one_t, found = timed(lambda: scan_profiles(folder, workers=1), runs=3)
+        many_t, _ = timed(lambda: scan_profiles(folder), runs=3)
+        print(f"\nbuscar perfiles: {one_t * 1000:.0f} ms con 1 hilo, {many_t * 1000:.0f} ms en paralelo")
+
+        print(f"\n{'consulta':<14}{'1 hilo':>10}{'paralelo':>10}")
+        for name, query in QUERIES:
+            one_t, _ = timed(lambda: count_profiles(found, query, workers=1), runs=3)
+            many_t, results = timed(lambda: count_profiles(found, query), runs=3)
+            assert not any(r["error"] for r in results)
+            print(f"{name:<14}{one_t * 1000:>8.0f}ms{many_t * 1000:>8.0f}ms")
+
+        # Un usuario en la base con todos: solo su parte del índice
+        merged.search.update()
+        print(f"\n{'un usuario':<14}{'su perfil':>12}{'base común':>12}")
+        profile = found[len(found) // 2]
+        storage = SqliteStorage(Path(profile["path"]) / DB_FILE, user_id=profile["user_id"])
+        for name, query in QUERIES:
+            query = profile_query(query, profile)
+            own_t, own = timed(lambda: storage.count_history(query))
+            merged_t, counts = timed(lambda: merged.count_history(query))
+            assert own == counts
+            print(f"{name:<14}{own_t * 1000:>10.1f}ms{merged_t * 1000:>10.1f}ms")
+        storage.close()
+        merged.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,81 @@
+# bench_query.py
+# Consultas del panel de administración sobre cinco años de historial:
+# rango de fechas con filtros de prioridad y texto (query_engine.py).
+#
+#   python benchmarks/bench_query.py [tareas_por_día]
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_search import WORDS, timed  # noqa: E402
+from query_engine import SORTS, SortedHistory, cursor, filter_rows, make_query  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+
+COLORS = ["red", "yellow", "blue", "green"]
+END = date(2026, 10, 1)
+START = END - timedelta(days=5 * 365)
+
+QUERIES = [
+    ("5 años", make_query(START.isoformat(), END.isoformat())),
+    ("1 mes", make_query("2024-03-01", "2024-03-31")),
+    ("1 año, alta", make_query("2023-01-01", "2023-12-31", ["red"])),
+    ("5 años, texto", make_query(START.isoformat(), END.isoformat(), text="factura")),
+    ("1 año, ambos", make_query("2025-01-01", "2025-12-31", ["blue"], "reunion cliente")),
+]
+
+
+def history(per_day):
+    rng = random.Random(2)
+    data = {}
+    day = START
+    while day <= END:
+        data[day.isoformat()] = [
+            {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))),
+             "color": rng.choice(COLORS), "color_name": "🟢", "completed": None}
+            for _ in range(rng.randint(0, per_day * 2))]
+        day += timedelta(days=1)
+    return data
+
+
+def main(per_day):
+    data = history(per_day)
+    total = sum(len(v) for v in data.values())
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SqliteStorage(Path(tmp) / "bench.db")
+        with storage.conn:
+            storage.conn.executemany(
+                "INSERT INTO history (completed_date, text, color, color_name, completed) VALUES (?, ?, ?, ?, ?)",
+                [(d, e["text"], e["color"], e["color_name"], None) for d in sorted(data) for e in data[d]])
+        storage.search.update()
+        memory = SortedHistory(data)
+        print(f"{total} tareas en {len(data)} días")
+        print(f"\n{'consulta':<16}{'conteo':>10}{'página':>10}{'json':>10}{'filas':>9}")
+        for name, query in QUERIES:
+            count_t, counts = timed(lambda: storage.count_history(query))
+            page_t, _ = timed(lambda: storage.query_history(query, limit=100))
+            json_t, rows = timed(lambda: filter_rows(memory.range(query["date_from"], query["date_to"]), query))
+            assert sum(counts.values()) == len(rows)
+            print(f"{name:<16}{count_t * 1000:>8.1f}ms{page_t * 1000:>8.1f}ms"
+                  f"{json_t * 1000:>8.1f}ms{len(rows):>9}")
+
+        # Página de 200 filas a mitad de los resultados, según el orden
+        print(f"\n{'orden (5 años)':<16}{'1ª página':>12}{'a mitad':>10}")
+        for order in SORTS:
+            for descending in (False, True):
+                query = make_query(START.isoformat(), END.isoformat(), order_by=order, descending=descending)
+                rows = storage.query_history(query)
+                after = cursor(query, *rows[len(rows) // 2])
+                first_t, _ = timed(lambda: storage.query_history(query, limit=200))
+                middle_t, _ = timed(lambda: storage.query_history(query, limit=200, after=after))
+                label = order + (" desc" if descending else "")
+                print(f"{label:<16}{first_t * 1000:>10.1f}ms{middle_t * 1000:>8.1f}ms")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,72 @@
+# bench_search.py
+# Búsqueda en un historial de N tareas: índice de search_index.py contra
+# recorrer todo el texto normalizado (lo que haría una búsqueda sin índice).
+#
+#   python benchmarks/bench_search.py [tareas]
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from search_index import matches  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+
+WORDS = ["revisar", "informe", "llamar", "reunión", "cliente", "pagar", "factura", "enviar",
+         "correo", "comprar", "café", "preparar", "presentación", "actualizar", "inventario",
+         "médico", "gimnasio", "estudiar", "inglés", "limpiar", "cocina", "regar", "plantas",
+         "año", "mañana", "proyecto", "código", "despliegue", "contraseña", "música"]
+QUERIES = ["reunion", "Factura", "presenta", "medico", "ano", "cod desp", "mañana café", "xyz"]
+
+
+def fill(storage, count):
+    rng = random.Random(1)
+    rows = []
+    for i in range(count):
+        day = f"20{18 + i * 8 // count:02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f" #{i}"
+        rows.append((day, text, rng.choice(["red", "yellow", "blue", "green"]), "🟢", None))
+    with storage.conn:
+        storage.conn.executemany(
+            "INSERT INTO history (completed_date, text, color, color_name, completed) VALUES (?, ?, ?, ?, ?)",
+            rows)
+
+
+def timed(fn, runs=5):
+    best = None
+    result = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SqliteStorage(Path(tmp) / "bench.db")
+        fill(storage, count)
+        t0 = time.perf_counter()
+        storage.search.update()
+        print(f"{count} tareas indexadas en {time.perf_counter() - t0:.2f} s")
+
+        texts = storage.conn.execute("SELECT completed_date, text FROM history").fetchall()
+        print(f"\n{'consulta':<14}{'índice':>10}{'recorrido':>12}{'resultados':>12}")
+        for query in QUERIES:
+            indexed, found = timed(lambda: storage.search_history(query, limit=200))
+            scan, _ = timed(lambda: [t for t in texts if matches(t[1], query)], runs=1)
+            print(f"{query:<14}{indexed * 1000:>8.1f}ms{scan * 1000:>10.0f}ms{len(found):>12}")
+
+        t0 = time.perf_counter()
+        for i in range(100):
+            storage.add_history("2026-01-01", {"text": f"tarea nueva número {i}"})
+        print(f"\nadd_history con índice: {(time.perf_counter() - t0) * 10:.2f} ms por tarea")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,86 @@
+# bench_theme.py
+# Costo de estilo de 1000 filas del historial: una hoja por widget (como el
+# viejo load_history) contra la hoja única de theme.py con propiedades dinámicas.
+#
+#   python benchmarks/bench_theme.py [filas]
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+COLORS = ["red", "yellow", "blue", "green"]
+ROW_STYLES = {
+    "red": "color: #FFB6C1; text-decoration: line-through; font-size: 13px;",
+    "yellow": "color: #FFFFE0; text-decoration: line-through; font-size: 13px;",
+    "blue": "color: #ADD8E6; text-decoration: line-through; font-size: 13px;",
+    "green": "color: #90EE90; text-decoration: line-through; font-size: 13px;",
+}
+ROW_RULES = "\n".join(
+    f'QLabel#history_row[priority="{color}"] {{ {style} }}' for color, style in ROW_STYLES.items()
+)
+
+
+def run(mode, rows):
+    from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+    import theme
+
+    app = QApplication.instance() or QApplication([])
+    if mode == "tema":
+        # La hoja se compila e instala una vez, antes de crear widgets
+        t0 = time.perf_counter()
+        app.setStyleSheet(theme.stylesheet() + ROW_RULES)
+        install = time.perf_counter() - t0
+    else:
+        install = 0.0
+
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    t0 = time.perf_counter()
+    labels = []
+    for i in range(rows):
+        color = COLORS[i % len(COLORS)]
+        label = QLabel(f"Tarea de prueba número {i}")
+        if mode == "tema":
+            label.setObjectName("history_row")
+            label.setProperty("priority", color)
+        else:
+            label.setStyleSheet(ROW_STYLES[color])
+        layout.addWidget(label)
+        labels.append(label)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for label in labels:
+        label.ensurePolished()
+    polish = time.perf_counter() - t0
+
+    # Cambio de prioridad en todas las filas (lo que hacía el pulso o un re-color)
+    t0 = time.perf_counter()
+    for i, label in enumerate(labels):
+        color = COLORS[(i + 1) % len(COLORS)]
+        if mode == "tema":
+            theme.set_state(label, "priority", color)
+        else:
+            label.setStyleSheet(ROW_STYLES[color])
+        label.ensurePolished()
+    restyle = time.perf_counter() - t0
+
+    print(f"{mode:8} instalar {install * 1000:7.1f} ms | crear {build * 1000:7.1f} ms | "
+          f"pulir {polish * 1000:7.1f} ms | re-estilar {restyle * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        run(sys.argv[2], int(sys.argv[1]))
+        sys.exit(0)
+    rows = sys.argv[1] if len(sys.argv) > 1 else "1000"
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    print(f"Estilo de {rows} filas del historial")
+    # Cada modo en su propio proceso para que no compartan caché de estilos
+    for mode in ("antes", "tema"):
+        subprocess.run([sys.executable, __file__, rows, mode], env=env, check=True)
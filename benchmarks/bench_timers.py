@@ -0,0 +1,58 @@
+# bench_timers.py
+# Despertares por segundo del reloj compartido (timer_service.py): con el
+# reloj a la vista con y sin foco, con una alarma sonando y con la ventana
+# oculta. En reposo (sin foco u oculta) tiene que quedar por debajo de uno.
+#
+#   python benchmarks/bench_timers.py [segundos_por_caso]
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from timer_service import TimerService  # noqa: E402
+
+# Usuarios del reloj en cada caso, {clave: necesita segundos} (como los
+# registra widget.py), y si es un caso en reposo
+CASES = [
+    ("visible, con foco", {"clock": True}, False),
+    ("visible, sin foco", {"clock": False}, True),
+    ("sin foco, alarma sonando", {"clock": False, "sound": True}, False),
+    ("oculta", {}, True),
+]
+# Objetivo en reposo (despertares por segundo)
+IDLE_TARGET = 1.0
+
+
+def measure(app, users, seconds):
+    service = TimerService()
+    service.watch_clock()
+    for key, per_second in users.items():
+        service.acquire(key, seconds=per_second)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    rate = service.wakeups_per_second()
+    for key in users:
+        service.release(key)
+    service.deleteLater()
+    return service.wakeups, rate
+
+
+def main(seconds):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    print(f"{seconds:g} s por caso (latido de saltos cada {TimerService.WATCH_MS // 1000} s)")
+    print(f"\n{'caso':<26}{'despertares':>12}{'por segundo':>13}")
+    for name, users, idle in CASES:
+        wakeups, rate = measure(app, users, seconds)
+        print(f"{name:<26}{wakeups:>12}{rate:>13.2f}")
+        if idle:
+            assert rate < IDLE_TARGET, f"{name}: {rate:.2f} despertares/s en reposo"
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -1,57 +1,238 @@
-# build.py
+# build_widget.py
 import PyInstaller.__main__
+import json
 import os
 import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-def build_app():
+APP_NAME = "ProductivityApp"
+ICON_PATH = "Reloj.ico"
+SOUND_FILE = "alarm.wav"
+MAIN_SCRIPT = "widget.py"
+
+# Módulos de Qt (y de Python) que la app no usa; el perfil "trimmed" los excluye.
+# QtNetwork se queda: el binding de QtMultimedia depende de él
+UNUSED_MODULES = [
+    "PySide6.QtWebEngineCore", "PySide6.QtWebEngineWidgets", "PySide6.QtWebEngineQuick",
+    "PySide6.QtWebChannel", "PySide6.QtWebSockets", "PySide6.QtQml", "PySide6.QtQuick",
+    "PySide6.QtQuickWidgets", "PySide6.QtQuick3D", "PySide6.QtSql",
+    "PySide6.Qt3DCore", "PySide6.QtCharts", "PySide6.QtDataVisualization", "PySide6.QtPdf",
+    "PySide6.QtPdfWidgets", "PySide6.QtBluetooth", "PySide6.QtPositioning", "PySide6.QtLocation",
+    "PySide6.QtSensors", "PySide6.QtSerialPort", "PySide6.QtTest", "PySide6.QtDesigner",
+    "PySide6.QtOpenGL", "PySide6.QtOpenGLWidgets", "PySide6.QtSvg", "PySide6.QtXml",
+    "tkinter", "unittest", "pydoc",
+]
+# Plugins de Qt que sí se usan; el resto se borra de la carpeta del perfil "trimmed"
+KEEP_QT_PLUGINS = {"platforms", "styles", "imageformats", "multimedia", "iconengines"}
+UNUSED_QT_DIRS = ["translations", "qml"]
+
+PROFILES = {
+    # Una carpeta: arranca sin extraer nada
+    "onedir": {"onefile": False, "trim": False},
+    # Un solo .exe: se extrae a _MEIPASS en cada arranque
+    "onefile": {"onefile": True, "trim": False},
+    # Una carpeta sin módulos ni plugins de Qt que no se usan
+    "trimmed": {"onefile": False, "trim": True},
+}
+
+RESULTS_FILE = Path("benchmarks") / "build_results.jsonl"
+WARM_RUNS = 5
+LAUNCH_TIMEOUT = 60
+
+
+def executable_path(profile):
+    dist_dir = Path("dist") / profile
+    exe_name = APP_NAME + (".exe" if sys.platform == "win32" else "")
+    if PROFILES[profile]["onefile"]:
+        return dist_dir / exe_name
+    return dist_dir / APP_NAME / exe_name
+
+
+def build_app(profile="onefile"):
     # Configuración
-    app_name = "ProductivityApp"
-    icon_path = "Reloj.ico"
-    sound_file = "alarm.wav"
-    main_script = "widget.py"
-    
+    options = PROFILES[profile]
+    dist_dir = Path("dist") / profile
+    work_dir = Path("build") / profile
+
     # Verificar que existen los archivos necesarios
-    if not Path(icon_path).exists():
-        print(f"❌ No se encuentra el icono: {icon_path}")
-        return
-    
-    if not Path(sound_file).exists():
-        print(f"❌ No se encuentra el archivo de sonido: {sound_file}")
-        return
-    
+    if not Path(ICON_PATH).exists():
+        print(f"❌ No se encuentra el icono: {ICON_PATH}")
+        return None
+
+    if not Path(SOUND_FILE).exists():
+        print(f"❌ No se encuentra el archivo de sonido: {SOUND_FILE}")
+        return None
+
     # Comando de PyInstaller
     args = [
-        main_script,
-        "--onefile",
+        MAIN_SCRIPT,
+        "--onefile" if options["onefile"] else "--onedir",
         "--noconsole",
-        f"--icon={icon_path}",
-        f"--name={app_name}",
-        f"--add-data={icon_path};.",
-        f"--add-data={sound_file};.",
+        "--noconfirm",
+        f"--icon={Path(ICON_PATH).resolve()}",
+        f"--name={APP_NAME}",
+        f"--distpath={dist_dir}",
+        f"--workpath={work_dir}",
+        f"--specpath={work_dir}",
+        f"--add-data={Path(ICON_PATH).resolve()}{os.pathsep}.",
+        f"--add-data={Path(SOUND_FILE).resolve()}{os.pathsep}.",
         "--hidden-import=PySide6.QtMultimedia",
         "--hidden-import=PySide6.QtGui",
         "--hidden-import=PySide6.QtWidgets",
         "--hidden-import=PySide6.QtCore",
     ]
-    
-    print("🚀 Compilando aplicación...")
+    if options["trim"]:
+        args += [f"--exclude-module={name}" for name in UNUSED_MODULES]
+
+    print(f"🚀 Compilando aplicación (perfil {profile})...")
     PyInstaller.__main__.run(args)
-    
+
+    if options["trim"]:
+        removed = trim_qt(dist_dir / APP_NAME)
+        print(f"✂️ Quitados {removed / 1024 / 1024:.1f} MB de plugins y traducciones de Qt")
+
     # Crear carpeta de distribución con recursos
-    dist_dir = Path("dist")
     resources_dir = dist_dir / "resources"
-    resources_dir.mkdir(exist_ok=True)
-    
+    resources_dir.mkdir(parents=True, exist_ok=True)
+
     # Copiar archivos adicionales a la carpeta de distribución
-    if Path(sound_file).exists():
-        shutil.copy2(sound_file, dist_dir / sound_file)
-        shutil.copy2(sound_file, resources_dir / sound_file)
-    
-    print(f"✅ Aplicación compilada en: {dist_dir / app_name}.exe")
+    shutil.copy2(SOUND_FILE, dist_dir / SOUND_FILE)
+    shutil.copy2(SOUND_FILE, resources_dir / SOUND_FILE)
+
+    exe = executable_path(profile)
+    print(f"✅ Aplicación compilada en: {exe}")
     print("📁 Recursos incluidos:")
-    print(f"   - {sound_file}")
-    print(f"   - {icon_path}")
+    print(f"   - {SOUND_FILE}")
+    print(f"   - {ICON_PATH}")
+    return exe
+
+
+def trim_qt(app_dir):
+    """Borra plugins y datos de Qt que la app no carga; devuelve los bytes quitados"""
+    removed = 0
+    for qt_dir in app_dir.rglob("Qt*"):
+        if not (qt_dir.is_dir() and qt_dir.parent.name == "PySide6"):
+            continue
+        targets = [qt_dir / name for name in UNUSED_QT_DIRS]
+        plugins = qt_dir / "plugins"
+        if plugins.is_dir():
+            targets += [p for p in plugins.iterdir() if p.name not in KEEP_QT_PLUGINS]
+        for target in targets:
+            if target.exists():
+                removed += artifact_size(target)
+                shutil.rmtree(target, ignore_errors=True)
+    return removed
+
+
+def artifact_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def seed_data(data_dir):
+    """Datos fijos para medir el arranque: tareas, alarmas futuras (ninguna
+    perdida, no aparece el resumen) y un historial de un año"""
+    # Solo al medir: compilar no carga los módulos de la aplicación
+    from storage import open_storage
+    storage = open_storage(data_dir)
+    colors = ["red", "yellow", "blue", "green"]
+    tasks = [{"text": f"Tarea {i}", "color": colors[i % 4], "has_reminder": False} for i in range(20)]
+    alarms = [{"text": f"Alarma {i}", "color": colors[i % 4], "reminder_time": f"2099-01-{i + 1:02d}T09:00:00"}
+              for i in range(5)]
+    storage.apply_batch(add_tasks=tasks, add_alarms=alarms)
+    for day in range(365):
+        date_str = (date(2025, 1, 1) + timedelta(days=day)).isoformat()
+        for i in range(3):
+            storage.add_history(date_str, {"text": f"Hecha {day}-{i}", "color": colors[(day + i) % 4]})
+    storage.close()
+
+
+def launch_time(exe, fixture):
+    """Segundos hasta la primera ventana con sus datos (--startup-profile
+    cierra tras pintar y cargar tareas y alarmas).
+
+    Cada arranque usa una copia nueva de fixture como carpeta de datos, así
+    no toca los datos reales y todos los arranques parten de lo mismo.
+    """
+    from storage import DATA_DIR_ENV
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "datos"
+        shutil.copytree(fixture, data_dir)
+        start = time.perf_counter()
+        subprocess.run([str(exe), "--startup-profile"], cwd=exe.parent,
+                       env=dict(os.environ, **{DATA_DIR_ENV: str(data_dir)}),
+                       timeout=LAUNCH_TIMEOUT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return time.perf_counter() - start
+
+
+def benchmark(profile, exe):
+    # El primer arranque tras compilar es el "frío" (disco y _MEIPASS sin caché)
+    artifact = exe if PROFILES[profile]["onefile"] else exe.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = Path(tmp) / "fixture"
+        seed_data(fixture)
+        cold = launch_time(exe, fixture)
+        warm = [launch_time(exe, fixture) for _ in range(WARM_RUNS)]
+    return {
+        "profile": profile,
+        "size_bytes": artifact_size(artifact),
+        "cold_launch_s": round(cold, 3),
+        "warm_launch_s": round(statistics.median(warm), 3),
+        "warm_runs": [round(t, 3) for t in warm],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results):
+    # Una línea por perfil y compilación, para comparar entre versiones
+    RESULTS_FILE.parent.mkdir(exist_ok=True)
+    stamp = datetime.now().isoformat(timespec="seconds")
+    revision = git_revision()
+    with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps({"date": stamp, "revision": revision,
+                                "platform": sys.platform, **result}) + "\n")
+
+
+def print_results(results):
+    print(f"\n{'perfil':<10}{'tamaño':>12}{'frío':>10}{'tibio':>10}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['size_bytes'] / 1024 / 1024:>9.1f} MB"
+              f"{r['cold_launch_s']:>9.2f}s{r['warm_launch_s']:>9.2f}s")
+
 
 if __name__ == "__main__":
-    build_app()
\ No newline at end of file
+    # python build_widget.py [perfil ...] [--no-bench]
+    requested = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    unknown = [p for p in requested if p not in PROFILES]
+    if unknown:
+        print(f"❌ Perfil desconocido: {', '.join(unknown)} (opciones: {', '.join(PROFILES)})")
+        sys.exit(1)
+    results = []
+    for profile in requested or list(PROFILES):
+        exe = build_app(profile)
+        if exe is None:
+            sys.exit(1)
+        if "--no-bench" not in sys.argv:
+            print(f"⏱️ Midiendo arranque de {profile}...")
+            results.append(benchmark(profile, exe))
+    if results:
+        print_results(results)
+        save_results(results)
+        print(f"📊 Resultados agregados a {RESULTS_FILE}")
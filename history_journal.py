@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+
+# --------------------------
+# Historial: snapshot + journal
+# --------------------------
+class HistoryJournal:
+    """Historial de tareas completadas guardado como snapshot + journal.
+
+    El snapshot es el mismo historial.json de siempre ({fecha: [tareas]}), así
+    que los archivos existentes se siguen leyendo sin migración. Cada tarea
+    completada se agrega al journal (historial.jsonl) con un único write(); una
+    compactación en segundo plano vuelca el journal dentro del snapshot.
+
+    Cada línea lleva un "journal_id" único que se conserva en el snapshot: al
+    repetir un journal rotado tras un cierre a mitad se descartan solo las
+    líneas ya volcadas, no dos tareas iguales completadas en el mismo segundo.
+    """
+    COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".jsonl")
+        # Journal rotado mientras se compacta (sobrevive a un cierre a mitad)
+        self.compacting_path = self.snapshot_path.with_suffix(".jsonl.compacting")
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._tail_checked = False
+
+    def append(self, date_str, entry):
+        record = dict(entry, date=date_str, journal_id=uuid.uuid4().hex)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._tail_checked:
+                # Si la última línea quedó truncada, no pegarle la nueva encima
+                if not self._ends_with_newline(self.journal_path):
+                    line = "\n" + line
+                self._tail_checked = True
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                size = f.tell()
+        if size >= self.COMPACT_BYTES:
+            self.compact_in_background()
+
+    def load(self):
+        """Devuelve el historial completo {fecha: [tareas]}"""
+        data = self._read_snapshot()
+        for path in (self.compacting_path, self.journal_path):
+            self._fold(data, self._read_journal(path), dedupe=path == self.compacting_path)
+        return data
+
+    def compact_in_background(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact_worker, daemon=True).start()
+
+    def compact(self):
+        """Vuelca el journal en el snapshot (bloqueante)"""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        self._compact_worker()
+
+    def _compact_worker(self):
+        try:
+            with self._lock:
+                # Las nuevas tareas van a un journal vacío mientras se compacta
+                if self.journal_path.exists() and not self.compacting_path.exists():
+                    os.replace(self.journal_path, self.compacting_path)
+            if not self.compacting_path.exists():
+                return
+            data = self._read_snapshot()
+            # dedupe: si un cierre previo alcanzó a escribir el snapshot pero no
+            # a borrar el journal rotado, sus tareas ya están en el snapshot
+            self._fold(data, self._read_journal(self.compacting_path), dedupe=True)
+            tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            os.remove(self.compacting_path)
+        except Exception as e:
+            print("Error compactando historial:", e)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _read_snapshot(self):
+        if not self.snapshot_path.exists():
+            return {}
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    @staticmethod
+    def _ends_with_newline(path):
+        if not path.exists() or path.stat().st_size == 0:
+            return True
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _read_journal(path):
+        if not path.exists():
+            return []
+        entries = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Línea truncada por un cierre a mitad de escritura
+                    continue
+        return entries
+
+    @staticmethod
+    def _fold(data, entries, dedupe=False):
+        seen = {}
+        for entry in entries:
+            date_str = entry.pop("date", None)
+            if not date_str:
+                continue
+            day = data.setdefault(date_str, [])
+            if dedupe:
+                if date_str not in seen:
+                    seen[date_str] = {HistoryJournal._dedupe_key(e) for e in day}
+                key = HistoryJournal._dedupe_key(entry)
+                if key in seen[date_str]:
+                    continue
+            day.append(entry)
+
+    @staticmethod
+    def _dedupe_key(entry):
+        # Las líneas anteriores al journal_id solo se pueden comparar enteras
+        if isinstance(entry, dict) and entry.get("journal_id"):
+            return entry["journal_id"]
+        return json.dumps(entry, sort_keys=True)
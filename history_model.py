@@ -0,0 +1,376 @@
+import itertools
+from PySide6.QtCore import QAbstractItemModel, QAbstractListModel, QModelIndex, QDate, QSize, Qt
+from PySide6.QtWidgets import QStyledItemDelegate
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+
+from search_index import matches
+
+ColorRole = Qt.UserRole + 1
+
+DAY_COLOR = "#66CCFF"
+ENTRY_COLORS = {
+    "red": "#FFB6C1",
+    "yellow": "#FFFFE0",
+    "blue": "#ADD8E6",
+    "green": "#90EE90",
+}
+
+
+class _Day:
+    """Un día del historial; sus tareas se cargan al expandirlo"""
+    __slots__ = ("uid", "date", "count", "entries", "loading", "label")
+
+    def __init__(self, uid, date, count):
+        self.uid = uid
+        self.date = date
+        self.count = count
+        self.entries = None
+        self.loading = False
+        self.label = None
+
+
+# Consultas que corren en el hilo de E/S
+def _load_dates(storage):
+    return storage.change_token(), storage.history_dates()
+
+
+def _dates_if_changed(storage, token):
+    new_token = storage.change_token()
+    if new_token == token:
+        return None
+    return new_token, storage.history_dates()
+
+
+def _entries_for_date(storage, date_str):
+    return storage.history_for_date(date_str)
+
+
+def _search(storage, query):
+    return storage.search_history(query)
+
+
+# --------------------------
+# Modelo del historial
+# --------------------------
+class HistoryModel(QAbstractItemModel):
+    """Días del historial (más reciente primero) con sus tareas como hijos.
+
+    Al cargar solo se consulta la lista de días y cuántas tareas tiene cada
+    uno; las tareas de un día se piden al almacenamiento en fetchMore, cuando
+    la vista lo expande. El modelo hace de caché: add_entry lo actualiza en el
+    lugar y refresh solo vuelve a consultar si otro proceso cambió los datos.
+    Las consultas van al hilo de E/S y las filas llegan cuando terminan.
+    """
+
+    def __init__(self, io_worker, parent=None):
+        super().__init__(parent)
+        self.io_worker = io_worker
+        self._pending = False
+        self._days = []
+        self._by_uid = {}
+        self._by_date = {}
+        self._row_of = {}
+        self._uids = itertools.count(1)
+        self._token = None
+
+    def _reindex(self):
+        self._by_uid = {day.uid: day for day in self._days}
+        self._by_date = {day.date: day for day in self._days}
+        self._row_of = {day.uid: row for row, day in enumerate(self._days)}
+
+    def reload(self):
+        if self._pending:
+            return
+        self._pending = True
+        self.io_worker.submit(_load_dates, on_done=self._loaded, on_error=self._failed)
+
+    def _loaded(self, result):
+        self._pending = False
+        self.beginResetModel()
+        self._token, dates = result
+        self._days = [_Day(next(self._uids), d, n) for d, n in dates]
+        self._reindex()
+        self.endResetModel()
+
+    def refresh(self):
+        """Sin cambios externos no se toca la vista"""
+        if self._token is None:
+            self.reload()
+            return
+        if self._pending:
+            return
+        self._pending = True
+        self.io_worker.submit(_dates_if_changed, self._token, on_done=self._refreshed, on_error=self._failed)
+
+    def _refreshed(self, result):
+        self._pending = False
+        if result is None:
+            return
+        self._token, dates = result
+        self._sync(dates)
+
+    def _failed(self, error):
+        self._pending = False
+        print("Error cargando historial:", error)
+
+    def add_entry(self, date_str, entry):
+        """Agrega una tarea recién completada sin recargar el historial"""
+        if self._token is None:
+            return
+        day = self._by_date.get(date_str)
+        if day is None:
+            # Los días van de más reciente a más antiguo; lo normal es la fila 0
+            row = next((i for i, d in enumerate(self._days) if d.date < date_str), len(self._days))
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._days.insert(row, _Day(next(self._uids), date_str, 1))
+            self._reindex()
+            self.endInsertRows()
+            return
+        day.count += 1
+        if day.entries is not None:
+            parent = self.createIndex(self._row_of[day.uid], 0, 0)
+            n = len(day.entries)
+            self.beginInsertRows(parent, n, n)
+            day.entries.append(entry)
+            self.endInsertRows()
+
+    def _sync(self, dates):
+        """Aplica a la vista solo las diferencias con la lista de días actual"""
+        counts = dict(dates)
+        for row in reversed(range(len(self._days))):
+            if self._days[row].date not in counts:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._days[row]
+                self._reindex()
+                self.endRemoveRows()
+        for row, (date_str, count) in enumerate(dates):
+            if row < len(self._days) and self._days[row].date == date_str:
+                day = self._days[row]
+                if day.count != count:
+                    day.count = count
+                    self._sync_entries(day)
+                continue
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._days.insert(row, _Day(next(self._uids), date_str, count))
+            self._reindex()
+            self.endInsertRows()
+
+    def _sync_entries(self, day):
+        if day.entries is None or day.loading:
+            return
+        day.loading = True
+        self.io_worker.submit(_entries_for_date, day.date,
+                              on_done=lambda entries, uid=day.uid: self._entries_synced(uid, entries),
+                              on_error=lambda e, uid=day.uid: self._entries_failed(uid, e))
+
+    def _entries_synced(self, uid, entries):
+        day = self._by_uid.get(uid)
+        if day is None:
+            return
+        day.loading = False
+        parent = self.createIndex(self._row_of[uid], 0, 0)
+        old = day.entries
+        if entries[:len(old)] != old:
+            # No es solo un agregado al final: rehacer los hijos de este día
+            if old:
+                self.beginRemoveRows(parent, 0, len(old) - 1)
+                day.entries = old = []
+                self.endRemoveRows()
+        if len(entries) > len(old):
+            self.beginInsertRows(parent, len(old), len(entries) - 1)
+            day.entries = entries
+            self.endInsertRows()
+
+    # Los índices de día tienen internalId 0; los de tarea, el uid de su día
+    def index(self, row, column, parent=QModelIndex()):
+        if column != 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if 0 <= row < len(self._days):
+                return self.createIndex(row, 0, 0)
+            return QModelIndex()
+        day = self._days[parent.row()]
+        if day.entries is not None and 0 <= row < len(day.entries):
+            return self.createIndex(row, 0, day.uid)
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(self._row_of[index.internalId()], 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._days)
+        if parent.internalId() != 0:
+            return 0
+        entries = self._days[parent.row()].entries
+        return len(entries) if entries is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._days)
+        if parent.internalId() != 0:
+            return False
+        return self._days[parent.row()].count > 0
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        day = self._days[parent.row()]
+        return day.entries is None and not day.loading
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        day = self._days[parent.row()]
+        day.loading = True
+        self.io_worker.submit(_entries_for_date, day.date,
+                              on_done=lambda entries, uid=day.uid: self._entries_fetched(uid, entries),
+                              on_error=lambda e, uid=day.uid: self._entries_failed(uid, e))
+
+    def _entries_fetched(self, uid, entries):
+        # El día pudo desaparecer mientras se consultaba
+        day = self._by_uid.get(uid)
+        if day is None:
+            return
+        day.loading = False
+        if not entries:
+            day.entries = []
+            return
+        parent = self.createIndex(self._row_of[uid], 0, 0)
+        self.beginInsertRows(parent, 0, len(entries) - 1)
+        day.entries = entries
+        self.endInsertRows()
+
+    def _entries_failed(self, uid, error):
+        day = self._by_uid.get(uid)
+        if day is not None:
+            day.loading = False
+        print("Error cargando historial:", error)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() == 0:
+            day = self._days[index.row()]
+            if role == Qt.DisplayRole:
+                if day.label is None:
+                    day.label = f"📅 {QDate.fromString(day.date, 'yyyy-MM-dd').toString('d MMMM yyyy')}"
+                return day.label
+            return None
+        entry = self._by_uid[index.internalId()].entries[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return f"{entry.get('color_name', '🟢')} {entry.get('text', '')}"
+        if role == ColorRole:
+            return entry.get("color", "green")
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
+
+
+# --------------------------
+# Resultados de búsqueda
+# --------------------------
+class SearchResultsModel(QAbstractListModel):
+    """Tareas del historial que coinciden con la búsqueda (lista plana).
+
+    La consulta corre en el hilo de E/S sobre el índice de search_index; si
+    mientras tanto el texto cambió, el resultado viejo se descarta.
+    """
+
+    def __init__(self, io_worker, parent=None):
+        super().__init__(parent)
+        self.io_worker = io_worker
+        self._rows = []
+        self._query = ""
+
+    def search(self, query):
+        self._query = query = query.strip()
+        if not query:
+            self._set_rows([])
+            return
+        self.io_worker.submit(_search, query,
+                              on_done=lambda rows, q=query: self._found(q, rows),
+                              on_error=lambda e: print("Error buscando en el historial:", e))
+
+    def _found(self, query, rows):
+        if query == self._query:
+            self._set_rows(rows)
+
+    def _set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = [(d, entry, None) for d, entry in rows]
+        self.endResetModel()
+
+    def add_entry(self, date_str, entry):
+        # Una tarea recién completada que coincide aparece arriba
+        if self._query and matches(entry.get("text", ""), self._query):
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self._rows.insert(0, (date_str, entry, None))
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        date_str, entry, label = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if label is None:
+                day = QDate.fromString(date_str, 'yyyy-MM-dd').toString('dd/MM/yyyy')
+                label = f"{day} · {entry.get('color_name', '🟢')} {entry.get('text', '')}"
+                self._rows[index.row()] = (date_str, entry, label)
+            return label
+        if role == ColorRole:
+            return entry.get("color", "green")
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
+
+
+# --------------------------
+# Delegate del historial
+# --------------------------
+class HistoryDelegate(QStyledItemDelegate):
+    """Pinta días y tareas directamente, sin un QLabel por fila"""
+    ROW_HEIGHT = 24
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.day_font = QFont()
+        self.day_font.setPixelSize(13)
+        self.day_font.setBold(True)
+        self.entry_font = QFont()
+        self.entry_font.setPixelSize(13)
+        self.entry_font.setStrikeOut(True)
+        self.day_pen = QColor(DAY_COLOR)
+        self.entry_pens = {color: QColor(value) for color, value in ENTRY_COLORS.items()}
+
+    def paint(self, painter, option, index):
+        # Los resultados de búsqueda también son de primer nivel, pero con color
+        is_day = not index.parent().isValid() and index.data(ColorRole) is None
+        if is_day:
+            font, pen, rect = self.day_font, self.day_pen, option.rect.adjusted(4, 0, -4, 0)
+        else:
+            pen = self.entry_pens.get(index.data(ColorRole), self.entry_pens["green"])
+            font, rect = self.entry_font, option.rect.adjusted(8, 0, -8, 0)
+        text = QFontMetrics(font).elidedText(index.data(Qt.DisplayRole) or "", Qt.ElideRight, rect.width())
+        painter.save()
+        painter.setFont(font)
+        painter.setPen(pen)
+        painter.drawText(rect, Qt.AlignVCenter | Qt.AlignLeft, text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
@@ -0,0 +1,217 @@
+from datetime import date, timedelta
+
+COLORS = ["red", "yellow", "blue", "green"]
+
+
+def _parse(day_str):
+    try:
+        return date.fromisoformat(day_str)
+    except (TypeError, ValueError):
+        return None
+
+
+def week_key(day_str):
+    """Semana ISO de una fecha yyyy-MM-dd ("2026-W42"); None si no es válida"""
+    day = _parse(day_str)
+    if day is None:
+        return None
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def month_key(day_str):
+    return day_str[:7] if _parse(day_str) else None
+
+
+def _next_day(day_str):
+    return (date.fromisoformat(day_str) + timedelta(days=1)).isoformat()
+
+
+def streaks(days):
+    """(racha al último día, mejor racha, último día) para días yyyy-MM-dd ordenados"""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and day == _next_day(previous) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+
+def summarize(day_colors, weeks, months, colors, streak, today):
+    """Resumen para el panel a partir de los contadores ya agregados"""
+    today_str = today.isoformat()
+    current, longest, last_day = streak
+    # La racha sigue viva si hubo tareas hoy o ayer
+    if last_day is None or last_day < (today - timedelta(days=1)).isoformat():
+        current = 0
+    days = {}
+    for day, color, n in day_colors:
+        days.setdefault(day, {})[color] = n
+    colors = dict(dict.fromkeys(COLORS, 0), **colors)
+    return {
+        "total": sum(colors.values()),
+        "today": sum(days.get(today_str, {}).values()),
+        "this_week": dict(weeks).get(week_key(today_str), 0),
+        "this_month": dict(months).get(month_key(today_str), 0),
+        "colors": colors,
+        "days": days,
+        "weeks": sorted(weeks),
+        "months": sorted(months),
+        "streak": current,
+        "longest_streak": longest,
+    }
+
+
+def summarize_entries(history, today=None, days=14, weeks=12, months=12):
+    """Mismo resumen recorriendo [(fecha, tarea)] (backend JSON, sin contadores)"""
+    today = today or date.today()
+    since = (today - timedelta(days=days - 1)).isoformat()
+    per_day, per_week, per_month, colors = {}, {}, {}, {}
+    for day, entry in history:
+        color = entry.get("color", "green")
+        colors[color] = colors.get(color, 0) + 1
+        if _parse(day) is None:
+            continue
+        per_day[(day, color)] = per_day.get((day, color), 0) + 1
+        per_week[week_key(day)] = per_week.get(week_key(day), 0) + 1
+        per_month[month_key(day)] = per_month.get(month_key(day), 0) + 1
+    day_colors = [(d, c, n) for (d, c), n in per_day.items() if d >= since]
+    return summarize(day_colors, sorted(per_week.items())[-weeks:], sorted(per_month.items())[-months:],
+                     colors, streaks(sorted({d for d, _ in per_day})), today)
+
+
+# --------------------------
+# Estadísticas del historial
+# --------------------------
+class HistoryStats:
+    """Contadores pre-agregados del historial, en la misma base SQLite.
+
+    Por día y color (stats_day), por semana ISO (stats_week), por mes
+    (stats_month), por color (stats_color) y la racha de días seguidos
+    (stats_streak). summary() solo lee estas tablas. update() compara el
+    total guardado con el historial y, si difieren, rearma todo.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS stats_day (
+            day TEXT NOT NULL,
+            color TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (day, color)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS stats_week (
+            week TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS stats_month (
+            month TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS stats_color (
+            color TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS stats_streak (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            current INTEGER NOT NULL,
+            longest INTEGER NOT NULL,
+            last_day TEXT,
+            total INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.execute("INSERT OR IGNORE INTO stats_streak (id, current, longest, last_day, total)"
+                              " VALUES (1, 0, 0, NULL, 0)")
+
+    def _bump(self, table, key_column, key):
+        self.conn.execute(f"INSERT INTO {table} ({key_column}, n) VALUES (?, 1) "
+                          f"ON CONFLICT ({key_column}) DO UPDATE SET n = n + 1", (key,))
+
+    def add(self, day_str, color):
+        """Suma una tarea completada (llamar dentro de la transacción que la inserta)"""
+        self.conn.execute("UPDATE stats_streak SET total = total + 1 WHERE id = 1")
+        self._bump("stats_color", "color", color)
+        if _parse(day_str) is None:
+            return
+        self.conn.execute("INSERT INTO stats_day (day, color, n) VALUES (?, ?, 1) "
+                          "ON CONFLICT (day, color) DO UPDATE SET n = n + 1", (day_str, color))
+        self._bump("stats_week", "week", week_key(day_str))
+        self._bump("stats_month", "month", month_key(day_str))
+
+        current, longest, last_day = self.conn.execute(
+            "SELECT current, longest, last_day FROM stats_streak WHERE id = 1").fetchone()
+        if last_day is None or day_str > last_day:
+            current = current + 1 if last_day is not None and day_str == _next_day(last_day) else 1
+            last_day = day_str
+        elif day_str < last_day:
+            # Una fecha anterior a la última (poco común) puede unir dos rachas
+            days = [row[0] for row in self.conn.execute("SELECT DISTINCT day FROM stats_day ORDER BY day")]
+            current, longest, last_day = streaks(days)
+        self.conn.execute("UPDATE stats_streak SET current = ?, longest = ?, last_day = ? WHERE id = 1",
+                          (current, max(longest, current), last_day))
+
+    @staticmethod
+    def is_current(conn):
+        """True si conn tiene los contadores y cuadran con el historial (solo lee)"""
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"stats_day", "stats_week", "stats_month", "stats_color", "stats_streak"} <= tables:
+            return False
+        row = conn.execute("SELECT total FROM stats_streak WHERE id = 1").fetchone()
+        return row is not None and row[0] == conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def update(self):
+        """Reconstruye si los contadores no cuadran con el historial; True si lo hizo"""
+        if self.is_current(self.conn):
+            return False
+        self.rebuild()
+        return True
+
+    def rebuild(self):
+        """Recalcula todos los contadores desde el historial"""
+        with self.conn:
+            for table in ("stats_day", "stats_week", "stats_month", "stats_color"):
+                self.conn.execute(f"DELETE FROM {table}")
+            rows = self.conn.execute(
+                "SELECT completed_date, color, COUNT(*) FROM history "
+                "GROUP BY completed_date, color ORDER BY completed_date").fetchall()
+            per_day, weeks, months, colors = [], {}, {}, {}
+            for day, color, n in rows:
+                colors[color] = colors.get(color, 0) + n
+                if _parse(day) is None:
+                    continue
+                per_day.append((day, color, n))
+                weeks[week_key(day)] = weeks.get(week_key(day), 0) + n
+                months[month_key(day)] = months.get(month_key(day), 0) + n
+            self.conn.executemany("INSERT INTO stats_day (day, color, n) VALUES (?, ?, ?)", per_day)
+            self.conn.executemany("INSERT INTO stats_week (week, n) VALUES (?, ?)", weeks.items())
+            self.conn.executemany("INSERT INTO stats_month (month, n) VALUES (?, ?)", months.items())
+            self.conn.executemany("INSERT INTO stats_color (color, n) VALUES (?, ?)", colors.items())
+            current, longest, last_day = streaks(sorted({day for day, _, _ in per_day}))
+            self.conn.execute("UPDATE stats_streak SET current = ?, longest = ?, last_day = ?, total = ? "
+                              "WHERE id = 1", (current, longest, last_day, sum(colors.values())))
+
+    def summary(self, today=None, days=14, weeks=12, months=12):
+        """Totales, por color, últimos días, semanas y meses: solo lee contadores"""
+        return self.read_summary(self.conn, today, days, weeks, months)
+
+    @staticmethod
+    def read_summary(conn, today=None, days=14, weeks=12, months=12):
+        """summary() sobre cualquier conexión, también de solo lectura"""
+        today = today or date.today()
+        since = (today - timedelta(days=days - 1)).isoformat()
+        day_colors = conn.execute(
+            "SELECT day, color, n FROM stats_day WHERE day >= ?", (since,)).fetchall()
+        week_rows = conn.execute(
+            "SELECT week, n FROM stats_week ORDER BY week DESC LIMIT ?", (weeks,)).fetchall()
+        month_rows = conn.execute(
+            "SELECT month, n FROM stats_month ORDER BY month DESC LIMIT ?", (months,)).fetchall()
+        colors = dict(tuple(row) for row in conn.execute("SELECT color, n FROM stats_color"))
+        streak = conn.execute(
+            "SELECT current, longest, last_day FROM stats_streak WHERE id = 1").fetchone()
+        return summarize([tuple(r) for r in day_colors], [tuple(r) for r in week_rows],
+                         [tuple(r) for r in month_rows], colors, tuple(streak), today)
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal
+
+
+# --------------------------
+# Hilo de E/S
+# --------------------------
+class StorageWorker(QObject):
+    """Dueño exclusivo del almacenamiento, en un hilo propio.
+
+    Todas las operaciones se encolan con submit(fn, *args) y se ejecutan en
+    orden como fn(storage, *args). El resultado vuelve al hilo de la GUI a
+    través de una señal, así que un disco lento nunca congela el reloj ni el
+    arrastre de la ventana.
+    """
+    _finished = Signal(object, object)
+
+    def __init__(self, opener, parent=None):
+        super().__init__(parent)
+        self._opener = opener
+        self._storage = None
+        # Un solo hilo: las operaciones mantienen su orden y SQLite su conexión
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-io")
+        self._closed = False
+        self._finished.connect(self._deliver)
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        # Tras shutdown() no se encola nada: un resultado tardío que pide
+        # otra operación no debe fallar con el hilo ya cerrado
+        if self._closed:
+            return None
+        return self._executor.submit(self._run, fn, args, on_done, on_error)
+
+    def _run(self, fn, args, on_done, on_error):
+        try:
+            if self._storage is None:
+                self._storage = self._opener()
+            result = fn(self._storage, *args)
+        except Exception as e:
+            self._finished.emit(on_error or self._report_error, e)
+            return
+        if on_done is not None:
+            self._finished.emit(on_done, result)
+
+    def _deliver(self, callback, value):
+        callback(value)
+
+    @staticmethod
+    def _report_error(error):
+        print("Error de almacenamiento:", error)
+
+    def shutdown(self):
+        """Espera las operaciones pendientes y cierra el almacenamiento"""
+        if self._closed:
+            return
+        self._closed = True
+
+        def close():
+            # No pasa por _run: si nunca hubo operaciones no se abre nada.
+            # Se revisa en el hilo de E/S, después de lo que esté encolado
+            if self._storage is not None:
+                self._storage.close()
+                self._storage = None
+        self._executor.submit(close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,66 @@
+from collections import deque
+from PySide6.QtCore import QObject
+from PySide6.QtWidgets import QApplication
+
+
+# --------------------------
+# Notificaciones de alarma
+# --------------------------
+class NotificationManager(QObject):
+    """Apila las notificaciones en la esquina inferior derecha.
+
+    Como mucho MAX_VISIBLE a la vez; el resto espera en una cola y se muestra
+    a medida que se cierran las anteriores. Las ventanas cerradas vuelven a
+    un pool y se re-vinculan con bind(), así que una ráfaga de 50 alarmas
+    nunca crea más de MAX_VISIBLE ventanas translúcidas.
+    """
+    MAX_VISIBLE = 3
+    POOL_SIZE = 3
+    SPACING = 10
+    MARGIN_RIGHT = 20
+    MARGIN_BOTTOM = 60
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self._visible = []
+        self._pool = []
+        self._queue = deque()
+
+    def show_alarm(self, alarm):
+        """True si se mostró ya, False si quedó en cola"""
+        if len(self._visible) >= self.MAX_VISIBLE:
+            self._queue.append(alarm)
+            return False
+        popup = self._pool.pop() if self._pool else self._create()
+        popup.bind(alarm)
+        self._visible.append(popup)
+        self._place(popup, len(self._visible) - 1)
+        popup.show()
+        return True
+
+    def _create(self):
+        popup = self._factory()
+        popup.closed.connect(self._closed)
+        return popup
+
+    def _place(self, popup, slot):
+        # La más antigua abajo; las nuevas se apilan hacia arriba
+        screen = QApplication.primaryScreen().availableGeometry()
+        x = screen.x() + screen.width() - popup.width() - self.MARGIN_RIGHT
+        y = (screen.y() + screen.height() - self.MARGIN_BOTTOM
+             - (slot + 1) * popup.height() - slot * self.SPACING)
+        popup.move(x, y)
+
+    def _closed(self, popup):
+        if popup not in self._visible:
+            return
+        self._visible.remove(popup)
+        if len(self._pool) < self.POOL_SIZE:
+            self._pool.append(popup)
+        else:
+            popup.deleteLater()
+        for slot, other in enumerate(self._visible):
+            self._place(other, slot)
+        if self._queue:
+            self.show_alarm(self._queue.popleft())
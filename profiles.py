@@ -0,0 +1,222 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from history_stats import HistoryStats, summarize_entries
+from query_engine import count_sql, filter_rows, register_functions, select_sql, sort_rows
+from search_index import SearchIndex, normalize
+from storage import DB_FILE, HistoryReader, JsonStorage, default_data_dir, load_profile
+
+# Hilos para recorrer una carpeta de perfiles (como el valor por defecto de
+# ThreadPoolExecutor): SQLite suelta el GIL mientras consulta y lee del disco
+WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def read_profile(path):
+    """Perfil guardado en la carpeta path, o None si no tiene datos.
+
+    Las copias exportadas sin perfil.json quedan sin id (se consultan
+    completas) y con el nombre de su carpeta.
+    """
+    path = Path(path)
+    if (path / DB_FILE).is_file():
+        backend = "sqlite"
+    elif (path / "historial.json").is_file():
+        backend = "json"
+    else:
+        return None
+    profile = load_profile(path) or {"user_id": None, "user_name": path.name}
+    return dict(profile, path=str(path), backend=backend)
+
+
+def local_profile():
+    """El perfil de este equipo: sus consultas usan el almacenamiento del panel.
+
+    El panel no crea perfil.json: si el widget todavía no lo generó, el
+    perfil queda sin id. Si el widget todavía no migró el historial.json a
+    SQLite, se lee el JSON.
+    """
+    data_dir = default_data_dir()
+    profile = load_profile(data_dir) or {"user_id": None, "user_name": data_dir.name}
+    backend = "json" if not (data_dir / DB_FILE).exists() and (data_dir / "historial.json").exists() else "sqlite"
+    return dict(profile, path=str(data_dir), backend=backend, local=True)
+
+
+def open_profile(profile):
+    """Historial de un perfil a nombre de su usuario, en solo lectura
+    (cerrarlo al terminar)"""
+    path = Path(profile["path"])
+    if profile["backend"] == "json":
+        return JsonStorage(path, profile["user_id"])
+    return ProfileReader(path / DB_FILE, user_id=profile["user_id"], live=bool(profile.get("local")))
+
+
+class ProfileReader(HistoryReader):
+    """Base SQLite de un perfil exportado, abierta en solo lectura.
+
+    A diferencia de SqliteStorage no crea tablas ni índices, no agrega
+    columnas ni asigna usuarios: la copia queda igual que antes de leerla.
+    Sin journal WAL pendiente la base se abre immutable, así SQLite tampoco
+    crea los archivos -wal y -shm. Lo que la copia no tenga al día (índice
+    de búsqueda incompleto, tareas sin usuario de antes de los perfiles) se
+    resuelve recorriendo el rango de fechas, como el backend JSON.
+
+    Con live=True es la base de este equipo, que el widget puede estar
+    escribiendo: nunca se abre immutable, así se ven sus cambios.
+    """
+
+    def __init__(self, db_path, user_id=None, live=False):
+        db_path = Path(db_path).resolve()
+        if not db_path.is_file():
+            raise FileNotFoundError(f"No existe {db_path}")
+        self.user_id = user_id
+        if live or db_path.with_name(db_path.name + "-wal").exists():
+            mode = "mode=ro"
+        else:
+            mode = "mode=ro&immutable=1"
+        self.conn = sqlite3.connect(f"{db_path.as_uri()}?{mode}", uri=True)
+        self.conn.row_factory = sqlite3.Row
+        register_functions(self.conn)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(history)")}
+        if not columns:
+            raise sqlite3.DatabaseError(f"{db_path.name} no tiene historial")
+        self._has_user = "user_id" in columns
+        self._unowned = None
+        self._indexed = None
+
+    def _sql_ready(self, query):
+        """True si la consulta se puede resolver con count_sql/select_sql"""
+        if query["text"] and not self._index_complete():
+            return False
+        return not query.get("user_id") or not self._has_unowned()
+
+    def _has_unowned(self):
+        # Sin la actualización de SqliteStorage, las tareas sin usuario son del dueño
+        if self._unowned is None:
+            self._unowned = not self._has_user or self.conn.execute(
+                "SELECT 1 FROM history WHERE user_id IS NULL LIMIT 1").fetchone() is not None
+        return self._unowned
+
+    def _index_complete(self):
+        # Misma cuenta que SearchIndex.update, sin indexar lo que falte
+        if self._indexed is None:
+            tables = {row["name"] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self._indexed = {"search_docs", "search_terms", "search_grams"} <= tables and (
+                self.conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0]
+                >= self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0])
+        return self._indexed
+
+    def history_range(self, date_from, date_to):
+        rows = self.conn.execute(
+            "SELECT * FROM history WHERE completed_date BETWEEN ? AND ? "
+            "ORDER BY completed_date, id", (date_from, date_to))
+        return [(row["completed_date"], self._history_row(row)) for row in rows]
+
+    def query_history(self, query, limit=None, after=None):
+        if not self._sql_ready(query):
+            rows = filter_rows(self.history_range(query["date_from"], query["date_to"]), query)
+            return sort_rows(rows, query, limit, after)
+        sql, params = select_sql(query, SearchIndex, limit, after)
+        return [(row["completed_date"], self._history_row(row)) for row in self.conn.execute(sql, params)]
+
+    def count_history(self, query):
+        if not self._sql_ready(query):
+            return super().count_history(query)
+        sql, params = count_sql(query, SearchIndex)
+        return {color: n for color, n in self.conn.execute(sql, params)}
+
+    def history_stats(self, today=None):
+        # Los contadores pueden faltar o estar atrasados: sin reconstruirlos,
+        # en ese caso se recorre el historial
+        if HistoryStats.is_current(self.conn):
+            return HistoryStats.read_summary(self.conn, today)
+        return summarize_entries(self.history_range("", "9999-12-31"), today)
+
+    def _history_row(self, row):
+        return {
+            "id": row["id"],
+            "text": row["text"],
+            "color": row["color"],
+            "color_name": row["color_name"],
+            "completed": row["completed"],
+            "user_id": (row["user_id"] if self._has_user else None) or self.user_id,
+        }
+
+    def interrupt(self):
+        self.conn.interrupt()
+
+    def close(self):
+        self.conn.close()
+
+
+def profile_query(query, profile):
+    """La consulta restringida al usuario del perfil (usa idx_history_user)"""
+    return dict(query, user_id=profile["user_id"])
+
+
+def _run(fn, items, on_progress, workers):
+    """fn(item) de cada item en paralelo, en el orden de items.
+
+    on_progress(hechos, total) se llama en el hilo que llama a _run; si lanza
+    una excepción (por ejemplo JobCancelled) no se empieza ningún item más.
+    """
+    results = [None] * len(items)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profiles")
+    try:
+        futures = {executor.submit(fn, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if on_progress is not None:
+                on_progress(done, len(items))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+# --------------------------
+# Carpeta de perfiles exportados
+# --------------------------
+def scan_profiles(folder, on_progress=None, workers=WORKERS):
+    """Perfiles de las subcarpetas de folder, por nombre de usuario"""
+    with os.scandir(folder) as entries:
+        paths = [entry.path for entry in entries if entry.is_dir()]
+    profiles = [p for p in _run(read_profile, paths, on_progress, workers) if p is not None]
+    return sorted(profiles, key=lambda p: (normalize(p["user_name"]), p["user_id"] or ""))
+
+
+def match_profiles(profiles, kind, value):
+    """Perfiles que coinciden con value: "id" es el id exacto, "name" parte
+    del nombre y "user" cualquiera de los dos. Sin value, todos."""
+    value = normalize(value.strip())
+    if not value:
+        return list(profiles)
+    found = []
+    for profile in profiles:
+        same_id = normalize(profile["user_id"]) == value
+        in_name = value in normalize(profile["user_name"])
+        if (kind == "id" and same_id) or (kind == "name" and in_name) or (kind == "user" and (same_id or in_name)):
+            found.append(profile)
+    return found
+
+
+def count_profiles(profiles, query, on_progress=None, workers=WORKERS):
+    """[{"profile", "counts", "error"}] de la consulta en cada perfil, en paralelo.
+
+    Cada perfil se abre en su propio hilo y lee solo las tareas de su
+    usuario. Un perfil dañado no corta el recorrido: queda con su error.
+    """
+    def count(profile):
+        try:
+            storage = open_profile(profile)
+            try:
+                counts = storage.count_history(profile_query(query, profile))
+            finally:
+                storage.close()
+        except Exception as e:
+            # Cualquier copia mal formada (por ejemplo un historial.json que es
+            # una lista) queda con su error sin cortar el recorrido
+            return {"profile": profile, "counts": {}, "error": str(e) or type(e).__name__}
+        return {"profile": profile, "counts": counts, "error": None}
+
+    return _run(count, profiles, on_progress, workers)
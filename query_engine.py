@@ -0,0 +1,152 @@
+from bisect import bisect_left, bisect_right
+
+from search_index import matches, normalize, tokens
+
+# Prioridad de mayor a menor (para ordenar por prioridad)
+PRIORITY_RANK = {"red": 0, "yellow": 1, "green": 2, "blue": 3}
+
+# Orden posible: (expresión SQL, misma clave en Python para (fecha, tarea)).
+# El id desempata, así cada fila tiene una posición única para el cursor. El
+# texto se ordena normalizado (sin mayúsculas ni tildes) en los dos backends
+SORTS = {
+    "date": ("h.completed_date", lambda d, e: d),
+    "color": ("CASE h.color " + " ".join(f"WHEN '{c}' THEN {r}" for c, r in PRIORITY_RANK.items())
+              + f" ELSE {len(PRIORITY_RANK)} END",
+              lambda d, e: PRIORITY_RANK.get(e.get("color"), len(PRIORITY_RANK))),
+    "text": ("norm(h.text)", lambda d, e: normalize(e.get("text", ""))),
+}
+
+
+def register_functions(conn):
+    """Registra norm() (search_index.normalize) en una conexión SQLite"""
+    conn.create_function("norm", 1, normalize, deterministic=True)
+
+
+def make_query(date_from="", date_to="9999-12-31", colors=None, text="", order_by="date", descending=False,
+               user_id=None):
+    """Consulta sobre el historial: rango de fechas (yyyy-MM-dd, inclusivo)
+    más filtros opcionales por prioridad, por texto y por usuario, y el
+    orden (SORTS)"""
+    return {
+        "date_from": date_from or "",
+        "date_to": date_to or "9999-12-31",
+        "colors": list(colors or []),
+        "text": (text or "").strip(),
+        "order_by": order_by if order_by in SORTS else "date",
+        "descending": bool(descending),
+        "user_id": user_id or None,
+    }
+
+
+def cursor(query, date_str, entry):
+    """Posición de una fila en el orden de la consulta, para pedir la página
+    siguiente (paginación por clave: no depende de cuántas filas se saltan)"""
+    return SORTS[query["order_by"]][1](date_str, entry), entry.get("id")
+
+
+# --------------------------
+# Backend SQLite
+# --------------------------
+def _where(query, search):
+    """(joins, condiciones, parámetros) de la consulta.
+
+    El rango va primero: SQLite lo resuelve con idx_history_date (o con
+    idx_history_color si hay prioridad), que es una búsqueda binaria en el
+    árbol y un recorrido solo de las filas del rango. Con usuario, el
+    rango se busca dentro de su parte de idx_history_user. El texto usa el
+    índice de search_index sobre esas mismas filas.
+    """
+    where = ["h.completed_date BETWEEN ? AND ?"]
+    params = [query["date_from"], query["date_to"]]
+    joins = ""
+    if query.get("user_id"):
+        where.insert(0, "h.user_id = ?")
+        params.insert(0, query["user_id"])
+    if query["colors"]:
+        where.append(f"h.color IN ({', '.join('?' * len(query['colors']))})")
+        params += query["colors"]
+    if query["text"]:
+        ids_sql, ids_params, words = search.candidates(query["text"])
+        if words:
+            joins = " JOIN search_docs d ON d.history_id = h.id"
+            where.append(f"h.id IN ({ids_sql})")
+            params += ids_params
+            where += ["instr(d.norm, ?) > 0"] * len(words)
+            params += words
+    return joins, " AND ".join(where), params
+
+
+def select_sql(query, search, limit=None, after=None):
+    """Filas en el orden de la consulta; after es el cursor de la última
+    fila de la página anterior"""
+    joins, where, params = _where(query, search)
+    key = SORTS[query["order_by"]][0]
+    direction = "DESC" if query["descending"] else "ASC"
+    if after is not None:
+        where += f" AND ({key}, h.id) {'<' if query['descending'] else '>'} (?, ?)"
+        params += list(after)
+    sql = (f"SELECT h.* FROM history h{joins} WHERE {where} "
+           f"ORDER BY {key} {direction}, h.id {direction}")
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def count_sql(query, search):
+    joins, where, params = _where(query, search)
+    return f"SELECT h.color, COUNT(*) FROM history h{joins} WHERE {where} GROUP BY h.color", params
+
+
+# --------------------------
+# Backend JSON
+# --------------------------
+class SortedHistory:
+    """Historial en dos listas paralelas ordenadas por fecha.
+
+    Un rango es bisect en dates más un slice de entries, sin recorrer cada
+    día del historial. Las tareas sin id reciben como id (fecha, orden en
+    el día): agregar tareas a otro día no lo cambia, así un cursor guardado
+    sigue apuntando a la misma fila.
+    """
+
+    def __init__(self, data):
+        self.dates = []
+        self.entries = []
+        for day in sorted(data):
+            for seq, entry in enumerate(data[day]):
+                self.dates.append(day)
+                self.entries.append(entry if "id" in entry else dict(entry, id=(day, seq)))
+
+    def range(self, date_from, date_to):
+        lo = bisect_left(self.dates, date_from)
+        hi = bisect_right(self.dates, date_to)
+        return list(zip(self.dates[lo:hi], self.entries[lo:hi]))
+
+
+def filter_rows(rows, query):
+    """Aplica usuario, prioridad y texto a [(fecha, tarea)] ya recortadas por fecha"""
+    if query.get("user_id"):
+        rows = [(d, e) for d, e in rows if e.get("user_id") == query["user_id"]]
+    colors = set(query["colors"])
+    if colors:
+        rows = [(d, e) for d, e in rows if e.get("color", "green") in colors]
+    if tokens(query["text"]):
+        rows = [(d, e) for d, e in rows if matches(e.get("text", ""), query["text"])]
+    return rows
+
+
+def sort_rows(rows, query, limit=None, after=None):
+    """Orden y página de select_sql sobre filas en memoria (backend JSON)"""
+    key = SORTS[query["order_by"]][1]
+
+    def position(value, row_id):
+        return value, row_id or 0
+
+    rows = sorted(rows, key=lambda row: position(key(*row), row[1].get("id")), reverse=query["descending"])
+    if after is not None:
+        after = position(*after)
+        rows = [row for row in rows
+                if (position(key(*row), row[1].get("id")) < after) == query["descending"]
+                and position(key(*row), row[1].get("id")) != after]
+    return rows if limit is None else rows[:limit]
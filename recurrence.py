@@ -0,0 +1,118 @@
+from PySide6.QtCore import QDate, QDateTime, Qt
+
+# Tipos de repetición (clave guardada, texto del combo)
+KINDS = [
+    ("daily", "Cada día"),
+    ("weekdays", "Lunes a viernes"),
+    ("weekly", "Semanal"),
+    ("monthly", "Mensual"),
+    ("hourly", "Cada N horas"),
+]
+# Días según QDate.dayOfWeek(): 1 = lunes ... 7 = domingo
+DAY_NAMES = ["L", "M", "X", "J", "V", "S", "D"]
+
+
+def make_rule(kind, anchor_iso, days=None, hours=None):
+    """Regla de repetición tal como se guarda en la alarma y la tarea.
+
+    anchor es la primera ocurrencia: de ahí salen la hora del día, el día
+    del mes (mensual) y la fase (cada N horas). Una regla semanal sin días
+    guarda el día de la semana del ancla.
+    """
+    rule = {"kind": kind, "anchor": anchor_iso}
+    if kind == "weekly":
+        days = sorted({day for day in days or [] if 1 <= day <= 7})
+        anchor = QDateTime.fromString(anchor_iso or "", Qt.ISODate)
+        if not days and anchor.isValid():
+            days = [anchor.date().dayOfWeek()]
+        rule["days"] = days
+    if kind == "hourly":
+        rule["hours"] = max(1, int(hours or 1))
+    return rule
+
+
+def describe(rule):
+    if not rule:
+        return ""
+    kind = rule.get("kind")
+    if kind == "weekly":
+        return "🔁 " + ", ".join(DAY_NAMES[d - 1] for d in rule.get("days") or [])
+    if kind == "hourly":
+        return f"🔁 Cada {rule.get('hours', 1)} h"
+    return "🔁 " + dict(KINDS).get(kind, "")
+
+
+def next_occurrence(rule, after):
+    """Primera ocurrencia estrictamente posterior a after (QDateTime).
+
+    Solo se calcula la siguiente: el costo no depende de cuántas
+    ocurrencias futuras tenga la regla.
+    """
+    anchor = QDateTime.fromString(rule.get("anchor") or "", Qt.ISODate)
+    if not anchor.isValid():
+        return None
+    if anchor > after:
+        return anchor
+    kind = rule.get("kind")
+    if kind == "hourly":
+        step = max(1, int(rule.get("hours") or 1)) * 3600
+        return anchor.addSecs((anchor.secsTo(after) // step + 1) * step)
+
+    time = anchor.time()
+    date = after.date()
+    if kind == "monthly":
+        # Mismo día del mes que el ancla; el 31 cae el último día en meses cortos
+        day = anchor.date().day()
+        first = QDate(date.year(), date.month(), 1)
+        for offset in range(2):
+            month = first.addMonths(offset)
+            candidate = QDateTime(QDate(month.year(), month.month(), min(day, month.daysInMonth())), time)
+            if candidate > after:
+                return candidate
+        return None
+
+    if kind == "daily":
+        days = set(range(1, 8))
+    elif kind == "weekdays":
+        days = set(range(1, 6))
+    elif kind == "weekly":
+        days = set(rule.get("days") or [anchor.date().dayOfWeek()])
+    else:
+        return None
+    for offset in range(8):
+        day = date.addDays(offset)
+        if day.dayOfWeek() in days:
+            candidate = QDateTime(day, time)
+            if candidate > after:
+                return candidate
+    return None
+
+
+def same_series(task, alarm):
+    """True si la tarea de la checklist es la de esta alarma recurrente.
+
+    Tarea y alarmas de una serie comparten texto, prioridad y regla (con su
+    ancla, la hora en que se creó la serie): dos series con el mismo texto
+    no se confunden.
+    """
+    rule = alarm.get("recurrence")
+    return bool(rule) and task.get("recurrence") == rule and (
+        task.get("text"), task.get("color", "green")) == (alarm.get("text"), alarm.get("color", "green"))
+
+
+def next_alarm(alarm, after):
+    """Copia de la alarma en su siguiente ocurrencia (None si no se repite)"""
+    rule = alarm.get("recurrence")
+    if not rule:
+        return None
+    when = next_occurrence(rule, after)
+    if when is None:
+        return None
+    return {
+        "text": alarm.get("text"),
+        "color": alarm.get("color", "green"),
+        "color_name": alarm.get("color_name", "🟢 Normal"),
+        "reminder_time": when.toString(Qt.ISODate),
+        "recurrence": rule,
+        "created": QDateTime.currentDateTime().toString(Qt.ISODate),
+    }
@@ -0,0 +1,148 @@
+import re
+import unicodedata
+
+_WORD = re.compile(r"\w+")
+# Cota superior para buscar términos por prefijo en el índice
+_PREFIX_END = "\U0010ffff"
+
+
+def normalize(text):
+    """Minúsculas y sin tildes: "Canción" y "cancion" son lo mismo"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokens(text):
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def query_trigrams(token):
+    """Trigramas que cubren la palabra sin solaparse (bastan para filtrar)"""
+    grams = [token[i:i + 3] for i in range(0, len(token) - 2, 3)]
+    if len(token) % 3:
+        grams.append(token[-3:])
+    return grams
+
+
+# --------------------------
+# Índice de búsqueda del historial
+# --------------------------
+class SearchIndex:
+    """Índice invertido del texto del historial, en la misma base SQLite.
+
+    Cada tarea guarda sus palabras normalizadas (search_terms) y los
+    trigramas de esas palabras (search_grams). Una palabra de la consulta
+    con tres letras o más se busca como subcadena intersectando las listas
+    de sus trigramas; una más corta, como prefijo de alguna palabra. Los
+    candidatos se confirman contra el texto normalizado (search_docs), así
+    que los trigramas sueltos nunca dan falsos positivos.
+
+    Las tareas nuevas se indexan con add(); las que falten las indexa
+    update() antes de buscar.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_docs (
+            history_id INTEGER PRIMARY KEY,
+            norm TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS search_terms (
+            term TEXT NOT NULL,
+            history_id INTEGER NOT NULL,
+            PRIMARY KEY (term, history_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS search_grams (
+            gram TEXT NOT NULL,
+            history_id INTEGER NOT NULL,
+            PRIMARY KEY (gram, history_id)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+
+    def add(self, history_id, text):
+        """Indexa una tarea nueva (llamar dentro de la transacción que la inserta)"""
+        self.add_many([(history_id, text)])
+
+    def add_many(self, rows):
+        docs, terms, grams = [], [], []
+        for history_id, text in rows:
+            words = tokens(text)
+            docs.append((history_id, " ".join(words)))
+            unique = set(words)
+            terms += [(w, history_id) for w in unique]
+            doc_grams = set()
+            for word in unique:
+                doc_grams |= trigrams(word)
+            grams += [(g, history_id) for g in doc_grams]
+        self.conn.executemany("INSERT OR REPLACE INTO search_docs (history_id, norm) VALUES (?, ?)", docs)
+        self.conn.executemany("INSERT OR IGNORE INTO search_terms (term, history_id) VALUES (?, ?)", terms)
+        self.conn.executemany("INSERT OR IGNORE INTO search_grams (gram, history_id) VALUES (?, ?)", grams)
+
+    def update(self):
+        """Indexa las tareas que aún no lo están; devuelve cuántas"""
+        indexed = self.conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0]
+        total = self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        if indexed >= total:
+            return 0
+        rows = self.conn.execute(
+            "SELECT id, text FROM history h WHERE NOT EXISTS "
+            "(SELECT 1 FROM search_docs d WHERE d.history_id = h.id) ORDER BY id").fetchall()
+        if rows:
+            with self.conn:
+                self.add_many([(row[0], row[1]) for row in rows])
+        return len(rows)
+
+    def rebuild(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM search_docs")
+            self.conn.execute("DELETE FROM search_terms")
+            self.conn.execute("DELETE FROM search_grams")
+        return self.update()
+
+    @staticmethod
+    def candidates(query):
+        """(subconsulta SQL de ids, parámetros, palabras) para la consulta
+        (no usa la conexión: sirve también sin abrir el índice)"""
+        words = tokens(query)
+        parts, params = [], []
+        for word in words:
+            if len(word) >= 3:
+                for gram in query_trigrams(word):
+                    parts.append("SELECT history_id FROM search_grams WHERE gram = ?")
+                    params.append(gram)
+            else:
+                parts.append("SELECT history_id FROM search_terms WHERE term >= ? AND term < ?")
+                params += [word, word + _PREFIX_END]
+        return " INTERSECT ".join(parts), params, words
+
+    def search(self, query, limit=200, date_from="", date_to="9999-12-31"):
+        """Filas del historial que contienen todas las palabras, la más reciente primero"""
+        ids_sql, params, words = self.candidates(query)
+        if not words:
+            return []
+        # instr confirma cada palabra sobre el texto normalizado
+        checks = " AND ".join("instr(d.norm, ?) > 0" for _ in words)
+        return self.conn.execute(
+            f"SELECT h.* FROM history h JOIN search_docs d ON d.history_id = h.id "
+            f"WHERE h.id IN ({ids_sql}) AND {checks} AND h.completed_date BETWEEN ? AND ? "
+            f"ORDER BY h.completed_date DESC, h.id DESC LIMIT ?",
+            params + words + [date_from, date_to, limit]).fetchall()
+
+
+def matches(text, query):
+    """Misma regla que SearchIndex.search, sin índice (backend JSON)"""
+    words = tokens(query)
+    doc = tokens(text)
+    norm = " ".join(doc)
+    # Palabras cortas: prefijo de alguna palabra; las demás: subcadena
+    return bool(words) and all(
+        word in norm if len(word) >= 3 else any(w.startswith(word) for w in doc)
+        for word in words)
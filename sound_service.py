@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+from PySide6.QtCore import QObject, QTimer, QUrl
+
+_sound_path = None
+
+
+def find_alarm_sound():
+    """Ruta de alarm.wav; se busca en disco una sola vez por proceso"""
+    global _sound_path
+    if _sound_path is not None:
+        return _sound_path
+    # Primero busca en recursos embebidos (modo compilado)
+    possible_paths = []
+    if hasattr(sys, '_MEIPASS'):
+        possible_paths.append(Path(sys._MEIPASS) / "alarm.wav")
+    # Luego busca en rutas normales
+    possible_paths += [
+        Path("alarm.wav"),
+        Path("sound.wav"),
+        Path.home() / "Documents" / "ProductivityApp" / "alarm.wav",
+        Path.home() / "Desktop" / "alarm.wav",
+        Path.home() / "OneDrive" / "Escritorio" / "alarm.wav",
+    ]
+    _sound_path = next((str(p.resolve()) for p in possible_paths if p.exists()), "")
+    if _sound_path:
+        print("✅ Encontrado archivo de sonido:", _sound_path)
+    else:
+        print("❌ No se encontró ningún archivo de sonido")
+    return _sound_path
+
+
+# --------------------------
+# Sonido de alarma compartido
+# --------------------------
+class SoundService(QObject):
+    """Un único QSoundEffect para todas las notificaciones.
+
+    QtMultimedia se importa recién cuando hay alguna alarma programada
+    (preload) o al sonar la primera. El archivo se busca y se decodifica
+    una sola vez; QSoundEffect lo carga en segundo plano.
+
+    Cada notificación que suena se registra con start(owner). Mientras haya
+    al menos una, el sonido se repite cada REPEAT_SECS, así que N alarmas
+    simultáneas suenan como una sola. La repetición usa los ticks del
+    TimerService, sin un timer propio.
+    """
+    REPEAT_SECS = 2
+    VOLUME = 0.8
+
+    def __init__(self, timers, parent=None):
+        super().__init__(parent)
+        self._effect = None
+        # QtMultimedia no cargó (falta un backend de audio): se avisa una vez
+        self._failed = False
+        self._owners = set()
+        self._ticks = 0
+        self._timers = timers
+        self._timers.tick.connect(self._on_tick)
+
+    def preload(self):
+        # Se difiere para no demorar la primera pintura de la ventana
+        if self._effect is None and not self._failed:
+            QTimer.singleShot(0, self._load)
+
+    def _load(self):
+        """True si el sonido está listo para sonar (cargado y con archivo)"""
+        if self._effect is None and not self._failed:
+            try:
+                # Importar QtMultimedia cuesta; no hace falta si nunca suena nada
+                from PySide6.QtMultimedia import QSoundEffect
+                effect = QSoundEffect(self)
+                path = find_alarm_sound()
+                if path:
+                    effect.setSource(QUrl.fromLocalFile(path))
+                    effect.setVolume(self.VOLUME)
+            except Exception as e:
+                # Sin sonido las alarmas se siguen mostrando
+                print("⚠️ Error inicializando sonido:", e)
+                self._failed = True
+                return False
+            self._effect = effect
+        return self._effect is not None and not self._effect.source().isEmpty()
+
+    def start(self, owner):
+        # El dueño se registra solo si hay algo que sonar: sin archivo no se
+        # pide el tick de "sound" y el timer compartido puede dormir
+        if not self._owners and not self._load():
+            return
+        first = not self._owners
+        self._owners.add(id(owner))
+        if first:
+            self._play()
+            self._timers.acquire("sound")
+            self._ticks = 0
+            print("🔊 Reproduciendo sonido de alarma")
+
+    def play_once(self):
+        """Un solo aviso, sin repetición (resumen de alarmas perdidas)"""
+        if self._load() and not self._owners:
+            self._play()
+
+    def stop(self, owner):
+        self._owners.discard(id(owner))
+        if not self._owners:
+            self._timers.release("sound")
+            if self._effect is not None:
+                self._effect.stop()
+
+    def _on_tick(self, now):
+        if not self._owners:
+            return
+        self._ticks += 1
+        if self._ticks % self.REPEAT_SECS == 0:
+            self._play()
+
+    def _play(self):
+        if self._effect is None or self._effect.source().isEmpty():
+            return
+        try:
+            # Si ya está sonando, reiniciarlo para que se oiga limpio
+            self._effect.stop()
+            self._effect.play()
+        except Exception as e:
+            print("Error reproduciendo sonido:", e)
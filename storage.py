@@ -0,0 +1,583 @@
+import getpass
+import json
+import os
+import sqlite3
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+
+from history_journal import HistoryJournal
+from history_stats import HistoryStats, summarize_entries
+from query_engine import SortedHistory, count_sql, filter_rows, register_functions, select_sql, sort_rows
+from search_index import SearchIndex, matches
+
+# Carpeta de datos alternativa (mediciones y pruebas: nunca tocan los datos reales)
+DATA_DIR_ENV = "PRODUCTIVITY_DATA_DIR"
+# Identifica al usuario dueño de una carpeta de datos (y de sus copias exportadas)
+PROFILE_FILE = "perfil.json"
+DB_FILE = "productivity.db"
+
+
+def default_data_dir():
+    """Carpeta de datos compartida por el widget y el panel de administración"""
+    if os.environ.get(DATA_DIR_ENV):
+        return Path(os.environ[DATA_DIR_ENV])
+    return Path.home() / "Documents" / "ProductivityApp"
+
+
+def load_profile(data_dir, create=False):
+    """{"user_id", "user_name"} de perfil.json en data_dir (None si no hay).
+
+    Con create=True lo genera la primera vez: el id es aleatorio y no cambia,
+    así un perfil exportado a otra carpeta sigue siendo el mismo usuario.
+    """
+    path = Path(data_dir) / PROFILE_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        if profile.get("user_id"):
+            return {"user_id": str(profile["user_id"]), "user_name": str(profile.get("user_name") or "")}
+    except (OSError, json.JSONDecodeError, AttributeError):
+        pass
+    if not create:
+        return None
+    try:
+        user_name = getpass.getuser()
+    except (OSError, KeyError):
+        user_name = ""
+    profile = {"user_id": uuid.uuid4().hex, "user_name": user_name}
+    atomic_write_json(path, profile)
+    return profile
+
+
+def iso_to_msecs(iso_str):
+    """Convierte un reminder_time ISO a milisegundos epoch (None si no es válido)"""
+    try:
+        return int(datetime.fromisoformat(iso_str).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+def check_alarms(alarms):
+    """Lanza ValueError si alguna alarma no tiene un reminder_time ISO válido:
+    no tendría vencimiento, así que nunca recibiría id ni se podría borrar"""
+    for alarm in alarms:
+        if iso_to_msecs(alarm.get("reminder_time")) is None:
+            raise ValueError(f"Alarma sin hora válida: {alarm.get('text')!r} ({alarm.get('reminder_time')!r})")
+
+
+def atomic_write_json(path, data):
+    """Escribe en un temporal y lo reemplaza: nunca queda un JSON truncado"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _dump_rule(rule):
+    # La regla de repetición se guarda una vez por alarma, como JSON
+    return json.dumps(rule, ensure_ascii=False) if rule else None
+
+
+def _load_rule(text):
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def normalize_history_entry(entry, user_id=None):
+    """Las entradas antiguas del historial pueden ser solo el texto de la tarea
+    (y las anteriores a los perfiles no tienen usuario: son del dueño)"""
+    if isinstance(entry, str):
+        return {"text": entry, "color": "green", "color_name": "🟢", "completed": None, "user_id": user_id}
+    return {
+        "text": entry.get("text", ""),
+        "color": entry.get("color", "green"),
+        "color_name": entry.get("color_name", "🟢"),
+        "completed": entry.get("completed"),
+        "user_id": entry.get("user_id") or user_id,
+    }
+
+
+# --------------------------
+# Interfaz de almacenamiento
+# --------------------------
+class HistoryReader(ABC):
+    """Consultas sobre el historial de tareas completadas.
+
+    Las fechas del historial son strings yyyy-MM-dd y las horas ISO 8601, así
+    que los rangos se pueden comparar como texto. Las tareas llevan el
+    user_id de su dueño (ver load_profile).
+    """
+
+    user_id = None
+
+    @abstractmethod
+    def history_range(self, date_from, date_to):
+        """[(fecha, tarea)] con date_from <= fecha <= date_to, en orden ascendente"""
+
+    def history_for_date(self, date_str):
+        return [entry for _, entry in self.history_range(date_str, date_str)]
+
+    @abstractmethod
+    def query_history(self, query, limit=None, after=None):
+        """[(fecha, tarea)] de una consulta de query_engine.make_query, en su
+        orden; after es query_engine.cursor de la última fila ya leída"""
+
+    def count_history(self, query):
+        """{color: cantidad} de las tareas de la consulta"""
+        counts = {}
+        for _, entry in self.query_history(query):
+            counts[entry["color"]] = counts.get(entry["color"], 0) + 1
+        return counts
+
+    @abstractmethod
+    def history_stats(self, today=None):
+        """Resumen del historial (ver history_stats.summarize)"""
+
+    def interrupt(self):
+        """Corta la consulta en curso (se puede llamar desde otro hilo)"""
+
+    def close(self):
+        pass
+
+
+class Storage(HistoryReader):
+    """Almacenamiento de tareas activas, alarmas e historial (widget y panel)"""
+
+    # Historial
+    @abstractmethod
+    def add_history(self, date_str, entry):
+        """Guarda la tarea completada y la devuelve normalizada"""
+
+    @abstractmethod
+    def history_dates(self):
+        """[(fecha, cantidad)] de la más reciente a la más antigua"""
+
+    @abstractmethod
+    def search_history(self, query, limit=200):
+        """[(fecha, tarea)] cuyo texto contiene todas las palabras de query
+        (sin distinguir mayúsculas ni tildes), de la más reciente a la más antigua"""
+
+    def rebuild_history_stats(self):
+        """Recalcula los contadores del historial desde cero"""
+
+    # Tareas activas y alarmas
+    @abstractmethod
+    def apply_batch(self, add_tasks=(), remove_tasks=(), add_alarms=(), remove_alarms=()):
+        """Aplica un lote de cambios en una sola escritura.
+
+        Las tareas y alarmas agregadas reciben su "id" en el mismo dict. Una
+        alarma sin hora válida rechaza el lote entero (check_alarms) antes
+        de escribir nada.
+        """
+
+    def add_alarm(self, alarm):
+        self.apply_batch(add_alarms=[alarm])
+        return alarm
+
+    def remove_alarms(self, alarm_ids):
+        self.apply_batch(remove_alarms=alarm_ids)
+
+    @abstractmethod
+    def load_alarms(self, after_iso=None):
+        """Alarmas pendientes (opcionalmente solo las posteriores a after_iso)"""
+
+    def add_task(self, task):
+        self.apply_batch(add_tasks=[task])
+        return task
+
+    def remove_task(self, task_id):
+        self.apply_batch(remove_tasks=[task_id])
+
+    @abstractmethod
+    def load_tasks(self):
+        """Tareas activas del dueño del almacenamiento"""
+
+    @abstractmethod
+    def change_token(self):
+        """Valor que cambia cuando otro proceso modifica el historial"""
+
+
+# --------------------------
+# Backend JSON (formato original)
+# --------------------------
+class JsonStorage(Storage):
+    """historial.json + journal, alarms.json y tareas.json"""
+
+    def __init__(self, data_dir, user_id=None):
+        data_dir = Path(data_dir)
+        self.user_id = user_id
+        self.journal = HistoryJournal(data_dir / "historial.json")
+        self.alarms_file = data_dir / "alarms.json"
+        self.tasks_file = data_dir / "tareas.json"
+        self._alarms = self._read_list(self.alarms_file)
+        self._tasks = self._read_list(self.tasks_file)
+        self._next_id = 1 + max((item.get("id") or 0 for item in self._alarms + self._tasks), default=0)
+        self._sorted = None
+        self._sorted_token = None
+
+    def add_history(self, date_str, entry):
+        entry = normalize_history_entry(entry, self.user_id)
+        self.journal.append(date_str, entry)
+        return entry
+
+    def history_dates(self):
+        data = self.journal.load()
+        return [(d, len(data[d])) for d in sorted(data, reverse=True)]
+
+    def history_range(self, date_from, date_to):
+        return self._sorted_history().range(date_from, date_to)
+
+    def query_history(self, query, limit=None, after=None):
+        rows = filter_rows(self.history_range(query["date_from"], query["date_to"]), query)
+        return sort_rows(rows, query, limit, after)
+
+    def _sorted_history(self):
+        # Se rearma solo si los archivos del historial cambiaron
+        token = self.change_token()
+        if self._sorted is None or token != self._sorted_token:
+            data = self.journal.load()
+            self._sorted = SortedHistory({d: [normalize_history_entry(e, self.user_id) for e in entries]
+                                          for d, entries in data.items()})
+            self._sorted_token = token
+        return self._sorted
+
+    def search_history(self, query, limit=200):
+        # Sin índice: recorre todo el historial (solo para el formato antiguo)
+        data = self.journal.load()
+        found = []
+        for d in sorted(data, reverse=True):
+            for entry in reversed(data[d]):
+                entry = normalize_history_entry(entry, self.user_id)
+                if matches(entry["text"], query):
+                    found.append((d, entry))
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def history_stats(self, today=None):
+        return summarize_entries(self.history_range("", "9999-12-31"), today)
+
+    def apply_batch(self, add_tasks=(), remove_tasks=(), add_alarms=(), remove_alarms=()):
+        # Cada archivo afectado se escribe una sola vez
+        check_alarms(add_alarms)
+        if add_tasks or remove_tasks:
+            self._tasks = self._merge(self._tasks, add_tasks, remove_tasks)
+            atomic_write_json(self.tasks_file, self._tasks)
+        if add_alarms or remove_alarms:
+            self._alarms = self._merge(self._alarms, add_alarms, remove_alarms)
+            atomic_write_json(self.alarms_file, self._alarms)
+
+    def _merge(self, items, added, removed_ids):
+        for item in added:
+            item["id"] = self._take_id()
+            item.setdefault("user_id", self.user_id)
+        removed_ids = set(removed_ids)
+        return [item for item in items if item.get("id") not in removed_ids] + [dict(item) for item in added]
+
+    def load_alarms(self, after_iso=None):
+        after = iso_to_msecs(after_iso) if after_iso else None
+        return [dict(a) for a in self._alarms
+                if after is None or (iso_to_msecs(a.get("reminder_time")) or 0) > after]
+
+    def load_tasks(self):
+        # Las tareas sin usuario son anteriores a los perfiles: del dueño
+        return [dict(t) for t in self._tasks if t.get("user_id") in (None, self.user_id)]
+
+    def change_token(self):
+        token = []
+        for path in (self.journal.snapshot_path, self.journal.compacting_path, self.journal.journal_path):
+            try:
+                st = path.stat()
+                token.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                token.append(None)
+        return tuple(token)
+
+    def _take_id(self):
+        self._next_id += 1
+        return self._next_id - 1
+
+    @staticmethod
+    def _read_list(path):
+        if not path.exists():
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return []
+
+
+# --------------------------
+# Backend SQLite
+# --------------------------
+class SqliteStorage(Storage):
+    """Base SQLite en modo WAL con índices por fecha, vencimiento y prioridad"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            completed_date TEXT NOT NULL,
+            text TEXT NOT NULL,
+            color TEXT NOT NULL DEFAULT 'green',
+            color_name TEXT,
+            completed TEXT,
+            user_id TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_date ON history(completed_date);
+        CREATE INDEX IF NOT EXISTS idx_history_color ON history(color, completed_date);
+
+        CREATE TABLE IF NOT EXISTS alarms (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            color TEXT NOT NULL DEFAULT 'green',
+            color_name TEXT,
+            reminder_time TEXT NOT NULL,
+            due_ms INTEGER NOT NULL,
+            created TEXT,
+            recurrence TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_alarms_due ON alarms(due_ms);
+
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            color TEXT NOT NULL DEFAULT 'green',
+            color_name TEXT,
+            has_reminder INTEGER NOT NULL DEFAULT 0,
+            reminder_time TEXT,
+            recurrence TEXT,
+            user_id TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(color, reminder_time);
+
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_path, legacy_dir=None, user_id=None):
+        self.db_path = Path(db_path)
+        self.user_id = user_id
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        register_functions(self.conn)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+            # Bases creadas antes de las alarmas recurrentes
+            self._add_column("alarms", "recurrence", "TEXT")
+            self._add_column("tasks", "recurrence", "TEXT")
+            # Bases creadas antes de los perfiles de usuario
+            self._add_column("history", "user_id", "TEXT")
+            self._add_column("tasks", "user_id", "TEXT")
+            # Una consulta de un usuario lee solo su parte del historial
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_user ON history(user_id, completed_date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks(user_id)")
+        if legacy_dir is not None:
+            self._migrate_json(Path(legacy_dir))
+        if user_id is not None:
+            # Lo guardado antes de los perfiles es del dueño (usa idx_history_user)
+            with self.conn:
+                self.conn.execute("UPDATE history SET user_id = ? WHERE user_id IS NULL", (user_id,))
+                self.conn.execute("UPDATE tasks SET user_id = ? WHERE user_id IS NULL", (user_id,))
+        # Índice de búsqueda del historial (se pone al día en la primera búsqueda)
+        self.search = SearchIndex(self.conn)
+        # Contadores por día, semana, mes, color y racha
+        self.stats = HistoryStats(self.conn)
+
+    def _migrate_json(self, legacy_dir):
+        """Importa una sola vez historial.json (+ journal) y alarms.json"""
+        if self._get_meta("json_migrated"):
+            return
+        legacy = JsonStorage(legacy_dir)
+        history = legacy.history_range("", "9999-12-31")
+        # Una alarma sin hora válida nunca sonaría: no se migra
+        alarms = [a for a in legacy.load_alarms() if iso_to_msecs(a.get("reminder_time")) is not None]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO history (completed_date, text, color, color_name, completed) VALUES (?, ?, ?, ?, ?)",
+                [(d, e["text"], e["color"], e["color_name"], e["completed"]) for d, e in history])
+            for alarm in alarms:
+                self._insert_alarm(alarm)
+            self._set_meta("json_migrated", datetime.now().isoformat(timespec="seconds"))
+        if history or alarms:
+            print(f"✅ Migradas {len(history)} tareas del historial y {len(alarms)} alarmas a SQLite")
+
+    def _add_column(self, table, column, declaration):
+        columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # Historial
+    def add_history(self, date_str, entry):
+        entry = normalize_history_entry(entry, self.user_id)
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO history (completed_date, text, color, color_name, completed, user_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (date_str, entry["text"], entry["color"], entry["color_name"], entry["completed"],
+                 entry["user_id"]))
+            self.search.add(cur.lastrowid, entry["text"])
+            self.stats.add(date_str, entry["color"])
+        return dict(entry, id=cur.lastrowid)
+
+    def history_dates(self):
+        rows = self.conn.execute(
+            "SELECT completed_date, COUNT(*) AS n FROM history "
+            "GROUP BY completed_date ORDER BY completed_date DESC")
+        return [(row["completed_date"], row["n"]) for row in rows]
+
+    def history_range(self, date_from, date_to):
+        rows = self.conn.execute(
+            "SELECT * FROM history WHERE completed_date BETWEEN ? AND ? "
+            "ORDER BY completed_date, id", (date_from, date_to))
+        return [(row["completed_date"], self._history_row(row)) for row in rows]
+
+    def search_history(self, query, limit=200):
+        indexed = self.search.update()
+        if indexed:
+            print(f"🔎 Indexadas {indexed} tareas del historial para búsqueda")
+        rows = self.search.search(query, limit)
+        return [(row["completed_date"], self._history_row(row)) for row in rows]
+
+    def query_history(self, query, limit=None, after=None):
+        if query["text"]:
+            self.search.update()
+        sql, params = select_sql(query, self.search, limit, after)
+        return [(row["completed_date"], self._history_row(row)) for row in self.conn.execute(sql, params)]
+
+    def count_history(self, query):
+        if query["text"]:
+            self.search.update()
+        sql, params = count_sql(query, self.search)
+        return {color: n for color, n in self.conn.execute(sql, params)}
+
+    def history_stats(self, today=None):
+        if self.stats.update():
+            print("📊 Contadores del historial reconstruidos")
+        return self.stats.summary(today)
+
+    def rebuild_history_stats(self):
+        self.stats.rebuild()
+
+    @staticmethod
+    def _history_row(row):
+        return {
+            "id": row["id"],
+            "text": row["text"],
+            "color": row["color"],
+            "color_name": row["color_name"],
+            "completed": row["completed"],
+            "user_id": row["user_id"],
+        }
+
+    # Alarmas
+    def _insert_alarm(self, alarm):
+        due = iso_to_msecs(alarm["reminder_time"])
+        cur = self.conn.execute(
+            "INSERT INTO alarms (text, color, color_name, reminder_time, due_ms, created, recurrence)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (alarm.get("text", ""), alarm.get("color", "green"), alarm.get("color_name") or "🟢 Normal",
+             alarm["reminder_time"], due, alarm.get("created"), _dump_rule(alarm.get("recurrence"))))
+        alarm["id"] = cur.lastrowid
+        return alarm
+
+
+    def load_alarms(self, after_iso=None):
+        after = iso_to_msecs(after_iso) if after_iso else None
+        if after is None:
+            rows = self.conn.execute("SELECT * FROM alarms ORDER BY due_ms")
+        else:
+            rows = self.conn.execute("SELECT * FROM alarms WHERE due_ms > ? ORDER BY due_ms", (after,))
+        return [{
+            "id": row["id"],
+            "text": row["text"],
+            "color": row["color"],
+            "color_name": row["color_name"],
+            "reminder_time": row["reminder_time"],
+            "created": row["created"],
+            "recurrence": _load_rule(row["recurrence"]),
+        } for row in rows]
+
+    # Tareas activas
+    def _insert_task(self, task):
+        cur = self.conn.execute(
+            "INSERT INTO tasks (text, color, color_name, has_reminder, reminder_time, recurrence, user_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (task.get("text", ""), task.get("color", "green"), task.get("color_name") or "🟢 Normal",
+             int(bool(task.get("has_reminder"))), task.get("reminder_time"),
+             _dump_rule(task.get("recurrence")), task.get("user_id") or self.user_id))
+        task["id"] = cur.lastrowid
+        return task
+
+    def apply_batch(self, add_tasks=(), remove_tasks=(), add_alarms=(), remove_alarms=()):
+        # Un solo commit para todo el lote
+        check_alarms(add_alarms)
+        with self.conn:
+            for task in add_tasks:
+                self._insert_task(task)
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", [(i,) for i in remove_tasks])
+            for alarm in add_alarms:
+                self._insert_alarm(alarm)
+            self.conn.executemany("DELETE FROM alarms WHERE id = ?", [(i,) for i in remove_alarms])
+
+    def load_tasks(self):
+        if self.user_id is None:
+            rows = self.conn.execute("SELECT * FROM tasks ORDER BY id")
+        else:
+            rows = self.conn.execute("SELECT * FROM tasks WHERE user_id = ? ORDER BY id", (self.user_id,))
+        return [{
+            "id": row["id"],
+            "text": row["text"],
+            "color": row["color"],
+            "color_name": row["color_name"],
+            "has_reminder": bool(row["has_reminder"]),
+            "reminder_time": row["reminder_time"],
+            "recurrence": _load_rule(row["recurrence"]),
+            "user_id": row["user_id"],
+        } for row in rows]
+
+    def change_token(self):
+        # data_version solo cambia con commits de otras conexiones
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def interrupt(self):
+        self.conn.interrupt()
+
+    def close(self):
+        self.conn.close()
+
+
+def open_storage(data_dir=None, backend="sqlite", create_profile=True):
+    """Abre el almacenamiento en data_dir ("sqlite" por defecto, o "json")
+    a nombre del usuario de su perfil.json.
+
+    Con create_profile=False no se genera perfil.json (panel de
+    administración): sin él, el almacenamiento queda sin usuario.
+    """
+    data_dir = Path(data_dir) if data_dir else default_data_dir()
+    data_dir.mkdir(parents=True, exist_ok=True)
+    profile = load_profile(data_dir, create=create_profile)
+    user_id = profile["user_id"] if profile else None
+    if backend == "json":
+        return JsonStorage(data_dir, user_id)
+    return SqliteStorage(data_dir / DB_FILE, legacy_dir=data_dir, user_id=user_id)
@@ -0,0 +1,212 @@
+import bisect
+import itertools
+import sys
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QDateTime, QEvent, QRect, QSize, Qt, Signal
+from PySide6.QtWidgets import QStyledItemDelegate
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+import recurrence
+
+TaskRole = Qt.UserRole + 1
+
+NO_DUE = sys.maxsize
+
+# (fondo, barra de prioridad, texto) por color
+PRIORITY_COLORS = {
+    "red": ((255, 100, 100, 38), "#ff4444", "#ffb4b4"),
+    "yellow": ((255, 255, 100, 38), "#ffff44", "#ffffb4"),
+    "blue": ((100, 100, 255, 38), "#4444ff", "#b4b4ff"),
+    "green": ((100, 255, 100, 38), "#44ff44", "#b4ffb4"),
+}
+
+
+def task_due_msecs(task):
+    """Hora del recordatorio en ms epoch (NO_DUE si no tiene)"""
+    rt = task.get("reminder_time")
+    if isinstance(rt, QDateTime):
+        return rt.toMSecsSinceEpoch() if rt.isValid() else NO_DUE
+    if isinstance(rt, str) and rt:
+        dt = QDateTime.fromString(rt, Qt.ISODate)
+        if dt.isValid():
+            return dt.toMSecsSinceEpoch()
+    return NO_DUE
+
+
+def task_bucket(task):
+    """Alertas rojas primero, luego otras alertas, luego tareas normales"""
+    if task.get("has_reminder"):
+        return 0 if task.get("color") == "red" else 1
+    return 2
+
+
+# --------------------------
+# Modelo de la checklist
+# --------------------------
+class TaskListModel(QAbstractListModel):
+    """Tareas activas ordenadas por (prioridad, vencimiento, orden de alta).
+
+    Las claves se mantienen ordenadas y cada alta o baja se ubica con bisect,
+    así que la vista recibe una sola fila insertada o eliminada por cambio.
+    Las tareas normales son marcables; las alertas (con recordatorio) no.
+    """
+    check_toggled = Signal(object, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._tasks = []
+        self._key_of = {}   # id(task) -> clave
+        self._checked = set()
+        self._seq = itertools.count()
+
+    def add_task(self, task):
+        key = (task_bucket(task), task_due_msecs(task), next(self._seq))
+        row = bisect.bisect_right(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._tasks.insert(row, task)
+        self._key_of[id(task)] = key
+        self.endInsertRows()
+        return row
+
+    def row_of(self, task):
+        key = self._key_of.get(id(task))
+        if key is None:
+            return -1
+        return bisect.bisect_left(self._keys, key)
+
+    def remove_task(self, task):
+        row = self.row_of(task)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._tasks[row]
+        del self._key_of[id(task)]
+        self._checked.discard(id(task))
+        self.endRemoveRows()
+        return True
+
+    def set_checked(self, task, checked):
+        row = self.row_of(task)
+        if row >= 0:
+            self.setData(self.index(row), Qt.Checked if checked else Qt.Unchecked, Qt.CheckStateRole)
+
+    def find(self, predicate):
+        return next((task for task in self._tasks if predicate(task)), None)
+
+    def task_at(self, row):
+        return self._tasks[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self._tasks[index.row()].get("has_reminder"):
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        if role == Qt.DisplayRole:
+            return task.get("text", "")
+        if role == TaskRole:
+            return task
+        if role == Qt.CheckStateRole and not task.get("has_reminder"):
+            return Qt.Checked if id(task) in self._checked else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            due = task_due_msecs(task)
+            if task.get("has_reminder") and due != NO_DUE:
+                when = QDateTime.fromMSecsSinceEpoch(due).toString("dd/MM/yyyy HH:mm")
+                repeat = recurrence.describe(task.get("recurrence"))
+                return f"{task.get('text', '')}\nAlarma: {when} {repeat}".rstrip()
+            return task.get("text", "")
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        task = self._tasks[index.row()]
+        if task.get("has_reminder"):
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        if checked == (id(task) in self._checked):
+            return True
+        if checked:
+            self._checked.add(id(task))
+        else:
+            self._checked.discard(id(task))
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.check_toggled.emit(task, checked)
+        return True
+
+
+# --------------------------
+# Delegate de la checklist
+# --------------------------
+class TaskDelegate(QStyledItemDelegate):
+    """Pinta cada tarea (barra de prioridad, casilla, tachado) sin widgets"""
+    ROW_HEIGHT = 34
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QFont()
+        self.font.setPixelSize(13)
+        self.checked_font = QFont(self.font)
+        self.checked_font.setStrikeOut(True)
+        self.metrics = QFontMetrics(self.font)
+        self.checked_metrics = QFontMetrics(self.checked_font)
+        self.colors = {
+            name: (QColor(*bg), QColor(bar), QColor(text))
+            for name, (bg, bar, text) in PRIORITY_COLORS.items()
+        }
+        self.checked_text = QColor("#888")
+        self.box_border = QColor("#555")
+        self.box_background = QColor("#2a2d2e")
+        self.box_checked = QColor("#28a745")
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskRole)
+        checkable = not task.get("has_reminder")
+        checked = checkable and index.data(Qt.CheckStateRole) == Qt.Checked
+        background, bar, text_color = self.colors.get(task.get("color"), self.colors["green"])
+        rect = option.rect.adjusted(2, 2, -2, -2)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.fillRect(QRect(rect.left(), rect.top(), 3, rect.height()), bar)
+
+        x = rect.left() + 9
+        if checkable:
+            box = QRect(x, rect.center().y() - 7, 16, 16)
+            painter.setPen(self.box_checked if checked else self.box_border)
+            painter.setBrush(self.box_checked if checked else self.box_background)
+            painter.drawRoundedRect(box, 3, 3)
+            x = box.right() + 9
+
+        font, metrics = (self.checked_font, self.checked_metrics) if checked else (self.font, self.metrics)
+        text_rect = QRect(x, rect.top(), rect.right() - x - 6, rect.height())
+        painter.setFont(font)
+        painter.setPen(self.checked_text if checked else text_color)
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft,
+                         metrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, text_rect.width()))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def editorEvent(self, event, model, option, index):
+        # Como un QCheckBox: un clic en cualquier parte de la fila la marca
+        if not (index.flags() & Qt.ItemIsUserCheckable):
+            return False
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.position().toPoint()):
+                checked = index.data(Qt.CheckStateRole) == Qt.Checked
+                return model.setData(index, Qt.Unchecked if checked else Qt.Checked, Qt.CheckStateRole)
+        return False
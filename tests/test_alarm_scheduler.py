@@ -0,0 +1,73 @@
+# test_alarm_scheduler.py
+# El heap de alarmas: vencidas en una pasada, borrar y reprogramar.
+#
+#   python -m unittest discover tests
+import os
+import sys
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QDateTime, Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from alarm_scheduler import AlarmScheduler  # noqa: E402
+
+
+def alarm(text, secs):
+    """Alarma que vence secs segundos después de ahora (negativo: ya venció)"""
+    when = QDateTime.currentDateTime().addSecs(secs)
+    return {"text": text, "reminder_time": when.toString(Qt.ISODate)}
+
+
+class AlarmSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.scheduler = AlarmScheduler()
+        self.fired = []
+        self.scheduler.alarms_due.connect(self.fired.append)
+
+    def fire(self):
+        self.scheduler._fire_due()
+        return [a["text"] for batch in self.fired for a in batch]
+
+    def test_due_alarms_fire_in_one_pass(self):
+        for text, secs in (("b", -20), ("a", -30), ("futura", 3600), ("c", -10)):
+            self.scheduler.add(alarm(text, secs))
+        self.assertEqual(self.fire(), ["a", "b", "c"])
+        self.assertEqual(len(self.fired), 1)
+        self.assertEqual([a["text"] for a in self.scheduler.pending()], ["futura"])
+
+    def test_remove_then_add_fires_once(self):
+        data = alarm("a", -5)
+        self.scheduler.add(data)
+        self.assertTrue(self.scheduler.remove(data))
+        self.assertFalse(self.scheduler.remove(data))
+        self.scheduler.add(data)
+        self.assertEqual(self.fire(), ["a"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_add_twice_fires_once(self):
+        data = alarm("a", 3600)
+        self.scheduler.add(data)
+        data["reminder_time"] = alarm("a", -5)["reminder_time"]
+        self.scheduler.add(data)
+        self.assertEqual(len(self.scheduler), 1)
+        self.assertEqual(self.fire(), ["a"])
+        # La entrada vieja tampoco suena cuando llega su hora
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertFalse(any(entry[3] for entry in self.scheduler._heap))
+
+    def test_remove_after_add_twice_cancels_both(self):
+        data = alarm("a", -5)
+        self.scheduler.add(data)
+        self.scheduler.add(data)
+        self.scheduler.remove(data)
+        self.assertEqual(self.fire(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
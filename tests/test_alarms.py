@@ -0,0 +1,103 @@
+# test_alarms.py
+# Una alarma que suena antes de que se guarde no debe volver al reiniciar.
+#
+#   python -m unittest discover tests
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QDateTime, Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from storage import DATA_DIR_ENV, open_storage  # noqa: E402
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        QApplication.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+class FiredAlarmTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.environ.get(DATA_DIR_ENV)
+        os.environ[DATA_DIR_ENV] = self.tmp.name
+
+    def tearDown(self):
+        if self.previous is None:
+            os.environ.pop(DATA_DIR_ENV, None)
+        else:
+            os.environ[DATA_DIR_ENV] = self.previous
+        self.tmp.cleanup()
+
+    def start_widget(self):
+        import widget
+        w = widget.ProductivityWidget()
+        # La carga de tareas y alarmas se difiere al loop de eventos
+        loaded = []
+        w.data_loaded.connect(lambda: loaded.append(True))
+        self.assertTrue(wait_until(lambda: loaded))
+        return w
+
+    def test_fired_before_flush_does_not_come_back(self):
+        w = self.start_widget()
+        # Vence ya: suena en la próxima vuelta del loop, antes del debounce
+        alarm = {"text": "Llamar al cliente", "color": "red", "color_name": "🔴 Alta",
+                 "reminder_time": QDateTime.currentDateTime().toString(Qt.ISODate)}
+        w.store_alarm(alarm)
+        self.assertTrue(w.write_behind.has_pending())
+        self.assertTrue(wait_until(lambda: len(w.alarm_scheduler) == 0))
+        self.assertFalse(w.write_behind.has_pending())
+        w.shutdown()
+        w.deleteLater()
+
+        storage = open_storage(self.tmp.name)
+        self.assertEqual(storage.load_alarms(), [])
+        storage.close()
+
+        # Al reiniciar no aparece como alarma perdida
+        w = self.start_widget()
+        self.assertIsNone(w.missed_notification)
+        self.assertEqual(len(w.alarm_scheduler), 0)
+        w.shutdown()
+        w.deleteLater()
+
+    def test_next_occurrence_updates_its_own_series(self):
+        import recurrence
+        w = self.start_widget()
+        # Dos series con el mismo texto: solo avanza la de la alarma que sonó
+        tasks = []
+        for kind, anchor in (("daily", "2099-01-01T09:00:00"), ("weekdays", "2099-01-01T18:00:00")):
+            task = {"text": "Revisar correo", "color": "green", "color_name": "🟢 Normal", "has_reminder": True,
+                    "reminder_time": anchor, "recurrence": recurrence.make_rule(kind, anchor)}
+            w.add_task(task)
+            w.persist_task(task)
+            tasks.append(task)
+        daily, weekdays = tasks
+        alarm = dict(weekdays, reminder_time="2099-01-01T18:00:00")
+        w.schedule_next_occurrence(alarm, QDateTime.fromString(alarm["reminder_time"], Qt.ISODate))
+
+        self.assertEqual(daily["reminder_time"], "2099-01-01T09:00:00")
+        self.assertEqual(weekdays["reminder_time"], "2099-01-02T18:00:00")
+        w.complete_alarm_task(alarm)
+        # Las recurrentes siguen en la checklist al completar su alarma
+        self.assertEqual(w.task_model.rowCount(), 2)
+        w.shutdown()
+        w.deleteLater()
+
+
+if __name__ == "__main__":
+    unittest.main()
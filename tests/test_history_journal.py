@@ -0,0 +1,56 @@
+# test_history_journal.py
+# Dos tareas iguales completadas en el mismo segundo se conservan, y repetir
+# un journal rotado que ya se había volcado no las duplica.
+#
+#   python -m unittest discover tests
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from history_journal import HistoryJournal  # noqa: E402
+
+ENTRY = {"text": "Regar", "color": "green", "color_name": "🟢", "completed": "2025-03-01T10:00:00"}
+
+
+class JournalDedupeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal = HistoryJournal(Path(self.tmp.name) / "historial.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def texts(self):
+        return [e["text"] for e in self.journal.load().get("2025-03-01", [])]
+
+    def test_identical_completions_are_kept(self):
+        self.journal.append("2025-03-01", ENTRY)
+        self.journal.compact()
+        # La segunda llega al journal rotado con su gemela ya en el snapshot
+        self.journal.append("2025-03-01", ENTRY)
+        self.journal.compact()
+        self.assertEqual(self.texts(), ["Regar", "Regar"])
+
+    def test_replayed_rotated_journal_is_dropped(self):
+        self.journal.append("2025-03-01", ENTRY)
+        self.journal.append("2025-03-01", ENTRY)
+        # Cierre a mitad: el snapshot se escribió pero el journal rotado quedó
+        shutil.move(self.journal.journal_path, self.journal.compacting_path)
+        backup = self.journal.compacting_path.with_suffix(".bak")
+        shutil.copy(self.journal.compacting_path, backup)
+        self.journal.compact()
+        shutil.copy(backup, self.journal.compacting_path)
+
+        self.assertEqual(self.texts(), ["Regar", "Regar"])
+        self.journal.compact()
+        self.assertEqual(self.texts(), ["Regar", "Regar"])
+        self.assertFalse(self.journal.compacting_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
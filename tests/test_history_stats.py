@@ -0,0 +1,79 @@
+# test_history_stats.py
+# Los contadores pre-agregados dan el mismo resumen que recorrer el historial.
+#
+#   python -m unittest discover tests
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from history_stats import summarize_entries  # noqa: E402
+from storage import DB_FILE, SqliteStorage  # noqa: E402
+
+TODAY = date(2025, 3, 10)
+
+
+class HistoryStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(Path(self.tmp.name) / DB_FILE)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def add(self, day, color="green"):
+        self.storage.add_history(day, {"text": f"tarea {day}", "color": color})
+
+    def scanned(self):
+        return summarize_entries(self.storage.history_range("", "9999-12-31"), TODAY)
+
+    def test_counters_after_adds(self):
+        for day, color in (("2025-03-08", "red"), ("2025-03-09", "green"), ("2025-03-09", "red"),
+                           ("2025-03-10", "blue"), ("2025-02-01", "yellow"), ("2024-12-30", "green")):
+            self.add(day, color)
+        summary = self.storage.history_stats(TODAY)
+        self.assertEqual(summary, self.scanned())
+        self.assertEqual(summary["total"], 6)
+        self.assertEqual(summary["today"], 1)
+        self.assertEqual(summary["colors"], {"red": 2, "yellow": 1, "blue": 1, "green": 2})
+        self.assertEqual((summary["streak"], summary["longest_streak"]), (3, 3))
+        self.assertEqual(dict(summary["months"])["2025-03"], 4)
+
+    def test_earlier_day_joins_two_streaks(self):
+        for day in ("2025-03-05", "2025-03-06", "2025-03-08", "2025-03-09", "2025-03-10"):
+            self.add(day)
+        self.assertEqual(self.storage.history_stats(TODAY)["longest_streak"], 3)
+        self.add("2025-03-07")
+        summary = self.storage.history_stats(TODAY)
+        self.assertEqual((summary["streak"], summary["longest_streak"]), (6, 6))
+        self.assertEqual(summary, self.scanned())
+
+    def test_counters_rebuilt_after_remove(self):
+        for day in ("2025-03-08", "2025-03-09", "2025-03-10"):
+            self.add(day, "red")
+        # Un borrado fuera de add() deja el total desfasado: update() rearma todo
+        with self.storage.conn:
+            self.storage.conn.execute("DELETE FROM history WHERE completed_date = '2025-03-09'")
+        self.assertTrue(self.storage.stats.update())
+        summary = self.storage.history_stats(TODAY)
+        self.assertEqual(summary, self.scanned())
+        self.assertEqual(summary["total"], 2)
+        self.assertEqual((summary["streak"], summary["longest_streak"]), (1, 1))
+        self.assertFalse(self.storage.stats.update())
+
+    def test_rebuild_matches_incremental(self):
+        for i in range(40):
+            self.add(f"2025-0{1 + i % 3}-{1 + i % 27:02d}", ["red", "yellow", "blue", "green"][i % 4])
+        incremental = self.storage.history_stats(TODAY)
+        self.storage.rebuild_history_stats()
+        self.assertEqual(self.storage.history_stats(TODAY), incremental)
+        self.assertEqual(incremental, self.scanned())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# test_io_worker.py
+# Tras shutdown() el hilo de E/S ignora las operaciones nuevas y, si nunca
+# corrió ninguna, tampoco abre el almacenamiento.
+#
+#   python -m unittest discover tests
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from io_worker import StorageWorker  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+from write_behind import WriteBehind  # noqa: E402
+
+
+class ShutdownTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name) / "test.db"
+        self.worker = StorageWorker(lambda: SqliteStorage(path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_late_results_do_not_submit_after_shutdown(self):
+        # Una carga cuyo resultado llega cuando la app ya cerró y pide guardar
+        loaded = []
+        self.worker.submit(lambda storage: storage.load_tasks(), on_done=loaded.append)
+        self.worker.shutdown()
+        QCoreApplication.processEvents()
+        self.assertEqual(loaded, [[]])
+
+        self.assertIsNone(self.worker.submit(lambda storage: storage.load_alarms()))
+        write_behind = WriteBehind(self.worker)
+        write_behind.add_task({"text": "tarde"})
+        write_behind.flush(final=True)
+        self.worker.shutdown()
+
+    def test_shutdown_without_jobs_does_not_open_storage(self):
+        opened = []
+        worker = StorageWorker(lambda: opened.append(True))
+        worker.shutdown()
+        self.assertEqual(opened, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
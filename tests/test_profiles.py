@@ -0,0 +1,140 @@
+# test_profiles.py
+# Consultar perfiles exportados no modifica sus copias ni crea archivos, y
+# el panel lee los datos de este equipo en solo lectura.
+#
+#   python -m unittest discover tests
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from profiles import count_profiles, local_profile, open_profile, profile_query, scan_profiles  # noqa: E402
+from query_engine import make_query  # noqa: E402
+from storage import DATA_DIR_ENV, DB_FILE, PROFILE_FILE, SqliteStorage  # noqa: E402
+
+ENTRY = {"text": "Enviar factura", "color": "red", "color_name": "🔴 Alta", "completed": None}
+
+
+def snapshot(folder):
+    """{ruta relativa: hash} de todos los archivos de folder"""
+    return {str(p.relative_to(folder)): hashlib.sha256(p.read_bytes()).hexdigest()
+            for p in sorted(Path(folder).rglob("*")) if p.is_file()}
+
+
+class ExportedProfilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = Path(self.tmp.name) / "perfiles"
+
+        # Copia actual: con perfil, índice de búsqueda y una tarea sin indexar
+        current = self.folder / "ana"
+        current.mkdir(parents=True)
+        (current / PROFILE_FILE).write_text(json.dumps({"user_id": "u1", "user_name": "Ana"}))
+        storage = SqliteStorage(current / DB_FILE, user_id="u1")
+        storage.add_history("2025-03-01", ENTRY)
+        storage.add_history("2025-03-02", dict(ENTRY, text="Llamar", color="green"))
+        with storage.conn:
+            storage.conn.execute("INSERT INTO history (completed_date, text, color) VALUES (?, ?, ?)",
+                                 ("2025-03-03", "Factura nueva", "red"))
+        storage.close()
+
+        # Copia anterior a los perfiles: sin perfil.json ni columna user_id
+        legacy = self.folder / "viejo"
+        legacy.mkdir()
+        conn = sqlite3.connect(legacy / DB_FILE)
+        conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY, completed_date TEXT NOT NULL,"
+                     " text TEXT NOT NULL, color TEXT NOT NULL DEFAULT 'green', color_name TEXT, completed TEXT)")
+        conn.execute("INSERT INTO history (completed_date, text, color) VALUES ('2024-01-01', 'factura', 'red')")
+        conn.commit()
+        conn.close()
+
+        # Historial JSON mal formado: una lista en lugar de {fecha: [tareas]}
+        broken = self.folder / "roto"
+        broken.mkdir()
+        (broken / "historial.json").write_text("[]")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_queries_leave_copies_untouched(self):
+        before = snapshot(self.folder)
+        profiles = {p["user_name"]: p for p in scan_profiles(self.folder)}
+        results = {r["profile"]["user_name"]: r for r in count_profiles(list(profiles.values()),
+                                                                        make_query(text="factura"))}
+
+        self.assertEqual(results["Ana"]["counts"], {"red": 2})
+        self.assertEqual(results["viejo"]["counts"], {"red": 1})
+        self.assertIsNone(results["Ana"]["error"])
+        self.assertTrue(results["roto"]["error"])
+
+        reader = open_profile(profiles["Ana"])
+        try:
+            rows = reader.query_history(profile_query(make_query(descending=True), profiles["Ana"]), limit=2)
+        finally:
+            reader.close()
+        self.assertEqual([d for d, _ in rows], ["2025-03-03", "2025-03-02"])
+        self.assertEqual(rows[0][1]["user_id"], "u1")
+
+        self.assertEqual(snapshot(self.folder), before)
+
+    def test_local_profile_does_not_create_profile_file(self):
+        previous = os.environ.get(DATA_DIR_ENV)
+        os.environ[DATA_DIR_ENV] = str(Path(self.tmp.name) / "local")
+        try:
+            profile = local_profile()
+        finally:
+            if previous is None:
+                os.environ.pop(DATA_DIR_ENV, None)
+            else:
+                os.environ[DATA_DIR_ENV] = previous
+        self.assertIsNone(profile["user_id"])
+        self.assertFalse((Path(self.tmp.name) / "local").exists())
+
+    def test_local_store_is_read_only(self):
+        previous = os.environ.get(DATA_DIR_ENV)
+        local = Path(self.tmp.name) / "local"
+        os.environ[DATA_DIR_ENV] = str(local)
+        try:
+            # Sin datos: no se crea la carpeta ni la base
+            with self.assertRaises(FileNotFoundError):
+                open_profile(local_profile())
+            self.assertFalse(local.exists())
+
+            # Historial JSON todavía sin migrar: se lee sin crear la base
+            local.mkdir()
+            (local / "historial.json").write_text(json.dumps({"2025-03-01": [ENTRY]}))
+            reader = open_profile(local_profile())
+            try:
+                self.assertEqual(reader.history_stats()["total"], 1)
+            finally:
+                reader.close()
+            self.assertFalse((local / DB_FILE).exists())
+
+            # Base del widget: se ven sus cambios y los contadores no se tocan
+            storage = SqliteStorage(local / DB_FILE)
+            storage.add_history("2025-03-01", ENTRY)
+            reader = open_profile(local_profile())
+            try:
+                storage.add_history("2025-03-02", ENTRY)
+                self.assertEqual(reader.history_stats()["total"], 2)
+                with self.assertRaises(sqlite3.OperationalError):
+                    reader.conn.execute("DELETE FROM history")
+            finally:
+                reader.close()
+                storage.close()
+        finally:
+            if previous is None:
+                os.environ.pop(DATA_DIR_ENV, None)
+            else:
+                os.environ[DATA_DIR_ENV] = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# test_query_engine.py
+# Paginación por clave y orden por texto, iguales en SQLite y en JSON.
+#
+#   python -m unittest discover tests
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from query_engine import SORTS, cursor, make_query  # noqa: E402
+from storage import DB_FILE, JsonStorage, SqliteStorage  # noqa: E402
+
+TEXTS = ["Ñandú", "nube", "árbol", "Zeta", "abeja", "Álamo", "zorro", "ola"]
+COLORS = ["red", "yellow", "blue", "green"]
+
+
+def pages(storage, query, size):
+    """Todas las filas de la consulta, pidiendo páginas de size con el cursor"""
+    found, after = [], None
+    while True:
+        page = storage.query_history(query, limit=size, after=after)
+        if not page:
+            return found
+        found += page
+        after = cursor(query, *page[-1])
+
+
+def texts(rows):
+    return [entry["text"] for _, entry in rows]
+
+
+class QueryEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backends = {"sqlite": SqliteStorage(Path(self.tmp.name) / DB_FILE),
+                         "json": JsonStorage(Path(self.tmp.name))}
+        for storage in self.backends.values():
+            for i in range(24):
+                text = TEXTS[i % len(TEXTS)]
+                storage.add_history(f"2025-01-{i % 5 + 1:02d}", {"text": text, "color": COLORS[i % 4]})
+
+    def tearDown(self):
+        for storage in self.backends.values():
+            storage.close()
+        self.tmp.cleanup()
+
+    def test_keyset_pages_match_full_query(self):
+        for name, storage in self.backends.items():
+            for order_by in SORTS:
+                for descending in (False, True):
+                    query = make_query(order_by=order_by, descending=descending)
+                    with self.subTest(backend=name, order_by=order_by, descending=descending):
+                        full = storage.query_history(query)
+                        self.assertEqual(len(full), 24)
+                        self.assertEqual(pages(storage, query, 5), full)
+
+    def test_text_order_is_the_same_in_both_backends(self):
+        for descending in (False, True):
+            query = make_query(order_by="text", descending=descending)
+            sqlite_texts, json_texts = (texts(s.query_history(query)) for s in self.backends.values())
+            self.assertEqual(sqlite_texts, json_texts)
+        # Las tildes y la Ñ no van al final, como pasaba con COLLATE NOCASE
+        ordered = list(dict.fromkeys(texts(self.backends["sqlite"].query_history(make_query(order_by="text")))))
+        self.assertEqual(ordered, ["abeja", "Álamo", "árbol", "Ñandú", "nube", "ola", "Zeta", "zorro"])
+
+    def test_json_cursor_survives_insert_on_earlier_day(self):
+        storage = self.backends["json"]
+        query = make_query()
+        expected = storage.query_history(query)
+        page = storage.query_history(query, limit=10)
+        storage.add_history("2024-12-31", {"text": "antes", "color": "green"})
+        rest = storage.query_history(query, limit=100, after=cursor(query, *page[-1]))
+        self.assertEqual(texts(page + rest), texts(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# test_recurrence.py
+# Próxima ocurrencia de las reglas de repetición (recurrence.py).
+#
+#   python -m unittest discover tests
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QDateTime, Qt  # noqa: E402
+
+from recurrence import describe, make_rule, next_occurrence  # noqa: E402
+
+
+def at(iso):
+    return QDateTime.fromString(iso, Qt.ISODate)
+
+
+def following(rule, after, count):
+    """Las count ocurrencias siguientes a after, como ISO"""
+    found = []
+    when = at(after)
+    for _ in range(count):
+        when = next_occurrence(rule, when)
+        found.append(when.toString(Qt.ISODate))
+    return found
+
+
+class NextOccurrenceTest(unittest.TestCase):
+    def test_future_anchor_is_first(self):
+        rule = make_rule("daily", "2099-01-01T09:00:00")
+        self.assertEqual(following(rule, "2025-01-01T00:00:00", 1), ["2099-01-01T09:00:00"])
+
+    def test_monthly_on_the_31st(self):
+        rule = make_rule("monthly", "2024-01-31T09:00:00")
+        self.assertEqual(following(rule, "2024-01-31T09:00:00", 4), [
+            "2024-02-29T09:00:00", "2024-03-31T09:00:00", "2024-04-30T09:00:00", "2024-05-31T09:00:00"])
+        # Pasada la hora del último día, salta al mes siguiente
+        self.assertEqual(following(rule, "2025-02-28T10:00:00", 1), ["2025-03-31T09:00:00"])
+
+    def test_weekly_several_days(self):
+        # Lunes, miércoles y viernes; 2025-01-06 es lunes
+        rule = make_rule("weekly", "2025-01-06T08:00:00", days=[5, 1, 3])
+        self.assertEqual(rule["days"], [1, 3, 5])
+        self.assertEqual(following(rule, "2025-01-06T08:00:00", 4), [
+            "2025-01-08T08:00:00", "2025-01-10T08:00:00", "2025-01-13T08:00:00", "2025-01-15T08:00:00"])
+        self.assertEqual(following(rule, "2025-01-08T07:59:00", 1), ["2025-01-08T08:00:00"])
+
+    def test_weekly_without_days_keeps_anchor_weekday(self):
+        # 2025-01-08 es miércoles
+        rule = make_rule("weekly", "2025-01-08T09:00:00", days=[])
+        self.assertEqual(rule["days"], [3])
+        self.assertEqual(describe(rule), "🔁 X")
+        self.assertEqual(following(rule, "2025-01-08T09:00:00", 1), ["2025-01-15T09:00:00"])
+
+    def test_weekdays_skip_weekend(self):
+        rule = make_rule("weekdays", "2025-01-03T09:00:00")
+        self.assertEqual(following(rule, "2025-01-03T09:00:00", 2), ["2025-01-06T09:00:00", "2025-01-07T09:00:00"])
+
+    def test_hourly_keeps_anchor_phase(self):
+        rule = make_rule("hourly", "2025-01-01T00:30:00", hours=5)
+        self.assertEqual(following(rule, "2025-01-01T07:00:00", 3), [
+            "2025-01-01T10:30:00", "2025-01-01T15:30:00", "2025-01-01T20:30:00"])
+        # Exactamente en una ocurrencia: la siguiente, no la misma
+        self.assertEqual(following(rule, "2025-01-01T10:30:00", 1), ["2025-01-01T15:30:00"])
+
+    def test_invalid_anchor(self):
+        self.assertIsNone(next_occurrence(make_rule("daily", "nunca"), at("2025-01-01T00:00:00")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# test_search_index.py
+# Búsqueda en el historial: sin tildes ni mayúsculas, subcadenas por
+# trigramas y prefijos cortos; el índice da lo mismo que matches().
+#
+#   python -m unittest discover tests
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from search_index import SearchIndex, matches, normalize, query_trigrams, trigrams  # noqa: E402
+
+TEXTS = ["Canción para mamá", "Llamar a Ñoño", "Enviar FACTURA mensual", "facturación anual",
+         "Revisar correo", "Ir al médico", "café con Ana", "ana y el canal"]
+QUERIES = ["cancion", "CANCIÓN", "factura", "turac", "ñoño", "nono", "medico", "ana", "an", "ca",
+           "correo revisar", "al", "xyz", "a", "anu"]
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY, completed_date TEXT, text TEXT)")
+        self.conn.executemany("INSERT INTO history (completed_date, text) VALUES (?, ?)",
+                              [(f"2025-01-{i + 1:02d}", text) for i, text in enumerate(TEXTS)])
+        self.index = SearchIndex(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def found(self, query):
+        return sorted(row[2] for row in self.index.search(query))
+
+    def test_normalize_and_trigrams(self):
+        self.assertEqual(normalize("Canción ÑOÑO"), "cancion nono")
+        self.assertEqual(trigrams("factura"), {"fac", "act", "ctu", "tur", "ura"})
+        # Trigramas que cubren la palabra sin solaparse, más el final
+        self.assertEqual(query_trigrams("factura"), ["fac", "tur", "ura"])
+
+    def test_update_indexes_missing_rows_once(self):
+        self.assertEqual(self.index.update(), len(TEXTS))
+        self.assertEqual(self.index.update(), 0)
+
+    def test_accents_case_and_substrings(self):
+        self.index.update()
+        self.assertEqual(self.found("CANCIÓN"), ["Canción para mamá"])
+        self.assertEqual(self.found("ñoño"), ["Llamar a Ñoño"])
+        self.assertEqual(self.found("turac"), ["facturación anual"])
+        self.assertEqual(self.found("factura"), ["Enviar FACTURA mensual", "facturación anual"])
+        # Palabras cortas: prefijo de alguna palabra, no subcadena
+        self.assertEqual(self.found("an"), ["ana y el canal", "café con Ana", "facturación anual"])
+        self.assertEqual(self.found("xyz"), [])
+
+    def test_index_agrees_with_matches(self):
+        self.index.update()
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(self.found(query), sorted(t for t in TEXTS if matches(t, query)))
+
+    def test_added_row_is_searchable(self):
+        self.index.update()
+        cur = self.conn.execute("INSERT INTO history (completed_date, text) VALUES ('2025-02-01', 'Pagar factura')")
+        self.index.add(cur.lastrowid, "Pagar factura")
+        self.assertIn("Pagar factura", self.found("factura"))
+        self.assertEqual(self.index.update(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
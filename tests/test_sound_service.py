@@ -0,0 +1,62 @@
+# test_sound_service.py
+# Sin archivo de sonido una alarma no registra dueño ni despierta el timer.
+#
+#   python -m unittest discover tests
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QCoreApplication, QUrl  # noqa: E402
+
+from sound_service import SoundService  # noqa: E402
+from timer_service import TimerService  # noqa: E402
+
+
+class SilentEffect:
+    """QSoundEffect ya cargado, sin archivo (como cuando no se encuentra alarm.wav)"""
+
+    def __init__(self, source=""):
+        self._source = QUrl.fromLocalFile(source) if source else QUrl()
+        self.played = 0
+
+    def source(self):
+        return self._source
+
+    def play(self):
+        self.played += 1
+
+    def stop(self):
+        pass
+
+
+class SoundServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.timers = TimerService()
+        self.sound = SoundService(self.timers)
+
+    def test_no_source_keeps_timer_asleep(self):
+        self.sound._effect = SilentEffect()
+        self.sound.start(self)
+        self.assertFalse(self.timers.is_active())
+        self.assertEqual(self.sound._owners, set())
+
+    def test_failed_load_keeps_timer_asleep(self):
+        self.sound._failed = True
+        self.sound.start(self)
+        self.assertFalse(self.timers.is_active())
+
+    def test_source_registers_owner_and_tick(self):
+        effect = self.sound._effect = SilentEffect("/tmp/alarm.wav")
+        self.sound.start(self)
+        self.assertTrue(self.timers.is_active())
+        self.assertEqual(effect.played, 1)
+        self.sound.stop(self)
+        self.assertFalse(self.timers.is_active())
+
+
+if __name__ == "__main__":
+    unittest.main()
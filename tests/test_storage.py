@@ -0,0 +1,48 @@
+# test_storage.py
+# Los dos backends rechazan un lote con una alarma sin hora válida.
+#
+#   python -m unittest discover tests
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from storage import DB_FILE, HistoryReader, JsonStorage, SqliteStorage, Storage  # noqa: E402
+
+VALID = {"text": "Reunión", "reminder_time": "2099-01-01T09:00:00"}
+INVALID = {"text": "Sin hora", "reminder_time": "mañana"}
+
+
+class InvalidAlarmTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name)
+        self.backends = [SqliteStorage(path / DB_FILE), JsonStorage(path)]
+
+    def tearDown(self):
+        for storage in self.backends:
+            storage.close()
+        self.tmp.cleanup()
+
+    def test_batch_with_invalid_alarm_writes_nothing(self):
+        for storage in self.backends:
+            task, valid, invalid = {"text": "Tarea"}, dict(VALID), dict(INVALID)
+            with self.assertRaises(ValueError):
+                storage.apply_batch(add_tasks=[task], add_alarms=[valid, invalid])
+            self.assertEqual(storage.load_tasks(), [])
+            self.assertEqual(storage.load_alarms(), [])
+
+            storage.apply_batch(add_alarms=[valid])
+            self.assertIsNotNone(valid.get("id"))
+            self.assertEqual([a["text"] for a in storage.load_alarms()], ["Reunión"])
+
+    def test_interfaces_are_abstract(self):
+        self.assertRaises(TypeError, Storage)
+        self.assertRaises(TypeError, HistoryReader)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# test_task_model.py
+# La checklist se mantiene ordenada con bisect y avisa una fila por cambio.
+#
+#   python -m unittest discover tests
+import os
+import random
+import sys
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from task_model import TaskListModel, task_bucket, task_due_msecs  # noqa: E402
+
+
+def task(text, color="green", reminder=None):
+    return {"text": text, "color": color, "has_reminder": reminder is not None, "reminder_time": reminder}
+
+
+class TaskListModelTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.model = TaskListModel()
+        self.inserted = []
+        self.removed = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserted.append((first, last)))
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((first, last)))
+
+    def texts(self):
+        return [self.model.task_at(row)["text"] for row in range(self.model.rowCount())]
+
+    def test_order_by_priority_due_and_arrival(self):
+        tasks = [
+            task("normal 1"),
+            task("alerta tarde", "yellow", "2099-01-02T09:00:00"),
+            task("roja tarde", "red", "2099-01-02T09:00:00"),
+            task("normal 2", "red"),
+            task("alerta temprano", "blue", "2099-01-01T09:00:00"),
+            task("roja temprano", "red", "2099-01-01T09:00:00"),
+        ]
+        rows = [self.model.add_task(t) for t in tasks]
+        self.assertEqual(self.texts(), ["roja temprano", "roja tarde", "alerta temprano", "alerta tarde",
+                                        "normal 1", "normal 2"])
+        # Cada alta avisa solo su fila
+        self.assertEqual(self.inserted, [(row, row) for row in rows])
+
+    def test_random_adds_and_removes_stay_sorted(self):
+        rng = random.Random(7)
+        colors = ["red", "yellow", "blue", "green"]
+        live = []
+        for i in range(200):
+            if live and rng.random() < 0.3:
+                gone = live.pop(rng.randrange(len(live)))
+                row = self.model.row_of(gone)
+                self.assertTrue(self.model.remove_task(gone))
+                self.assertEqual(self.removed[-1], (row, row))
+            else:
+                reminder = f"2099-01-{rng.randint(1, 28):02d}T09:00:00" if rng.random() < 0.5 else None
+                live.append(task(f"t{i}", rng.choice(colors), reminder))
+                self.model.add_task(live[-1])
+        keys = [(task_bucket(t), task_due_msecs(t)) for t in map(self.model.task_at, range(self.model.rowCount()))]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(self.model.rowCount(), len(live))
+        for t in live:
+            self.assertIs(self.model.task_at(self.model.row_of(t)), t)
+
+    def test_remove_unknown_task(self):
+        self.assertFalse(self.model.remove_task(task("ajena")))
+        self.assertEqual(self.model.row_of(task("ajena")), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
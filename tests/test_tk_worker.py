@@ -0,0 +1,72 @@
+# test_tk_worker.py
+# El sondeo de TkStorageWorker es un trabajo más de TkScheduler.
+#
+#   python -m unittest discover tests
+import sys
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tk_worker import TkScheduler, TkStorageWorker  # noqa: E402
+
+
+class FakeRoot:
+    """root.after/after_cancel sin Tk: pump() corre los after vencidos"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.pending[self.next_id] = fn
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def pump(self, until, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            for after_id in list(self.pending):
+                fn = self.pending.pop(after_id, None)
+                if fn is not None:
+                    fn()
+            time.sleep(0.002)
+        return until()
+
+
+class PollTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.scheduler = TkScheduler(self.root)
+        self.worker = TkStorageWorker(self.scheduler, lambda: object(), owner="sesion")
+
+    def tearDown(self):
+        self.worker.shutdown()
+
+    def test_poll_runs_through_scheduler_only_while_busy(self):
+        results = []
+        self.worker.submit(lambda storage, job: 42, on_done=results.append)
+        self.assertEqual(self.scheduler.pending(), 1)
+        self.assertTrue(self.root.pump(lambda: results))
+        self.assertEqual(results, [42])
+        self.assertEqual(self.scheduler.pending(), 0)
+        self.assertEqual(self.root.pending, {})
+
+    def test_cancel_owner_stops_poll_and_submit_rearms_it(self):
+        results = []
+        self.worker.submit(lambda storage, job: 1, on_done=results.append)
+        self.scheduler.cancel_owner("sesion")
+        self.assertEqual(self.root.pending, {})
+
+        self.worker.submit(lambda storage, job: 2, on_done=results.append)
+        self.assertTrue(self.root.pump(lambda: len(results) == 2))
+        self.assertEqual(results, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
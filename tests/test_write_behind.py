@@ -0,0 +1,130 @@
+# test_write_behind.py
+# Los cambios se agrupan en un lote y la escritura final al salir se
+# encadena detrás del lote que sigue en curso.
+#
+#   python -m unittest discover tests
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from storage import SqliteStorage  # noqa: E402
+from write_behind import WriteBehind  # noqa: E402
+
+
+class ManualWorker:
+    """Como StorageWorker, pero las operaciones corren al llamar run_next()"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.jobs = []
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        self.jobs.append((fn, args, on_done, on_error))
+
+    def run_next(self):
+        fn, args, on_done, on_error = self.jobs.pop(0)
+        result = fn(self.storage, *args)
+        return lambda: on_done(result)
+
+
+class BatchingTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(Path(self.tmp.name) / "test.db")
+        self.worker = ManualWorker(self.storage)
+        self.write_behind = WriteBehind(self.worker)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def test_burst_is_one_batch(self):
+        tasks = [{"text": f"tarea {i}"} for i in range(50)]
+        for task in tasks:
+            self.write_behind.add_task(task)
+        self.assertTrue(self.write_behind._timer.isActive())
+        self.write_behind.flush()
+        self.assertEqual(len(self.worker.jobs), 1)
+        self.worker.run_next()()
+        self.assertEqual(len(self.storage.load_tasks()), 50)
+        self.assertTrue(all(task.get("id") for task in tasks))
+        self.assertFalse(self.write_behind.has_pending())
+
+    def test_added_and_removed_before_flush_never_written(self):
+        kept, dropped = {"text": "queda"}, {"text": "se va"}
+        self.write_behind.add_task(kept)
+        self.write_behind.add_task(dropped)
+        self.write_behind.remove_task(dropped)
+        self.write_behind.flush()
+        self.worker.run_next()()
+        self.assertEqual([t["text"] for t in self.storage.load_tasks()], ["queda"])
+        self.assertIsNone(dropped.get("id"))
+
+    def test_saved_task_removed_in_next_batch(self):
+        task = {"text": "tarea"}
+        self.write_behind.add_task(task)
+        self.write_behind.flush()
+        self.worker.run_next()()
+        self.write_behind.remove_task(task)
+        self.assertTrue(self.write_behind.has_pending())
+        self.write_behind.flush()
+        self.worker.run_next()()
+        self.assertEqual(self.storage.load_tasks(), [])
+
+    def test_second_flush_waits_for_batch_in_flight(self):
+        self.write_behind.add_task({"text": "primera"})
+        self.write_behind.flush()
+        self.write_behind.add_task({"text": "segunda"})
+        self.write_behind.flush()
+        # Un lote a la vez: el segundo se reintenta cuando llegan los ids
+        self.assertEqual(len(self.worker.jobs), 1)
+        self.worker.run_next()()
+        self.write_behind.flush()
+        self.worker.run_next()()
+        self.assertEqual(len(self.storage.load_tasks()), 2)
+
+
+class FinalFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(Path(self.tmp.name) / "test.db")
+        self.worker = ManualWorker(self.storage)
+        self.write_behind = WriteBehind(self.worker)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def test_final_flush_chains_onto_batch_in_flight(self):
+        first = {"text": "primera", "reminder_time": "2099-01-01T09:00:00"}
+        second = {"text": "segunda", "reminder_time": "2099-01-02T09:00:00"}
+        self.write_behind.add_alarm(first)
+        self.write_behind.flush()
+        # Se borra mientras su lote está en curso y al salir llega otra
+        self.write_behind.remove_alarm(first)
+        self.write_behind.add_alarm(second)
+        self.write_behind.flush(final=True)
+        self.assertEqual(len(self.worker.jobs), 2)
+
+        done_first = self.worker.run_next()
+        done_second = self.worker.run_next()
+        # El lote anterior termina después: no pisa lo del lote final
+        done_second()
+        done_first()
+
+        self.assertEqual([a["text"] for a in self.storage.load_alarms()], ["segunda"])
+        self.assertIsNotNone(second.get("id"))
+        self.assertFalse(self.write_behind.has_pending())
+        self.assertEqual(self.write_behind._inflight, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
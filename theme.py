@@ -0,0 +1,300 @@
+from PySide6.QtWidgets import QApplication
+
+# Degradado (arriba, abajo) del fondo de la alarma; lo pinta su paintEvent
+ALARM_GRADIENTS = {
+    "red": ("#3a2326", "#2a1518"),
+    "yellow": ("#3a3a26", "#2a2a18"),
+    "blue": ("#232a3a", "#151c2a"),
+    "green": ("#2a3a26", "#1a2a18"),
+}
+
+# Color del texto de prioridad en la notificación
+PRIORITY_TEXT = {
+    "red": "#FFB6B6",
+    "yellow": "#FFD966",
+    "blue": "#A6D8FF",
+    "green": "#A9F38B",
+}
+
+# --------------------------
+# Reglas fijas
+# --------------------------
+_BASE = """
+/* Ventana principal */
+QFrame#main_background, QFrame#main_background QFrame {
+    background: qlineargradient(x1:0,y1:0,x2:0,y2:1,
+        stop:0 #2a2d2e, stop:1 #1e2021);
+    border-radius: 12px;
+    border: 1px solid rgba(255,255,255,0.06);
+}
+ProductivityWidget QLabel { color: white; }
+ProductivityWidget QLabel#date_label {
+    font-size: 13px;
+    color: #CCCCCC;
+    padding-top: 5px;
+}
+ProductivityWidget QLabel#time_label {
+    font-size: 30px;
+    font-weight: 600;
+    padding-bottom: 5px;
+}
+ProductivityWidget QLineEdit {
+    background-color: #2a2d2e;
+    border: 1px solid #444;
+    border-radius: 6px;
+    padding: 8px;
+    font-size: 13px;
+    color: white;
+}
+ProductivityWidget QLineEdit#history_search {
+    padding: 5px 8px;
+    font-size: 12px;
+}
+ProductivityWidget QPushButton {
+    background-color: #0078D7;
+    color: white;
+    font-size: 14px;
+    font-weight: 600;
+    border-radius: 6px;
+    min-width: 26px;
+    min-height: 26px;
+    border: none;
+}
+ProductivityWidget QPushButton:hover { background-color: #0099FF; }
+ProductivityWidget QPushButton:pressed { background-color: #0066B4; }
+ProductivityWidget QPushButton#history_button {
+    font-size: 12px;
+    font-weight: bold;
+    color: #888;
+    background: transparent;
+    border: none;
+    max-height: 24px;
+    border-radius: 5px;
+    text-align: left;
+    padding: 2px 5px;
+}
+ProductivityWidget QPushButton#history_button:hover {
+    color: white;
+    background-color: rgba(255,255,255,0.05);
+}
+ProductivityWidget QPushButton#history_button:checked {
+    color: white;
+    background-color: rgba(255,255,255,0.08);
+}
+QFrame#main_background QListView#task_view,
+QFrame#main_background QTreeView#history_view,
+QFrame#main_background QListView#search_view {
+    border: none;
+    background: rgba(255,255,255,0.02);
+    border-radius: 6px;
+}
+
+/* Notificación de alarma */
+AlarmNotification QFrame#alarm_background {
+    background: transparent;
+    border: none;
+}
+AlarmNotification QLabel#alarm_icon, MissedAlarmsNotification QLabel#alarm_icon { font-size: 20px; }
+AlarmNotification QLabel#alarm_title, MissedAlarmsNotification QLabel#alarm_title { font-size: 16px; font-weight: 600; color: #FFD966; }
+AlarmNotification QLabel#alarm_task {
+    font-size: 13px;
+    padding: 8px;
+    border-radius: 8px;
+    background: rgba(255,255,255,0.03);
+    color: #ffffff;
+}
+AlarmNotification QLabel#alarm_when { color: #BFC7C9; font-size: 11px; }
+AlarmNotification QLabel#alarm_priority { font-size: 12px; font-weight: 600; }
+AlarmNotification QFrame#alarm_separator { background: rgba(255,255,255,0.03); max-height: 1px; }
+AlarmNotification QPushButton#alarm_close, MissedAlarmsNotification QPushButton#alarm_close {
+    background: transparent;
+    color: #ddd;
+    border: none;
+    font-size: 14px;
+}
+AlarmNotification QPushButton#alarm_close:hover, MissedAlarmsNotification QPushButton#alarm_close:hover {
+    color: white;
+    background: rgba(255,255,255,0.04);
+    border-radius: 6px;
+}
+AlarmNotification QPushButton#snooze_button, MissedAlarmsNotification QPushButton#snooze_button {
+    background: transparent;
+    color: #ddd;
+    border: 1px solid rgba(255,255,255,0.04);
+    padding: 6px 12px;
+    border-radius: 6px;
+}
+AlarmNotification QPushButton#snooze_button:hover, MissedAlarmsNotification QPushButton#snooze_button:hover { background: rgba(255,255,255,0.02); }
+AlarmNotification QPushButton#complete_button, MissedAlarmsNotification QPushButton#complete_button {
+    background: #28a745;
+    color: white;
+    border: none;
+    padding: 6px 12px;
+    border-radius: 6px;
+    font-weight: 600;
+}
+AlarmNotification QPushButton#complete_button:hover, MissedAlarmsNotification QPushButton#complete_button:hover { background: #23903f; }
+
+/* Resumen de alarmas perdidas */
+MissedAlarmsNotification QFrame#missed_background {
+    background: qlineargradient(x1:0,y1:0,x2:0,y2:1,
+        stop:0 #2a2d2e, stop:1 #1e2021);
+    border-radius: 12px;
+    border: 1px solid rgba(255,255,255,0.08);
+}
+MissedAlarmsNotification QScrollArea#missed_list,
+MissedAlarmsNotification QWidget#missed_rows {
+    background: transparent;
+    border: none;
+}
+MissedAlarmsNotification QFrame#missed_row {
+    background: rgba(255,255,255,0.03);
+    border-radius: 8px;
+}
+MissedAlarmsNotification QLabel#missed_text { font-size: 12px; }
+MissedAlarmsNotification QPushButton#missed_snooze,
+MissedAlarmsNotification QPushButton#missed_complete {
+    background: transparent;
+    color: #ddd;
+    border: 1px solid rgba(255,255,255,0.06);
+    border-radius: 6px;
+    min-width: 0px;
+    min-height: 0px;
+    font-size: 13px;
+}
+MissedAlarmsNotification QPushButton#missed_snooze:hover { background: rgba(255,255,255,0.06); }
+MissedAlarmsNotification QPushButton#missed_complete:hover { background: #28a745; color: white; }
+
+/* Diálogo de tarea (va después: a igual especificidad gana la última regla) */
+TaskDialog {
+    background-color: #1e2021;
+    color: white;
+}
+TaskDialog QLabel {
+    color: white;
+    font-size: 13px;
+}
+TaskDialog QLabel#dialog_hint { color: #888; font-size: 11px; font-style: italic; }
+TaskDialog QLineEdit {
+    background-color: #2a2d2e;
+    border: 1px solid #444;
+    border-radius: 6px;
+    padding: 8px;
+    font-size: 13px;
+    color: white;
+}
+TaskDialog QComboBox {
+    background-color: #2a2d2e;
+    border: 1px solid #444;
+    border-radius: 6px;
+    padding: 8px;
+    color: white;
+    min-height: 20px;
+    font-size: 13px;
+}
+TaskDialog QComboBox::drop-down {
+    border: none;
+    width: 25px;
+}
+TaskDialog QComboBox::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #888;
+    width: 0px;
+    height: 0px;
+}
+TaskDialog QComboBox QAbstractItemView {
+    background-color: #2a2d2e;
+    border: 1px solid #444;
+    color: white;
+    selection-background-color: #0078D7;
+    outline: none;
+    padding: 4px;
+}
+TaskDialog QComboBox QAbstractItemView::item {
+    padding: 6px 8px;
+    border-radius: 3px;
+}
+TaskDialog QDateEdit, TaskDialog QTimeEdit, TaskDialog QSpinBox {
+    background-color: #2a2d2e;
+    border: 1px solid #444;
+    border-radius: 6px;
+    padding: 6px;
+    color: white;
+}
+TaskDialog QDateEdit::drop-down, TaskDialog QTimeEdit::drop-down {
+    border: none;
+    width: 20px;
+}
+TaskDialog QCheckBox {
+    color: white;
+    font-size: 13px;
+    spacing: 8px;
+}
+TaskDialog QCheckBox::indicator {
+    width: 16px;
+    height: 16px;
+    border-radius: 3px;
+    border: 1px solid #555;
+    background: #2a2d2e;
+}
+TaskDialog QCheckBox::indicator:checked {
+    background: #0078D7;
+    border: 1px solid #0078D7;
+}
+TaskDialog QPushButton {
+    background-color: #0078D7;
+    color: white;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 6px;
+    font-weight: 600;
+    min-width: 80px;
+}
+TaskDialog QPushButton:hover { background-color: #0099FF; }
+TaskDialog QPushButton:pressed { background-color: #0066B4; }
+TaskDialog QDialogButtonBox QPushButton[text="Cancel"] { background-color: #6c757d; }
+TaskDialog QDialogButtonBox QPushButton[text="Cancel"]:hover { background-color: #5a6268; }
+"""
+
+_compiled = None
+
+
+def _variant_rules():
+    # Lo que antes se armaba con f-strings en cada widget ahora es una regla
+    # por valor de propiedad dinámica
+    rules = []
+    for color, text in PRIORITY_TEXT.items():
+        rules.append(f'AlarmNotification QLabel#alarm_priority[priority="{color}"] {{ color: {text}; }}')
+        rules.append(f'MissedAlarmsNotification QLabel#missed_text[priority="{color}"] {{ color: {text}; }}')
+    return "\n".join(rules)
+
+
+def stylesheet():
+    """Hoja de estilos de toda la aplicación, armada una sola vez"""
+    global _compiled
+    if _compiled is None:
+        _compiled = _BASE + "\n/* Variantes por propiedad dinámica */\n" + _variant_rules() + "\n"
+    return _compiled
+
+
+def apply(app=None):
+    """Instala la hoja en la aplicación; ningún widget llama a setStyleSheet"""
+    app = app or QApplication.instance()
+    app.setStyleSheet(stylesheet())
+
+
+def set_state(widget, name, value):
+    """Cambia una propiedad dinámica y re-pule solo ese widget.
+
+    Qt no vuelve a evaluar los selectores [propiedad="valor"] por sí solo;
+    unpolish/polish recalcula el estilo del widget sin parsear ninguna hoja.
+    """
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
@@ -0,0 +1,131 @@
+from PySide6.QtCore import QObject, QTimer, QDateTime, QElapsedTimer, Qt, Signal
+
+
+# --------------------------
+# Reloj compartido
+# --------------------------
+class TimerService(QObject):
+    """Un único timer de segundos para toda la aplicación.
+
+    Despierta justo después de cada cambio de segundo (alineado al reloj de
+    pared, con Qt.CoarseTimer) y solo mientras alguien lo necesite: el reloj
+    visible o una alarma sonando se registran con acquire(clave) y lo sueltan
+    con release(clave). Quien no necesita segundos usa acquire(clave,
+    seconds=False): si ningún usuario los pide, el timer despierta una vez
+    por minuto, al cambiar el minuto. Una alarma sonando no suma
+    despertares; sin usuarios solo queda el latido de WATCH_MS.
+    day_changed solo se emite al cambiar la fecha, así la fecha larga no se
+    reformatea cada segundo. wakeups cuenta los despertares para medir el
+    consumo (benchmarks/bench_timers.py).
+
+    clock_jumped avisa cuando el reloj de pared avanzó distinto que el
+    monotónico entre dos despertares (suspensión, hibernación o cambio de
+    hora). Además de cada tick, lo revisa un latido muy espaciado que corre
+    aunque nadie use el reloj.
+    """
+    tick = Signal(object)          # QDateTime del segundo actual
+    day_changed = Signal(object)   # QDate
+    clock_jumped = Signal(int)     # ms de salto (positivo: el reloj se adelantó)
+
+    # Margen tras el cambio de segundo: un CoarseTimer puede adelantarse ~5%
+    ALIGN_MS = 60
+    # Latido para detectar saltos del reloj y cuánto salto se considera real
+    WATCH_MS = 60000
+    JUMP_MS = 10000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._users = {}       # clave -> True si necesita cada segundo
+        self._date = None
+        self._second = None
+        self.wakeups = 0
+        self._uptime = QElapsedTimer()
+        self._uptime.start()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.CoarseTimer)
+        self._timer.timeout.connect(self._wake)
+        self._wall = QDateTime.currentMSecsSinceEpoch()
+        self._monotonic = QElapsedTimer()
+        self._monotonic.start()
+        self._watch = QTimer(self)
+        self._watch.setTimerType(Qt.VeryCoarseTimer)
+        self._watch.timeout.connect(self._watch_wake)
+
+    def watch_clock(self):
+        """Empieza a vigilar saltos del reloj de pared"""
+        self._check_jump()
+        self._watch.start(self.WATCH_MS)
+
+    def acquire(self, key, seconds=True):
+        first = not self._users
+        was_seconds = self.wants_seconds()
+        self._users[key] = seconds
+        if first:
+            # Al reanudar se actualiza enseguida (pudo cambiar hasta el día)
+            self._check_jump()
+            self._emit(QDateTime.currentDateTime())
+            self._arm()
+        elif self.wants_seconds() != was_seconds:
+            self._arm()
+
+    def release(self, key):
+        was_seconds = self.wants_seconds()
+        self._users.pop(key, None)
+        if not self._users:
+            self._timer.stop()
+        elif self.wants_seconds() != was_seconds:
+            self._arm()
+
+    def is_active(self):
+        return bool(self._users)
+
+    def wants_seconds(self):
+        return any(self._users.values())
+
+    def wakeups_per_second(self):
+        elapsed = self._uptime.elapsed()
+        return self.wakeups * 1000 / elapsed if elapsed else 0.0
+
+    def _arm(self):
+        now = QDateTime.currentDateTime()
+        delay = 1000 - now.time().msec()
+        if self.wants_seconds():
+            self._timer.setTimerType(Qt.CoarseTimer)
+        else:
+            # Hasta el próximo minuto; un CoarseTimer de un minuto podría
+            # errar ~3 s, así que aquí se pide preciso (es un solo despertar)
+            delay += (59 - now.time().second()) * 1000
+            self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.start(delay + self.ALIGN_MS)
+
+    def _watch_wake(self):
+        self.wakeups += 1
+        self._check_jump()
+
+    def _check_jump(self):
+        wall = QDateTime.currentMSecsSinceEpoch()
+        # El monotónico no avanza (o no igual) mientras el equipo duerme
+        jump = (wall - self._wall) - self._monotonic.restart()
+        self._wall = wall
+        if abs(jump) > self.JUMP_MS:
+            self.clock_jumped.emit(jump)
+
+    def _wake(self):
+        self.wakeups += 1
+        self._check_jump()
+        self._emit(QDateTime.currentDateTime())
+        if self._users:
+            self._arm()
+
+    def _emit(self, now):
+        second = now.toSecsSinceEpoch()
+        if second == self._second:
+            # Despertó antes del cambio de segundo: no repetir el mismo
+            return
+        self._second = second
+        date = now.date()
+        if date != self._date:
+            self._date = date
+            self.day_changed.emit(date)
+        self.tick.emit(now)
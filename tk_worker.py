@@ -0,0 +1,219 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Una operación encolada en TkStorageWorker.
+
+    La función recibe el job: job.progress(hechos, total) informa el avance
+    y job.check() corta la operación si se canceló.
+    """
+
+    def __init__(self, worker, on_done, on_error, on_progress, on_cancel):
+        self._worker = worker
+        self._cancelled = threading.Event()
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        if not self._cancelled.is_set():
+            self._cancelled.set()
+            self._worker._interrupt(self)
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None):
+        self.check()
+        self._worker._post("progress", self, (done, total))
+
+
+# --------------------------
+# Hilo de consultas del panel
+# --------------------------
+class TkStorageWorker:
+    """Dueño del almacenamiento del panel de administración, en un hilo propio.
+
+    Igual que io_worker.StorageWorker en el widget, pero para Tk: las
+    operaciones se encolan con submit(fn, *args) y corren en orden como
+    fn(storage, job, *args). Los resultados, el avance y los errores vuelven
+    por una cola que el mainloop vacía cada POLL_MS, solo mientras haya
+    operaciones pendientes; ese trabajo repetido es de scheduler (TkScheduler)
+    a nombre de owner, así cancel_owner y cancel_all también lo cortan.
+    Cancelar una consulta SQLite en curso la interrumpe en el acto
+    (Connection.interrupt).
+    """
+    POLL_MS = 16
+
+    def __init__(self, scheduler, opener, owner=None):
+        self.scheduler = scheduler
+        self.owner = owner
+        self._opener = opener
+        self._storage = None
+        self._queue = queue.Queue()
+        self._jobs = set()
+        self._running = None
+        self._lock = threading.Lock()
+        self._poll_key = None
+        # Un solo hilo: las operaciones mantienen su orden y SQLite su conexión
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="adm-io")
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        job = Job(self, on_done, on_error, on_progress, on_cancel)
+        self._jobs.add(job)
+        self._executor.submit(self._run, job, fn, args)
+        self._schedule_poll()
+        return job
+
+    def cancel_all(self):
+        """Al cambiar de vista o cerrar sesión: no se llama ningún callback"""
+        for job in list(self._jobs):
+            job.on_cancel = None
+            job.cancel()
+
+    def busy(self):
+        return bool(self._jobs)
+
+    def _run(self, job, fn, args):
+        if job.cancelled:
+            self._post("cancelled", job, None)
+            return
+        with self._lock:
+            self._running = job
+        try:
+            if self._storage is None:
+                self._storage = self._opener()
+            result = fn(self._storage, job, *args)
+        except Exception as e:
+            # Una consulta interrumpida llega como error de SQLite
+            self._post("cancelled" if job.cancelled else "error", job, e)
+            return
+        finally:
+            with self._lock:
+                self._running = None
+        self._post("cancelled" if job.cancelled else "done", job, result)
+
+    def _interrupt(self, job):
+        with self._lock:
+            if self._running is job and self._storage is not None:
+                self._storage.interrupt()
+
+    def _post(self, kind, job, value):
+        self._queue.put((kind, job, value))
+
+    def _schedule_poll(self):
+        # El scheduler pudo cancelarlo (cancel_owner del dueño)
+        if self._poll_key is None or not self.scheduler.is_active(self._poll_key):
+            self._poll_key = self.scheduler.every(self.POLL_MS, self._poll, owner=self.owner)
+
+    def _poll(self):
+        while True:
+            try:
+                kind, job, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if not job.cancelled and job.on_progress is not None:
+                    job.on_progress(*value)
+                continue
+            self._jobs.discard(job)
+            if job.cancelled:
+                # Cancelada después de terminar: sus widgets pueden ya no existir
+                kind = "cancelled"
+            if kind == "done" and job.on_done is not None:
+                job.on_done(value)
+            elif kind == "error":
+                (job.on_error or self._report_error)(value)
+            elif kind == "cancelled" and job.on_cancel is not None:
+                job.on_cancel()
+        if not self._jobs:
+            # Sin pendientes se deja de sondear hasta el próximo submit
+            self._poll_key = None
+            return False
+
+    @staticmethod
+    def _report_error(error):
+        print("Error de almacenamiento:", error)
+
+    def shutdown(self):
+        """Cancela lo pendiente y cierra el almacenamiento sin esperar al hilo"""
+        self.cancel_all()
+        if self._poll_key is not None:
+            self.scheduler.cancel(self._poll_key)
+            self._poll_key = None
+
+        def close():
+            if self._storage is not None:
+                self._storage.close()
+        self._executor.submit(close)
+        self._executor.shutdown(wait=False)
+
+
+# --------------------------
+# Trabajos repetidos del mainloop
+# --------------------------
+class TkScheduler:
+    """Los root.after repetidos del panel, cada uno con un dueño.
+
+    every(ms, fn, owner) llama a fn cada ms milisegundos hasta que se cancela
+    (o fn devuelve False). cancel_owner(dueño) corta de una vez los de una
+    vista al salir de ella y cancel_all() los de la sesión, así no quedan
+    cadenas de after huérfanas llamando a widgets ya destruidos.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._jobs = {}
+        self._ids = itertools.count()
+
+    def every(self, ms, fn, owner=None):
+        key = next(self._ids)
+        job = {"owner": owner, "after": None}
+
+        def tick():
+            job["after"] = None
+            again = False
+            try:
+                again = fn() is not False
+            finally:
+                # fn pudo cancelar su propio trabajo
+                if again and key in self._jobs:
+                    job["after"] = self.root.after(ms, tick)
+                else:
+                    self._jobs.pop(key, None)
+
+        self._jobs[key] = job
+        job["after"] = self.root.after(ms, tick)
+        return key
+
+    def cancel(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None and job["after"] is not None:
+            self.root.after_cancel(job["after"])
+
+    def cancel_owner(self, owner):
+        for key in [k for k, job in self._jobs.items() if job["owner"] == owner]:
+            self.cancel(key)
+
+    def cancel_all(self):
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def is_active(self, key):
+        return key in self._jobs
+
+    def pending(self):
+        return len(self._jobs)
@@ -1,68 +1,78 @@
+import time
+_STARTED = time.perf_counter()
 import sys
-import json
-import os
-from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QCheckBox,
     QScrollArea, QFrame, QDialog, QDialogButtonBox,
     QComboBox, QDateTimeEdit, QCalendarWidget,
-    QTimeEdit, QMessageBox, QSystemTrayIcon, QMenu, QDateEdit
+    QTimeEdit, QMessageBox, QSystemTrayIcon, QMenu, QDateEdit,
+    QTreeView, QListView, QAbstractItemView, QSpinBox
 )
-from PySide6.QtCore import QTimer, QTime, QDate, Qt, QPoint, QDateTime, QUrl, QEasingCurve, Property
-from PySide6.QtGui import QFont, QIcon, QColor, QPixmap, QPainter, QAction, QPalette
-from PySide6.QtMultimedia import QSoundEffect
+from PySide6.QtCore import (
+    QTimer, QTime, QDate, Qt, QPoint, QDateTime, QEasingCurve, Property, Signal,
+    QPropertyAnimation, QAbstractAnimation, QEvent, QRectF, QObject
+)
+from PySide6.QtGui import QFont, QIcon, QColor, QPixmap, QPainter, QAction, QPalette, QLinearGradient, QPen, QRegion
+from alarm_scheduler import AlarmScheduler
+from storage import open_storage
+from history_model import HistoryModel, HistoryDelegate, SearchResultsModel
+from write_behind import WriteBehind
+from io_worker import StorageWorker
+from task_model import TaskListModel, TaskDelegate
+from sound_service import SoundService
+from timer_service import TimerService
+from notification_manager import NotificationManager
+import theme
+import recurrence
+_IMPORTED = time.perf_counter()
 
 # --------------------------
 # Alarm Notification widget
 # --------------------------
 class AlarmNotification(QWidget):
-    def __init__(self, alarm_data, parent=None):
+    # Un ciclo completo del "pulso" del borde y cuántos tonos distintos tiene
+    PULSE_PERIOD_MS = 2400
+    PULSE_STEPS = 6
+    RADIUS = 12
+    _backgrounds = {}   # (color, ancho, alto, dpr) -> QPixmap del fondo
+    AUTO_CLOSE_MS = 120000
+
+    # Se emite al cerrarse; NotificationManager reutiliza la instancia
+    closed = Signal(object)
+
+    def __init__(self, alarm_data=None, parent=None, sound=None):
         super().__init__(parent)
-        self.alarm_data = alarm_data
+        self.alarm_data = None
+        self.sound = sound
         # Frameless, always on top, tool (no taskbar)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setFixedSize(380, 170)
 
-        # Posicionar en la esquina inferior derecha
-        screen_geometry = QApplication.primaryScreen().availableGeometry()
-        self.move(screen_geometry.width() - self.width() - 20,
-                  screen_geometry.height() - self.height() - 60)
-
         self.setup_ui()
 
-        # Sonido de alarma
-        self.sound_effect = QSoundEffect()
-        self.sound_path = self.get_alarm_sound()
-        self.sound_timer = None
-
-        if self.sound_path and os.path.exists(self.sound_path):
-            try:
-                self.sound_effect.setSource(QUrl.fromLocalFile(self.sound_path))
-                self.sound_effect.setVolume(0.8)
-                # Timer para repetir sonido cada 2s
-                self.sound_timer = QTimer(self)
-                self.sound_timer.timeout.connect(self.play_alarm_sound)
-                self.sound_timer.start(2000)
-                self.play_alarm_sound()
-                print(f"🔊 Reproduciendo sonido: {self.sound_path}")
-            except Exception as e:
-                print("⚠️ Error inicializando sonido:", e)
-        else:
-            print("⚠️ No se encontró archivo de sonido de alarma")
-
         # Auto-cerrar después de 2 minutos
         self.auto_close_timer = QTimer(self)
+        self.auto_close_timer.setSingleShot(True)
         self.auto_close_timer.timeout.connect(self.auto_close)
-        self.auto_close_timer.start(120000)
 
-        # Efecto simple: "pulse" visual (cambia la opacidad de un overlay)
-        self.pulse_timer = QTimer(self)
-        self.pulse_value = 0
-        self.pulse_direction = 1
-        self.pulse_timer.timeout.connect(self._pulse_step)
-        self.pulse_timer.start(120)  # cada 120 ms
+        # Pulso del borde: una animación sobre la propiedad "pulse" que el
+        # paintEvent dibuja; solo se repinta el borde y solo al cambiar de tono
+        self._pulse = 0.0
+        self._pulse_level = 0
+        self.pulse_animation = QPropertyAnimation(self, b"pulse", self)
+        self.pulse_animation.setDuration(self.PULSE_PERIOD_MS)
+        self.pulse_animation.setStartValue(0.0)
+        self.pulse_animation.setKeyValueAt(0.5, 1.0)
+        self.pulse_animation.setEndValue(0.0)
+        self.pulse_animation.setEasingCurve(QEasingCurve.InOutSine)
+        self.pulse_animation.setLoopCount(-1)
+        # Pausada mientras no se ve (oculta, tapada, pantalla bloqueada)
+        QApplication.instance().applicationStateChanged.connect(self._update_pulse_state)
+
+        if alarm_data is not None:
+            self.bind(alarm_data)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -72,17 +82,7 @@ class AlarmNotification(QWidget):
         self.background_frame = QFrame()
         self.background_frame.setObjectName("alarm_background")
         
-        # Color de fondo basado en prioridad
-        color = self.alarm_data.get("color", "green")
-        bg_color = self._get_background_color(color)
-        
-        self.background_frame.setStyleSheet(f"""
-            QFrame#alarm_background {{
-                background: {bg_color};
-                border-radius: 12px;
-                border: 1px solid rgba(255,255,255,0.06);
-            }}
-        """)
+        # El fondo según la prioridad lo pinta paintEvent
         frame_layout = QVBoxLayout(self.background_frame)
         frame_layout.setContentsMargins(14, 12, 14, 12)
         frame_layout.setSpacing(8)
@@ -91,74 +91,48 @@ class AlarmNotification(QWidget):
         header = QHBoxLayout()
         icon_label = QLabel()
         icon_label.setText("⏰")
-        icon_label.setStyleSheet("font-size: 20px;")
+        icon_label.setObjectName("alarm_icon")
         header.addWidget(icon_label)
 
         title_label = QLabel("Recordatorio")
-        title_label.setStyleSheet("font-size:16px; font-weight:600; color:#FFD966;")
+        title_label.setObjectName("alarm_title")
         header.addWidget(title_label)
         header.addStretch()
 
         close_btn = QPushButton("✕")
         close_btn.setFixedSize(24, 24)
         close_btn.setToolTip("Cerrar")
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                color: #ddd;
-                border: none;
-                font-size: 14px;
-            }
-            QPushButton:hover { color: white; background: rgba(255,255,255,0.04); border-radius:6px; }
-        """)
+        close_btn.setObjectName("alarm_close")
         close_btn.clicked.connect(self.close_alarm)
         header.addWidget(close_btn)
         frame_layout.addLayout(header)
 
         # Texto de la tarea en caja destacada
-        self.task_label = QLabel(self.alarm_data.get("text", "Tarea"))
+        self.task_label = QLabel()
         self.task_label.setWordWrap(True)
-        self.task_label.setStyleSheet("""
-            QLabel {
-                font-size: 13px;
-                padding: 8px;
-                border-radius: 8px;
-                background: rgba(255,255,255,0.03);
-                color: #ffffff;
-            }
-        """)
+        self.task_label.setObjectName("alarm_task")
         frame_layout.addWidget(self.task_label)
 
         # Info de fecha/hora y prioridad
         bottom_row = QHBoxLayout()
-        alarm_time = QDateTime.fromString(self.alarm_data.get("reminder_time", ""), Qt.ISODate)
-        if not alarm_time.isValid():
-            # intenta parsear si viene como QDateTime str con otro formato
-            try:
-                alarm_time = QDateTime.fromString(self.alarm_data.get("reminder_time", ""), "dd/MM/yyyy hh:mm")
-            except:
-                alarm_time = QDateTime.currentDateTime()
-
-        date_label = QLabel(f"📅 {alarm_time.toString('dd/MM/yyyy')}")
-        time_label = QLabel(f"🕒 {alarm_time.toString('HH:mm')}")
+        self.date_label = date_label = QLabel()
+        self.time_label = time_label = QLabel()
         for lbl in (date_label, time_label):
-            lbl.setStyleSheet("color: #BFC7C9; font-size: 11px;")
+            lbl.setObjectName("alarm_when")
         bottom_row.addWidget(date_label)
         bottom_row.addWidget(time_label)
         bottom_row.addStretch()
 
         # Prioridad
-        color = self.alarm_data.get("color", "green")
-        color_name_text = self.alarm_data.get("color_name", "🟢 Normal")
-        priority_label = QLabel(f"{color_name_text}")
-        priority_label.setStyleSheet(self._priority_style(color))
-        bottom_row.addWidget(priority_label)
+        self.priority_label = QLabel()
+        self.priority_label.setObjectName("alarm_priority")
+        bottom_row.addWidget(self.priority_label)
         frame_layout.addLayout(bottom_row)
 
         # Separador
         sep = QFrame()
         sep.setFrameShape(QFrame.HLine)
-        sep.setStyleSheet("background: rgba(255,255,255,0.03); max-height:1px;")
+        sep.setObjectName("alarm_separator")
         frame_layout.addWidget(sep)
 
         # Botones: Posponer y Completar
@@ -166,32 +140,13 @@ class AlarmNotification(QWidget):
         snooze_btn = QPushButton("Posponer 5 min")
         snooze_btn.setCursor(Qt.PointingHandCursor)
         snooze_btn.setFixedHeight(30)
-        snooze_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                color: #ddd;
-                border: 1px solid rgba(255,255,255,0.04);
-                padding: 6px 12px;
-                border-radius: 6px;
-            }
-            QPushButton:hover { background: rgba(255,255,255,0.02); }
-        """)
+        snooze_btn.setObjectName("snooze_button")
         snooze_btn.clicked.connect(self.snooze_alarm)
 
         complete_btn = QPushButton("Completar")
         complete_btn.setCursor(Qt.PointingHandCursor)
         complete_btn.setFixedHeight(30)
-        complete_btn.setStyleSheet("""
-            QPushButton {
-                background: #28a745;
-                color: white;
-                border: none;
-                padding: 6px 12px;
-                border-radius: 6px;
-                font-weight: 600;
-            }
-            QPushButton:hover { background: #23903f; }
-        """)
+        complete_btn.setObjectName("complete_button")
         complete_btn.clicked.connect(self.complete_alarm)
 
         btn_row.addWidget(snooze_btn)
@@ -202,70 +157,34 @@ class AlarmNotification(QWidget):
         layout.addWidget(self.background_frame)
         self.setLayout(layout)
 
-    def _get_background_color(self, color):
-        """Devuelve el color de fondo basado en la prioridad"""
-        colors = {
-            "red": "qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #3a2326, stop:1 #2a1518)",
-            "yellow": "qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #3a3a26, stop:1 #2a2a18)",
-            "blue": "qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #232a3a, stop:1 #151c2a)",
-            "green": "qlineargradient(x1:0,y1:0,x2:0,y2:1, stop:0 #2a3a26, stop:1 #1a2a18)",
-        }
-        return colors.get(color, colors["green"])
-
-    def _priority_style(self, color):
-        styles = {
-            "red": "color: #FFB6B6; font-size: 12px; font-weight:600;",
-            "yellow": "color: #FFD966; font-size: 12px; font-weight:600;",
-            "blue": "color: #A6D8FF; font-size: 12px; font-weight:600;",
-            "green": "color: #A9F38B; font-size: 12px; font-weight:600;",
-        }
-        return styles.get(color, styles["green"])
-
-    def get_alarm_sound(self):
-        # Primero busca en recursos embebidos
-        if hasattr(sys, '_MEIPASS'):
-            # Modo compilado
-            base_path = Path(sys._MEIPASS)
-            embedded_path = base_path / "alarm.wav"
-            if embedded_path.exists():
-                return str(embedded_path)
-        
-        # Luego busca en rutas normales
-        possible_paths = [
-            Path("alarm.wav"),
-            Path("sound.wav"),
-            Path.home() / "Documents" / "ProductivityApp" / "alarm.wav",
-            Path.home() / "Desktop" / "alarm.wav",
-            Path.home() / "OneDrive" / "Escritorio" / "alarm.wav",
-        ]
-        for p in possible_paths:
-            if p.exists():
-                print("✅ Encontrado archivo de sonido:", p)
-                return str(p)
-        print("❌ No se encontró ningún archivo de sonido")
-        return ""
-
-    def play_alarm_sound(self):
-        try:
-            if self.sound_effect:
-                # Si ya está sonando, reiniciarlo para que se oiga limpio
-                self.sound_effect.stop()
-                self.sound_effect.play()
-        except Exception as e:
-            print("Error reproduciendo sonido:", e)
+    def bind(self, alarm_data):
+        """Muestra otra alarma en esta misma ventana (sin reconstruir la UI)"""
+        self.alarm_data = alarm_data
+        self.task_label.setText(alarm_data.get("text", "Tarea"))
+
+        alarm_time = QDateTime.fromString(alarm_data.get("reminder_time") or "", Qt.ISODate)
+        if not alarm_time.isValid():
+            # intenta parsear si viene como QDateTime str con otro formato
+            alarm_time = QDateTime.fromString(alarm_data.get("reminder_time") or "", "dd/MM/yyyy hh:mm")
+        if not alarm_time.isValid():
+            alarm_time = QDateTime.currentDateTime()
+        self.date_label.setText(f"📅 {alarm_time.toString('dd/MM/yyyy')}")
+        self.time_label.setText(f"🕒 {alarm_time.toString('HH:mm')} {recurrence.describe(alarm_data.get('recurrence'))}".rstrip())
+
+        color = alarm_data.get("color", "green")
+        self.priority_label.setText(alarm_data.get("color_name", "🟢 Normal"))
+        theme.set_state(self.priority_label, "priority", color if color in theme.PRIORITY_TEXT else "green")
+        self.update()
+
+        # Sonido de alarma: un solo efecto compartido por todas las notificaciones
+        if self.sound is not None:
+            self.sound.start(self)
+        self.auto_close_timer.start(self.AUTO_CLOSE_MS)
 
     def snooze_alarm(self):
-        new_time = QDateTime.currentDateTime().addSecs(300)  # 5 minutos
         # enviar al padre (ProductivityWidget) en formato ISO string
-        alarm_data = {
-            "text": self.alarm_data.get("text"),
-            "color": self.alarm_data.get("color", "green"),
-            "color_name": self.alarm_data.get("color_name", "🟢 Normal"),
-            "reminder_time": new_time.toString(Qt.ISODate),
-            "created": QDateTime.currentDateTime().toString(Qt.ISODate)
-        }
         if self.parent() is not None and hasattr(self.parent(), "save_snoozed_alarm"):
-            self.parent().save_snoozed_alarm(alarm_data)
+            self.parent().save_snoozed_alarm(snoozed_alarm(self.alarm_data))
         self.close_alarm()
 
     def complete_alarm(self):
@@ -274,44 +193,261 @@ class AlarmNotification(QWidget):
         self.close_alarm()
 
     def close_alarm(self):
+        if self.alarm_data is None:
+            return
         # detener timers y sonidos
-        if hasattr(self, "sound_timer") and self.sound_timer:
-            self.sound_timer.stop()
-        if hasattr(self, "sound_effect") and self.sound_effect:
-            try:
-                self.sound_effect.stop()
-            except:
-                pass
-        if hasattr(self, "auto_close_timer") and self.auto_close_timer:
-            self.auto_close_timer.stop()
-        if hasattr(self, "pulse_timer") and self.pulse_timer:
-            self.pulse_timer.stop()
+        if self.sound is not None:
+            self.sound.stop(self)
+        self.auto_close_timer.stop()
+        self.pulse_animation.stop()
         self.close()
+        self.alarm_data = None
+        self.closed.emit(self)
 
     def auto_close(self):
         self.close_alarm()
 
-    def _pulse_step(self):
-        # simple pulso para dar vida a la notificación (no usa animaciones avanzadas)
-        self.pulse_value += 0.08 * self.pulse_direction
-        if self.pulse_value > 1.0:
-            self.pulse_value = 1.0
-            self.pulse_direction = -1
-        elif self.pulse_value < 0.0:
-            self.pulse_value = 0.0
-            self.pulse_direction = 1
-        # Cambiar sutilmente el borde para que "respire"
-        alpha = 40 + int(40 * self.pulse_value)
-        color = self.alarm_data.get("color", "green")
-        bg_color = self._get_background_color(color)
-        self.background_frame.setStyleSheet(f"""
-            QFrame#alarm_background {{
-                background: {bg_color};
-                border-radius: 12px;
-                border: 1px solid rgba(255,255,255,{alpha/255:.2f});
-                box-shadow: 0 6px 18px rgba(0,0,0,0.45);
-            }}
-        """)
+    # Pulso
+    def _get_pulse(self):
+        return self._pulse
+
+    def _set_pulse(self, value):
+        self._pulse = value
+        level = round(value * (self.PULSE_STEPS - 1))
+        if level != self._pulse_level:
+            self._pulse_level = level
+            # Solo el anillo del borde: los hijos no se vuelven a pintar
+            rect = self.rect()
+            self.update(QRegion(rect).subtracted(QRegion(rect.adjusted(2, 2, -2, -2))))
+
+    pulse = Property(float, _get_pulse, _set_pulse)
+
+    def _update_pulse_state(self, *args):
+        window = self.windowHandle()
+        visible = (self.isVisible() and window is not None and window.isExposed()
+                   and QApplication.applicationState() not in (Qt.ApplicationHidden, Qt.ApplicationSuspended))
+        state = self.pulse_animation.state()
+        if visible and state == QAbstractAnimation.Paused:
+            self.pulse_animation.resume()
+        elif visible and state == QAbstractAnimation.Stopped:
+            self.pulse_animation.start()
+        elif not visible and state == QAbstractAnimation.Running:
+            self.pulse_animation.pause()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.windowHandle()
+        if window is not None:
+            # Los cambios de exposición llegan a la ventana nativa, no al widget
+            window.removeEventFilter(self)
+            window.installEventFilter(self)
+        self._update_pulse_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_pulse_state()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Expose:
+            self._update_pulse_state()
+        return False
+
+    def _background_pixmap(self):
+        color = (self.alarm_data or {}).get("color", "green")
+        if color not in theme.ALARM_GRADIENTS:
+            color = "green"
+        dpr = self.devicePixelRatioF()
+        key = (color, self.width(), self.height(), dpr)
+        pixmap = self._backgrounds.get(key)
+        if pixmap is None:
+            top, bottom = theme.ALARM_GRADIENTS[color]
+            pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            gradient = QLinearGradient(0, 0, 0, self.height())
+            gradient.setColorAt(0, QColor(top))
+            gradient.setColorAt(1, QColor(bottom))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(gradient)
+            painter.drawRoundedRect(QRectF(0, 0, self.width(), self.height()), self.RADIUS, self.RADIUS)
+            painter.end()
+            self._backgrounds[key] = pixmap
+        return pixmap
+
+    def paintEvent(self, event):
+        # Fondo cacheado + borde con el alfa del pulso (40..80)
+        alpha = 40 + round(40 * self._pulse_level / (self.PULSE_STEPS - 1))
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background_pixmap())
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor(255, 255, 255, alpha), 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5), self.RADIUS, self.RADIUS)
+        painter.end()
+
+def snoozed_alarm(alarm_data, minutes=5):
+    """Copia de una alarma para dentro de unos minutos (sin repetición)"""
+    return {
+        "text": alarm_data.get("text"),
+        "color": alarm_data.get("color", "green"),
+        "color_name": alarm_data.get("color_name", "🟢 Normal"),
+        "reminder_time": QDateTime.currentDateTime().addSecs(minutes * 60).toString(Qt.ISODate),
+        "created": QDateTime.currentDateTime().toString(Qt.ISODate)
+    }
+
+
+# --------------------------
+# Alarmas perdidas
+# --------------------------
+class MissedAlarmsNotification(QWidget):
+    """Una sola ventana con las alarmas que vencieron sin mostrarse.
+
+    Al arrancar o al volver de una suspensión pueden acumularse muchas; en
+    lugar de una notificación y un sonido por alarma se listan todas aquí,
+    con Completar/Posponer por ítem o para todas.
+    """
+    ROW_HEIGHT = 46
+    MAX_VISIBLE_ROWS = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setFixedWidth(380)
+        self._rows = {}   # id(alarm) -> (alarm, fila)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        background = QFrame()
+        background.setObjectName("missed_background")
+        frame_layout = QVBoxLayout(background)
+        frame_layout.setContentsMargins(14, 12, 14, 12)
+        frame_layout.setSpacing(8)
+
+        header = QHBoxLayout()
+        icon_label = QLabel("⏰")
+        icon_label.setObjectName("alarm_icon")
+        header.addWidget(icon_label)
+        self.title_label = QLabel()
+        self.title_label.setObjectName("alarm_title")
+        header.addWidget(self.title_label)
+        header.addStretch()
+        close_btn = QPushButton("✕")
+        close_btn.setFixedSize(24, 24)
+        close_btn.setToolTip("Cerrar")
+        close_btn.setObjectName("alarm_close")
+        close_btn.clicked.connect(self.close)
+        header.addWidget(close_btn)
+        frame_layout.addLayout(header)
+
+        self.rows_container = QWidget()
+        self.rows_container.setObjectName("missed_rows")
+        self.rows_layout = QVBoxLayout(self.rows_container)
+        self.rows_layout.setContentsMargins(0, 0, 0, 0)
+        self.rows_layout.setSpacing(4)
+        self.rows_layout.addStretch()
+        self.scroll = QScrollArea()
+        self.scroll.setObjectName("missed_list")
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.scroll.setWidget(self.rows_container)
+        frame_layout.addWidget(self.scroll)
+
+        btn_row = QHBoxLayout()
+        snooze_all = QPushButton("Posponer todas")
+        snooze_all.setCursor(Qt.PointingHandCursor)
+        snooze_all.setFixedHeight(30)
+        snooze_all.setObjectName("snooze_button")
+        snooze_all.clicked.connect(self.snooze_all)
+        complete_all = QPushButton("Completar todas")
+        complete_all.setCursor(Qt.PointingHandCursor)
+        complete_all.setFixedHeight(30)
+        complete_all.setObjectName("complete_button")
+        complete_all.clicked.connect(self.complete_all)
+        btn_row.addWidget(snooze_all)
+        btn_row.addStretch()
+        btn_row.addWidget(complete_all)
+        frame_layout.addLayout(btn_row)
+        layout.addWidget(background)
+
+    def add_alarms(self, alarms):
+        for alarm in alarms:
+            if id(alarm) not in self._rows:
+                row = self._make_row(alarm)
+                self.rows_layout.insertWidget(self.rows_layout.count() - 1, row)
+                self._rows[id(alarm)] = (alarm, row)
+        self._relayout()
+
+    def _make_row(self, alarm):
+        row = QFrame()
+        row.setObjectName("missed_row")
+        row.setFixedHeight(self.ROW_HEIGHT - 4)
+        row_layout = QHBoxLayout(row)
+        row_layout.setContentsMargins(8, 2, 4, 2)
+        when = QDateTime.fromString(alarm.get("reminder_time") or "", Qt.ISODate)
+        text = QLabel(f"{alarm.get('text', '')}\n🕒 {when.toString('dd/MM HH:mm')}")
+        text.setObjectName("missed_text")
+        color = alarm.get("color", "green")
+        text.setProperty("priority", color if color in theme.PRIORITY_TEXT else "green")
+        row_layout.addWidget(text, 1)
+        snooze_btn = QPushButton("⏰")
+        snooze_btn.setToolTip("Posponer 5 min")
+        snooze_btn.setFixedSize(28, 28)
+        snooze_btn.setObjectName("missed_snooze")
+        snooze_btn.clicked.connect(lambda: self.snooze(alarm))
+        row_layout.addWidget(snooze_btn)
+        complete_btn = QPushButton("✓")
+        complete_btn.setToolTip("Completar")
+        complete_btn.setFixedSize(28, 28)
+        complete_btn.setObjectName("missed_complete")
+        complete_btn.clicked.connect(lambda: self.complete(alarm))
+        row_layout.addWidget(complete_btn)
+        return row
+
+    def _relayout(self):
+        count = len(self._rows)
+        self.title_label.setText("1 alarma perdida" if count == 1 else f"{count} alarmas perdidas")
+        self.scroll.setFixedHeight(min(count, self.MAX_VISIBLE_ROWS) * self.ROW_HEIGHT)
+        self.adjustSize()
+        # Arriba a la derecha, para no tapar la pila de notificaciones
+        screen = QApplication.primaryScreen().availableGeometry()
+        self.move(screen.x() + screen.width() - self.width() - 20, screen.y() + 20)
+
+    def complete(self, alarm):
+        if self.parent() is not None and hasattr(self.parent(), "complete_alarm_task"):
+            self.parent().complete_alarm_task(alarm)
+        self._drop(alarm)
+
+    def snooze(self, alarm):
+        if self.parent() is not None and hasattr(self.parent(), "save_snoozed_alarm"):
+            self.parent().save_snoozed_alarm(snoozed_alarm(alarm))
+        self._drop(alarm)
+
+    def complete_all(self):
+        for alarm, _ in list(self._rows.values()):
+            self.complete(alarm)
+
+    def snooze_all(self):
+        for alarm, _ in list(self._rows.values()):
+            self.snooze(alarm)
+
+    def _drop(self, alarm):
+        _, row = self._rows.pop(id(alarm))
+        row.deleteLater()
+        if self._rows:
+            self._relayout()
+        else:
+            self.close()
+
+    def closeEvent(self, event):
+        # Cerrar sin elegir deja las alarmas como vistas
+        for _, row in self._rows.values():
+            row.deleteLater()
+        self._rows.clear()
+        super().closeEvent(event)
+
 
 # --------------------------
 # Task Dialog
@@ -321,109 +457,8 @@ class TaskDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Configurar Tarea")
         self.setModal(True)
-        self.setFixedSize(420, 420)
+        self.setFixedSize(420, 500)
         
-        # Aplicar estilo unificado
-        self.setStyleSheet("""
-            TaskDialog {
-                background-color: #1e2021;
-                color: white;
-            }
-            QLabel { 
-                color: white; 
-                font-size: 13px;
-            }
-            QLineEdit { 
-                background-color: #2a2d2e; 
-                border: 1px solid #444; 
-                border-radius: 6px; 
-                padding: 8px; 
-                font-size: 13px; 
-                color: white; 
-            }
-            QComboBox { 
-                background-color: #2a2d2e; 
-                border: 1px solid #444; 
-                border-radius: 6px; 
-                padding: 8px; 
-                color: white; 
-                min-height: 20px;
-                font-size: 13px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 25px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 5px solid #888;
-                width: 0px;
-                height: 0px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2a2d2e;
-                border: 1px solid #444;
-                color: white;
-                selection-background-color: #0078D7;
-                outline: none;
-                padding: 4px;
-            }
-            QComboBox QAbstractItemView::item {
-                padding: 6px 8px;
-                border-radius: 3px;
-            }
-            QDateEdit, QTimeEdit { 
-                background-color: #2a2d2e; 
-                border: 1px solid #444; 
-                border-radius: 6px; 
-                padding: 6px; 
-                color: white; 
-            }
-            QDateEdit::drop-down, QTimeEdit::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QCheckBox { 
-                color: white; 
-                font-size: 13px;
-                spacing: 8px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border-radius: 3px;
-                border: 1px solid #555;
-                background: #2a2d2e;
-            }
-            QCheckBox::indicator:checked {
-                background: #0078D7;
-                border: 1px solid #0078D7;
-            }
-            QPushButton {
-                background-color: #0078D7;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: 600;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background-color: #0099FF;
-            }
-            QPushButton:pressed {
-                background-color: #0066B4;
-            }
-            QDialogButtonBox QPushButton[text="Cancel"] {
-                background-color: #6c757d;
-            }
-            QDialogButtonBox QPushButton[text="Cancel"]:hover {
-                background-color: #5a6268;
-            }
-        """)
-
         layout = QVBoxLayout()
         layout.setSpacing(12)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -478,10 +513,39 @@ class TaskDialog(QDialog):
         time_layout.addStretch()
         reminder_layout.addLayout(time_layout)
 
+        # Repetición: se guarda la regla una vez, no cada ocurrencia
+        repeat_layout = QHBoxLayout()
+        repeat_layout.addWidget(QLabel("Repetir:"))
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItem("No repetir", None)
+        for kind, label in recurrence.KINDS:
+            self.repeat_combo.addItem(label, kind)
+        self.repeat_combo.setEnabled(False)
+        self.repeat_combo.currentIndexChanged.connect(self.update_repeat_options)
+        repeat_layout.addWidget(self.repeat_combo)
+        self.hours_spin = QSpinBox()
+        self.hours_spin.setRange(1, 23)
+        self.hours_spin.setValue(4)
+        self.hours_spin.setSuffix(" h")
+        self.hours_spin.setVisible(False)
+        repeat_layout.addWidget(self.hours_spin)
+        repeat_layout.addStretch()
+        reminder_layout.addLayout(repeat_layout)
+
+        days_layout = QHBoxLayout()
+        self.day_checks = []
+        for name in recurrence.DAY_NAMES:
+            check = QCheckBox(name)
+            check.setVisible(False)
+            days_layout.addWidget(check)
+            self.day_checks.append(check)
+        days_layout.addStretch()
+        reminder_layout.addLayout(days_layout)
+
         layout.addLayout(reminder_layout)
 
         info_label = QLabel("💡 La alarma sonará en el momento programado")
-        info_label.setStyleSheet("color: #888; font-size: 11px; font-style: italic;")
+        info_label.setObjectName("dialog_hint")
         layout.addWidget(info_label)
 
         layout.addStretch()
@@ -496,23 +560,49 @@ class TaskDialog(QDialog):
     def toggle_reminder(self, checked):
         self.date_edit.setEnabled(checked)
         self.time_edit.setEnabled(checked)
+        self.repeat_combo.setEnabled(checked)
+
+    def update_repeat_options(self):
+        kind = self.repeat_combo.currentData()
+        self.hours_spin.setVisible(kind == "hourly")
+        for day, check in enumerate(self.day_checks, start=1):
+            check.setVisible(kind == "weekly")
+            # Por defecto, el día de la fecha elegida
+            check.setChecked(kind == "weekly" and day == self.date_edit.date().dayOfWeek())
 
     def get_task_data(self):
         reminder_time = None
+        rule = None
         if self.reminder_check.isChecked():
             reminder_time = QDateTime(self.date_edit.date(), self.time_edit.time())
+            kind = self.repeat_combo.currentData()
+            if kind:
+                days = [day for day, check in enumerate(self.day_checks, start=1) if check.isChecked()]
+                rule = recurrence.make_rule(kind, reminder_time.toString(Qt.ISODate),
+                                            days=days, hours=self.hours_spin.value())
+                # Si la hora elegida ya pasó, el primer aviso es la próxima ocurrencia
+                now = QDateTime.currentDateTime()
+                if reminder_time <= now:
+                    reminder_time = recurrence.next_occurrence(rule, now) or reminder_time
         return {
             "text": self.task_input.text().strip(),
             "color": self.color_combo.currentData(),
             "color_name": self.color_combo.currentText(),
             "has_reminder": self.reminder_check.isChecked(),
-            "reminder_time": reminder_time  # QDateTime or None
+            "reminder_time": reminder_time,  # QDateTime or None
+            "recurrence": rule
         }
 
 # --------------------------
 # Productivity main widget
 # --------------------------
 class ProductivityWidget(QWidget):
+    # Una alarma que llega con más de este retraso se trata como perdida
+    MISSED_GRACE_MS = 60000
+
+    # Se emite cuando terminaron las cargas iniciales de tareas y alarmas
+    data_loaded = Signal()
+
     def __init__(self):
         super().__init__()
 
@@ -522,17 +612,31 @@ class ProductivityWidget(QWidget):
         self.is_expanded = False
         self.drag_pos = QPoint()
 
-        # Alarmas pendientes
-        self.pending_alarms = []
-        self.alarm_timer = QTimer(self)
-        self.alarm_timer.timeout.connect(self.check_alarms)
-        self.alarm_timer.start(1000)
-
-        # Carpetas y archivos
-        documents_dir = Path.home() / "Documents" / "ProductivityApp"
-        documents_dir.mkdir(parents=True, exist_ok=True)
-        self.history_file = documents_dir / "historial.json"
-        self.alarms_file = documents_dir / "alarms.json"
+        # Alarmas pendientes (heap + un único timer single-shot)
+        self.alarm_scheduler = AlarmScheduler(self)
+        self.alarm_scheduler.alarms_due.connect(self.fire_alarms)
+
+        # Almacenamiento (SQLite en Documents/ProductivityApp, migra los JSON antiguos)
+        # Solo el hilo de E/S toca el disco; los resultados vuelven por señales
+        self.io_worker = StorageWorker(open_storage, self)
+        # Tareas activas y alarmas se guardan agrupadas tras un breve debounce
+        self.write_behind = WriteBehind(self.io_worker, self)
+
+        # Un solo timer de segundos (reloj y repetición del sonido), alineado
+        # al cambio de segundo y detenido mientras nadie lo necesita
+        self.timer_service = TimerService(self)
+        # El reloj muestra segundos solo con la ventana activa
+        self._clock_seconds = False
+        # Suspensión o cambio de hora: revisar enseguida las alarmas vencidas
+        self.timer_service.clock_jumped.connect(self.on_clock_jumped)
+        self.timer_service.watch_clock()
+        self.missed_notification = None
+
+        # Sonido de alarma: se carga cuando hay alarmas programadas
+        self.sound_service = SoundService(self.timer_service, self)
+        # Notificaciones apiladas, con tope en pantalla y ventanas reutilizadas
+        self.notifications = NotificationManager(
+            lambda: AlarmNotification(parent=self, sound=self.sound_service), self)
 
         # Widgets
         self.date_label = QLabel()
@@ -561,28 +665,23 @@ class ProductivityWidget(QWidget):
         self.input_layout.addWidget(self.quick_add_button)
         self.input_layout.addWidget(self.detailed_add_button)
 
-        
-        self.scroll_area = QScrollArea()
-        self.scroll_widget = QWidget()
-        self.scroll_widget.setObjectName("scroll_widget")
-        self.task_list_layout = QVBoxLayout()
-        self.task_list_layout.setAlignment(Qt.AlignTop)
-        self.scroll_widget.setLayout(self.task_list_layout)
-        self.scroll_area.setWidget(self.scroll_widget)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollArea #scroll_widget {
-                background: rgba(255,255,255,0.02);
-                border-radius: 6px;
-            }
-        """)
+
+        # Checklist como vista sobre el modelo ordenado: el delegate pinta
+        # cada fila, sin un widget por tarea
+        self.task_model = TaskListModel(self)
+        self.task_model.check_toggled.connect(self.complete_task, Qt.QueuedConnection)
+        self.task_view = QListView()
+        self.task_view.setObjectName("task_view")
+        self.task_view.setModel(self.task_model)
+        self.task_view.setItemDelegate(TaskDelegate(self.task_view))
+        self.task_view.setUniformItemSizes(True)
+        self.task_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.task_view.setFocusPolicy(Qt.NoFocus)
+        self.task_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.task_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
         self.checklist_layout = QVBoxLayout()
         self.checklist_layout.addLayout(self.input_layout)
-        self.checklist_layout.addWidget(self.scroll_area)
+        self.checklist_layout.addWidget(self.task_view)
         self.checklist_container.setLayout(self.checklist_layout)
         self.checklist_container.setVisible(False)
 
@@ -592,39 +691,52 @@ class ProductivityWidget(QWidget):
         self.history_toggle_button.setCheckable(True)
         self.history_toggle_button.setVisible(False)
         self.history_container = QWidget()
-        self.history_scroll_area = QScrollArea()
-        self.history_scroll_widget = QWidget()
-        self.history_scroll_widget.setObjectName("history_scroll_widget")
-        self.history_list_layout = QVBoxLayout()
-        self.history_list_layout.setAlignment(Qt.AlignTop)
-        self.history_scroll_widget.setLayout(self.history_list_layout)
-        self.history_scroll_area.setWidget(self.history_scroll_widget)
-        self.history_scroll_area.setWidgetResizable(True)
-        self.history_scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollArea #history_scroll_widget {
-                background: rgba(255,255,255,0.02);
-                border-radius: 6px;
-            }
-        """)
+        # Vista virtualizada: solo se pintan las filas visibles y las tareas
+        # de cada día se piden al almacenamiento al expandirlo
+        self.history_model = HistoryModel(self.io_worker, self)
+        self.history_view = QTreeView()
+        self.history_view.setObjectName("history_view")
+        self.history_view.setModel(self.history_model)
+        self.history_view.setItemDelegate(HistoryDelegate(self.history_view))
+        self.history_view.setHeaderHidden(True)
+        self.history_view.setRootIsDecorated(False)
+        self.history_view.setIndentation(15)
+        self.history_view.setUniformRowHeights(True)
+        self.history_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.history_view.setFocusPolicy(Qt.NoFocus)
+        self.history_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.history_view.clicked.connect(self.toggle_history_day)
+        # Búsqueda en el historial (índice en la base, ver search_index.py);
+        # se consulta cuando se deja de escribir
+        self.history_search = QLineEdit()
+        self.history_search.setObjectName("history_search")
+        self.history_search.setPlaceholderText("🔎 Buscar en el historial...")
+        self.history_search.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.search_history)
+        self.history_search.textChanged.connect(self.search_timer.start)
+        self.search_model = SearchResultsModel(self.io_worker, self)
+        self.search_view = QListView()
+        self.search_view.setObjectName("search_view")
+        self.search_view.setModel(self.search_model)
+        self.search_view.setItemDelegate(HistoryDelegate(self.search_view))
+        self.search_view.setUniformItemSizes(True)
+        self.search_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.search_view.setFocusPolicy(Qt.NoFocus)
+        self.search_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.search_view.setVisible(False)
         self.history_layout = QVBoxLayout()
-        self.history_layout.addWidget(self.history_scroll_area)
+        self.history_layout.addWidget(self.history_search)
+        self.history_layout.addWidget(self.history_view)
+        self.history_layout.addWidget(self.search_view)
         self.history_container.setLayout(self.history_layout)
         self.history_container.setVisible(False)
 
-        # Fondo con estilo unificado
+        # Fondo con estilo unificado (ver theme.py)
         self.background_frame = QFrame()
-        self.background_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0,y1:0,x2:0,y2:1,
-                    stop:0 #2a2d2e, stop:1 #1e2021);
-                border-radius: 12px;
-                border: 1px solid rgba(255,255,255,0.06);
-            }
-        """)
+        self.background_frame.setObjectName("main_background")
         frame_layout = QVBoxLayout(self.background_frame)
         frame_layout.setContentsMargins(12, 12, 12, 12)
         frame_layout.setSpacing(8)
@@ -639,161 +751,11 @@ class ProductivityWidget(QWidget):
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.addWidget(self.background_frame)
 
-        # Estilos unificados
-        self.setStyleSheet("""
-            QLabel { color: white; }
-            #date_label { 
-                font-size: 13px; 
-                color: #CCCCCC; 
-                padding-top: 5px; 
-            }
-            #time_label { 
-                font-size: 30px; 
-                font-weight: 600; 
-                padding-bottom: 5px; 
-            }
-
-            QLineEdit { 
-                background-color: #2a2d2e; 
-                border: 1px solid #444; 
-                border-radius: 6px; 
-                padding: 8px; 
-                font-size: 13px; 
-                color: white; 
-            }
-            QPushButton { 
-                background-color: #0078D7; 
-                color: white; 
-                font-size: 14px; 
-                font-weight: 600; 
-                border-radius: 6px; 
-                min-width: 26px; 
-                min-height:26px; 
-                border: none;
-            }
-            QPushButton:hover { 
-                background-color: #0099FF; 
-            }
-            QPushButton:pressed {
-                background-color: #0066B4;
-            }
-
-            QScrollArea { 
-                border: none; 
-                background: transparent; 
-            }
-            
-            /* Estilos para checkboxes con colores */
-            QCheckBox { 
-                font-size: 13px; 
-                padding: 8px 6px; 
-                border-radius: 4px; 
-                margin: 2px; 
-                color: white;
-                spacing: 8px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border-radius: 3px;
-                border: 1px solid #555;
-                background: #2a2d2e;
-            }
-            QCheckBox::indicator:checked {
-                background: #28a745;
-                border: 1px solid #28a745;
-            }
-            QCheckBox:checked { 
-                text-decoration: line-through; 
-                color: #888;
-            }
-            
-            /* Colores para tareas normales (checkboxes) */
-            QCheckBox.task_red {
-                background: rgba(255, 100, 100, 0.15);
-                border-left: 3px solid #ff4444;
-                color: #ffb4b4;
-            }
-            QCheckBox.task_yellow {
-                background: rgba(255, 255, 100, 0.15);
-                border-left: 3px solid #ffff44;
-                color: #ffffb4;
-            }
-            QCheckBox.task_blue {
-                background: rgba(100, 100, 255, 0.15);
-                border-left: 3px solid #4444ff;
-                color: #b4b4ff;
-            }
-            QCheckBox.task_green {
-                background: rgba(100, 255, 100, 0.15);
-                border-left: 3px solid #44ff44;
-                color: #b4ffb4;
-            }
-
-            #history_button { 
-                font-size: 12px; 
-                font-weight: bold; 
-                color: #888; 
-                background: transparent; 
-                border: none; 
-                max-height: 24px; 
-                border-radius: 5px; 
-                text-align: left; 
-                padding: 2px 5px; 
-            }
-            #history_button:hover { 
-                color: white; 
-                background-color: rgba(255,255,255,0.05); 
-            }
-            #history_button:checked { 
-                color: white; 
-                background-color: rgba(255,255,255,0.08); 
-            }
-
-            QLabel#history_item { 
-                color: #777; 
-                text-decoration: line-through; 
-                font-size: 13px; 
-                padding: 2px 8px; 
-                background: transparent; 
-            }
-            
-            /* Estilos para alertas sin check */
-            QLabel.alert_item {
-                font-size: 13px;
-                padding: 8px 6px;
-                border-radius: 4px;
-                margin: 2px;
-            }
-            QLabel.alert_red {
-                background: rgba(255, 100, 100, 0.15);
-                border-left: 3px solid #ff4444;
-                color: #ffb4b4;
-            }
-            QLabel.alert_yellow {
-                background: rgba(255, 255, 100, 0.15);
-                border-left: 3px solid #ffff44;
-                color: #ffffb4;
-            }
-            QLabel.alert_blue {
-                background: rgba(100, 100, 255, 0.15);
-                border-left: 3px solid #4444ff;
-                color: #b4b4ff;
-            }
-            QLabel.alert_green {
-                background: rgba(100, 255, 100, 0.15);
-                border-left: 3px solid #44ff44;
-                color: #b4ffb4;
-            }
-        """)
-
-        self.scroll_widget.setObjectName("scroll_widget")
-        self.history_scroll_widget.setObjectName("history_scroll_widget")
-
-        # Timer de fecha/hora
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_datetime)
-        self.timer.start(1000)
+        # Fecha/hora: la hora con cada tick, la fecha solo al cambiar el día.
+        # El reloj se suspende mientras la ventana no se ve
+        self.timer_service.tick.connect(self.update_time)
+        self.timer_service.day_changed.connect(self.update_date)
+        QApplication.instance().applicationStateChanged.connect(self._update_clock_state)
         self.update_datetime()
 
         # Conexiones
@@ -804,16 +766,63 @@ class ProductivityWidget(QWidget):
 
         self.setFixedSize(260, 120)
 
-        # Cargar historial y alarmas
-        self.load_history()
-        self.load_alarms()
+        # Primero se muestra el reloj: tareas y alarmas se cargan apenas
+        # arranca el loop de eventos y el historial al abrirlo por primera vez
+        self._pending_loads = 2
+        QTimer.singleShot(0, self.load_tasks)
+        QTimer.singleShot(0, self.load_alarms)
 
     # Fecha / Hora
     def update_datetime(self):
-        current_date = QDate.currentDate().toString("dddd, d 'de' MMMM")
-        self.date_label.setText(current_date.capitalize())
-        current_time = QTime.currentTime().toString("hh:mm:ss")
-        self.time_label.setText(current_time)
+        now = QDateTime.currentDateTime()
+        self.update_date(now.date())
+        self.update_time(now)
+
+    def update_date(self, date):
+        self.date_label.setText(date.toString("dddd, d 'de' MMMM").capitalize())
+
+    def update_time(self, now):
+        # Sin foco el reloj muestra solo los minutos (ver _update_clock_state)
+        self.time_label.setText(now.time().toString("hh:mm:ss" if self._clock_seconds else "hh:mm"))
+
+    def _update_clock_state(self, *args):
+        window = self.windowHandle()
+        visible = (self.isVisible() and window is not None and window.isExposed()
+                   and QApplication.applicationState() not in (Qt.ApplicationHidden, Qt.ApplicationSuspended))
+        if not visible:
+            self.timer_service.release("clock")
+            return
+        # En reposo (sin foco) basta un despertar por minuto; los segundos
+        # vuelven en cuanto el usuario activa la ventana
+        seconds = self.isActiveWindow()
+        changed = seconds != self._clock_seconds
+        self._clock_seconds = seconds
+        self.timer_service.acquire("clock", seconds=seconds)
+        if changed:
+            self.update_time(QDateTime.currentDateTime())
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.ActivationChange:
+            self._update_clock_state()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.windowHandle()
+        if window is not None:
+            # Minimizada, tapada o con la sesión bloqueada deja de estar expuesta
+            window.removeEventFilter(self)
+            window.installEventFilter(self)
+        self._update_clock_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_clock_state()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Expose:
+            self._update_clock_state()
+        return False
 
     # Tareas
     def add_quick_task(self):
@@ -826,9 +835,9 @@ class ProductivityWidget(QWidget):
                 "has_reminder": False,
                 "reminder_time": None
             }
-            self.create_task_widget(task_data)
+            self.persist_task(task_data)
+            self.add_task(task_data)
             self.task_input.clear()
-            # opcional: persistir tareas activas si lo deseas
 
     def show_task_dialog(self):
         task_text = self.task_input.text().strip()
@@ -836,116 +845,64 @@ class ProductivityWidget(QWidget):
         if dialog.exec() == QDialog.Accepted:
             task_data = dialog.get_task_data()
             if task_data["text"]:
-                # Si reminder_time es QDateTime, convertirlo a QDateTime antes de guardarlo en widget
-                self.create_task_widget(task_data)
+                self.persist_task(task_data)
+                self.add_task(task_data)
                 self.task_input.clear()
 
                 if task_data["has_reminder"] and task_data["reminder_time"]:
-                    # Si es QDateTime, convertir a ISO para guardar en alarms
-                    dt = task_data["reminder_time"]
-                    if isinstance(dt, QDateTime):
-                        task_data["reminder_time"] = dt  # keep as QDateTime for local widget
                     self.schedule_alarm(task_data)
 
-    def create_task_widget(self, task_data):
-        # Si tiene recordatorio, crear una alerta (sin checkbox)
-        # Si no tiene recordatorio, crear una tarea normal (con checkbox)
-        
-        if task_data.get("has_reminder"):
-            # Crear alerta (sin checkbox)
-            alert_widget = QLabel(task_data["text"])
-            alert_widget.setWordWrap(True)
-            alert_widget.setObjectName(f"alert_{task_data['color']}")
-            alert_widget.setProperty("class", "alert_item")
-            alert_widget.task_data = task_data
-            
-            # Tooltip con información de la alarma
-            rt = task_data.get("reminder_time")
-            if rt:
-                if isinstance(rt, QDateTime):
-                    r_str = rt.toString("dd/MM/yyyy HH:mm")
-                elif isinstance(rt, str):
-                    try:
-                        dt = QDateTime.fromString(rt, Qt.ISODate)
-                        r_str = dt.toString("dd/MM/yyyy HH:mm") if dt.isValid() else rt
-                    except:
-                        r_str = str(rt)
-                else:
-                    r_str = str(rt)
-                alert_widget.setToolTip(f"Alarma: {r_str}")
-            
-            self.task_list_layout.addWidget(alert_widget)
-        else:
-            # Crear tarea normal (con checkbox)
-            checkbox = QCheckBox(task_data["text"])
-            # Establecer objectName por color para estilos
-            checkbox.setObjectName(f"task_{task_data['color']}")
-            # Aplicar clase CSS para el color
-            checkbox.setProperty("class", f"task_{task_data['color']}")
-            # Guardar datos
-            checkbox.task_data = task_data
-
-            checkbox.toggled.connect(lambda checked, cb=checkbox: self.complete_task(cb, checked))
-            self.task_list_layout.addWidget(checkbox)
-
-        # Reordenar tareas: alertas rojas primero
-        self.reorder_tasks()
-
-    def reorder_tasks(self):
-        """Reordena las tareas: alertas rojas primero, luego otras alertas, luego tareas normales"""
-        # Obtener todos los widgets del layout
-        widgets = []
-        for i in range(self.task_list_layout.count()):
-            item = self.task_list_layout.itemAt(i)
-            if item.widget():
-                widgets.append(item.widget())
-        
-        # Remover todos los widgets del layout
-        for widget in widgets:
-            self.task_list_layout.removeWidget(widget)
-        
-        # Ordenar widgets: primero alertas rojas, luego otras alertas, luego checkboxes
-        def get_widget_priority(widget):
-            if isinstance(widget, QLabel) and hasattr(widget, 'task_data'):
-                # Es una alerta
-                color = widget.task_data.get('color', 'green')
-                if color == 'red':
-                    return 0  # Máxima prioridad
-                else:
-                    return 1  # Alta prioridad
-            else:
-                # Es un checkbox (tarea normal)
-                return 2  # Baja prioridad
-        
-        widgets.sort(key=get_widget_priority)
-        
-        # Agregar widgets ordenados de vuelta al layout
-        for widget in widgets:
-            self.task_list_layout.addWidget(widget)
+    def persist_task(self, task_data):
+        # reminder_time se guarda como ISO string; el "id" llega al hacer flush
+        if isinstance(task_data.get("reminder_time"), QDateTime):
+            task_data["reminder_time"] = task_data["reminder_time"].toString(Qt.ISODate)
+        self.write_behind.add_task(task_data)
+
+    def forget_task(self, task_data):
+        self.write_behind.remove_task(task_data)
+
+    def load_tasks(self):
+        self.io_worker.submit(lambda storage: storage.load_tasks(),
+                              on_done=self._tasks_loaded,
+                              on_error=self._tasks_failed)
+
+    def _tasks_loaded(self, tasks):
+        for task_data in tasks:
+            self.add_task(task_data)
+        self._load_finished()
+
+    def _tasks_failed(self, error):
+        print("Error cargando tareas:", error)
+        self._load_finished()
 
-    def complete_task(self, checkbox, checked):
+    def _load_finished(self):
+        self._pending_loads -= 1
+        if self._pending_loads == 0:
+            self.data_loaded.emit()
+
+    def add_task(self, task_data):
+        # El modelo ubica la tarea con bisect y avisa solo esa fila
+        self.task_model.add_task(task_data)
+
+    def complete_task(self, task_data, checked):
         if checked:
             # Mostrar diálogo de confirmación
             reply = QMessageBox.question(self, 'Confirmar Completado', 
-                                        f'¿Terminaste la tarea: "{checkbox.text()}"?', 
+                                        f'¿Terminaste la tarea: "{task_data.get("text", "")}"?', 
                                         QMessageBox.Yes | QMessageBox.No, 
                                         QMessageBox.No)
             
             if reply == QMessageBox.Yes:
-                task_data = checkbox.task_data
                 current_date = QDate.currentDate().toString("yyyy-MM-dd")
                 self.save_task_to_history(current_date, task_data)
-                QTimer.singleShot(500, lambda: self.remove_task(checkbox))
+                QTimer.singleShot(500, lambda: self.remove_task(task_data))
             else:
-                # Si el usuario dice que no, desmarcar el checkbox
-                checkbox.setChecked(False)
+                # Si el usuario dice que no, desmarcar la tarea
+                self.task_model.set_checked(task_data, False)
 
-    def remove_task(self, checkbox):
-        for i in range(self.task_list_layout.count()):
-            item = self.task_list_layout.itemAt(i)
-            if item.widget() == checkbox:
-                checkbox.deleteLater()
-                break
+    def remove_task(self, task_data):
+        if self.task_model.remove_task(task_data):
+            self.forget_task(task_data)
 
     # Alarmas
     def schedule_alarm(self, task_data):
@@ -963,57 +920,89 @@ class ProductivityWidget(QWidget):
             "color": task_data.get("color", "green"),
             "color_name": task_data.get("color_name", "🟢 Normal"),
             "reminder_time": reminder_iso,
+            "recurrence": task_data.get("recurrence"),
             "created": QDateTime.currentDateTime().toString(Qt.ISODate)
         }
-        if reminder_iso:
-            self.pending_alarms.append(alarm_data)
-            self.save_alarms()
+        if reminder_iso and AlarmScheduler.due_msecs(alarm_data) is not None:
+            self.store_alarm(alarm_data)
             reminder_time = QDateTime.fromString(reminder_iso, Qt.ISODate)
             print(f"Alarma programada: {task_data['text']} para {reminder_time.toString('dd/MM/yyyy hh:mm')}")
         else:
             print("No se pudo programar alarma: reminder_time inválido")
 
-    def check_alarms(self):
-        current_datetime = QDateTime.currentDateTime()
-        for alarm in list(self.pending_alarms):
-            alarm_time = QDateTime.fromString(alarm.get("reminder_time", ""), Qt.ISODate)
-            if not alarm_time.isValid():
+    def fire_alarms(self, alarms):
+        # Todas las alarmas vencidas llegan en la misma pasada
+        now = QDateTime.currentDateTime()
+        late = now.toMSecsSinceEpoch() - self.MISSED_GRACE_MS
+        missed = [a for a in alarms if (AlarmScheduler.due_msecs(a) or late) < late]
+        for alarm in alarms:
+            if any(alarm is m for m in missed):
                 continue
-            if current_datetime >= alarm_time:
-                print(f"🔔 Activando alarma: {alarm['text']}")
-                self.show_alarm_notification(alarm)
-                try:
-                    self.pending_alarms.remove(alarm)
-                except ValueError:
-                    pass
-                break
-        # si cambió la cantidad, guardar
-        if len(self.pending_alarms) != getattr(self, "prev_alarm_count", 0):
-            self.save_alarms()
-            self.prev_alarm_count = len(self.pending_alarms)
+            print(f"🔔 Activando alarma: {alarm['text']}")
+            self.show_alarm_notification(alarm)
+            self.write_behind.remove_alarm(alarm)
+            self.schedule_next_occurrence(alarm, now)
+        if missed:
+            self.catch_up_alarms(missed)
+
+    def catch_up_alarms(self, alarms):
+        """Alarmas vencidas mientras la app estaba cerrada o el equipo dormido"""
+        print(f"⏰ Alarmas perdidas: {len(alarms)}")
+        now = QDateTime.currentDateTime()
+        for alarm in alarms:
+            self.alarm_scheduler.remove(alarm)
+            self.write_behind.remove_alarm(alarm)
+            self.schedule_next_occurrence(alarm, now)
+        # Todas las bajas y próximas ocurrencias van en un solo lote
+        self.write_behind.flush()
+        if self.missed_notification is None:
+            self.missed_notification = MissedAlarmsNotification(self)
+        self.missed_notification.add_alarms(alarms)
+        self.missed_notification.show()
+        self.sound_service.play_once()
+
+    def on_clock_jumped(self, jump_ms):
+        print(f"🕒 El reloj saltó {jump_ms // 1000} s; revisando alarmas")
+        self.alarm_scheduler.reschedule()
+
+    def schedule_next_occurrence(self, alarm, after):
+        """Alarma recurrente: se programa solo la ocurrencia siguiente"""
+        next_alarm = recurrence.next_alarm(alarm, after)
+        if next_alarm is None:
+            return
+        self.store_alarm(next_alarm)
+        # La alerta de la checklist pasa a mostrar la nueva hora
+        task_data = self.task_model.find(lambda t: t.get("has_reminder") and recurrence.same_series(t, alarm))
+        if task_data is not None:
+            self.task_model.remove_task(task_data)
+            self.forget_task(task_data)
+            task_data["reminder_time"] = next_alarm["reminder_time"]
+            self.persist_task(task_data)
+            self.task_model.add_task(task_data)
 
     def show_alarm_notification(self, alarm):
         try:
-            self.alarm_notification = AlarmNotification(alarm, self)
-            self.alarm_notification.show()
-            print("✅ Notificación de alarma mostrada")
+            if self.notifications.show_alarm(alarm):
+                print("✅ Notificación de alarma mostrada")
+            else:
+                print("⏳ Notificación en cola")
         except Exception as e:
             print("❌ Error mostrando notificación:", e)
 
     def save_snoozed_alarm(self, alarm_data):
         # Se espera alarm_data.reminder_time en ISO string
-        self.pending_alarms.append(alarm_data)
-        self.save_alarms()
+        self.store_alarm(alarm_data)
 
     def complete_alarm_task(self, alarm_data):
-        # Buscar widget correspondiente y eliminarlo
-        for i in range(self.task_list_layout.count()):
-            item = self.task_list_layout.itemAt(i)
-            widget = item.widget()
-            if (isinstance(widget, QLabel) and hasattr(widget, "task_data") and
-                widget.task_data.get("text") == alarm_data.get("text")):
-                widget.deleteLater()
-                break
+        # Buscar la alerta correspondiente y eliminarla (si se repite, queda
+        # en la lista con su próxima ocurrencia y no se busca)
+        task_data = None
+        if not alarm_data.get("recurrence"):
+            task_data = self.task_model.find(
+                lambda t: t.get("has_reminder") and not t.get("recurrence") and t.get("text") == alarm_data.get("text"))
+        if task_data is not None:
+            self.task_model.remove_task(task_data)
+            self.forget_task(task_data)
         # Guardar al historial
         current_date = QDate.currentDate().toString("yyyy-MM-dd")
         self.save_task_to_history(current_date, {
@@ -1022,108 +1011,70 @@ class ProductivityWidget(QWidget):
             "color_name": alarm_data.get("color_name", "🟢 Normal")
         })
 
-    def save_alarms(self):
-        try:
-            with open(self.alarms_file, "w", encoding="utf-8") as f:
-                json.dump(self.pending_alarms, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print("Error guardando alarmas:", e)
+    def store_alarm(self, alarm_data):
+        self.write_behind.add_alarm(alarm_data)
+        self.alarm_scheduler.add(alarm_data)
+        self.sound_service.preload()
 
     def load_alarms(self):
-        if not os.path.exists(self.alarms_file):
-            self.pending_alarms = []
-            self.prev_alarm_count = 0
-            return
-        try:
-            with open(self.alarms_file, "r", encoding="utf-8") as f:
-                self.pending_alarms = json.load(f)
-            self.prev_alarm_count = len(self.pending_alarms)
-            # Filtrar alarmas pasadas
-            current_datetime = QDateTime.currentDateTime()
-            self.pending_alarms = [
-                alarm for alarm in self.pending_alarms
-                if QDateTime.fromString(alarm.get("reminder_time", ""), Qt.ISODate) > current_datetime
-            ]
-        except Exception as e:
-            print("Error cargando alarmas:", e)
-            self.pending_alarms = []
-            self.prev_alarm_count = 0
+        self.io_worker.submit(lambda storage: storage.load_alarms(),
+                              on_done=self._alarms_loaded,
+                              on_error=self._alarms_failed)
+
+    def _alarms_failed(self, error):
+        print("Error cargando alarmas:", error)
+        self._load_finished()
+
+    def _alarms_loaded(self, alarms):
+        self.alarm_scheduler.clear()
+        # Las vencidas (app cerrada) van al resumen; cada reminder_time se parsea una sola vez
+        now = QDateTime.currentMSecsSinceEpoch()
+        missed = []
+        for alarm in alarms:
+            due = AlarmScheduler.due_msecs(alarm)
+            if due is not None and due > now:
+                self.alarm_scheduler.add(alarm)
+            elif due is None:
+                self.write_behind.remove_alarm(alarm)
+            else:
+                missed.append(alarm)
+        if missed:
+            self.catch_up_alarms(missed)
+        if len(self.alarm_scheduler):
+            self.sound_service.preload()
+        self._load_finished()
 
     # Historial
     def save_task_to_history(self, date_str, task_data):
-        data = {}
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
-        if date_str not in data:
-            data[date_str] = []
-        data[date_str].append({
+        entry = {
             "text": task_data.get("text"),
             "color": task_data.get("color", "green"),
             "color_name": task_data.get("color_name", "🟢 Normal"),
             "completed": QDateTime.currentDateTime().toString(Qt.ISODate)
-        })
-        try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print("Error guardando historial:", e)
+        }
+        # El modelo se actualiza cuando la escritura terminó, ya con su id
+        self.io_worker.submit(lambda storage: storage.add_history(date_str, entry),
+                              on_done=lambda stored: self.history_stored(date_str, stored),
+                              on_error=lambda e: print("Error guardando historial:", e))
+
+    def history_stored(self, date_str, stored):
+        self.history_model.add_entry(date_str, stored)
+        self.search_model.add_entry(date_str, stored)
+
+    def search_history(self):
+        query = self.history_search.text().strip()
+        # Con texto se muestran los resultados en lugar de los días
+        self.search_view.setVisible(bool(query))
+        self.history_view.setVisible(not query)
+        self.search_model.search(query)
 
     def load_history(self):
-        # limpiar
-        for i in reversed(range(self.history_list_layout.count())):
-            widget = self.history_list_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-        if not os.path.exists(self.history_file):
-            return
-        try:
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError:
-            return
-        for date_str in sorted(data.keys(), reverse=True):
-            date_label = QLabel(f"📅 {QDate.fromString(date_str, 'yyyy-MM-dd').toString('d MMMM yyyy')}")
-            date_label.setStyleSheet("font-weight: bold; color: #66CCFF; margin-top: 10px;")
-            date_label.setCursor(Qt.PointingHandCursor)
-            self.history_list_layout.addWidget(date_label)
-
-            tasks_widget = QWidget()
-            tasks_layout = QVBoxLayout()
-            tasks_layout.setContentsMargins(15, 0, 0, 0)
-
-            for task_data in data[date_str]:
-                if isinstance(task_data, str):
-                    task_text = task_data
-                    color = "green"
-                    color_name = "🟢"
-                else:
-                    task_text = task_data.get("text", "")
-                    color = task_data.get("color", "green")
-                    color_name = task_data.get("color_name", "🟢")
-                t = QLabel(f"{color_name} {task_text}")
-                t.setObjectName("history_item")
-                if color == "red":
-                    t.setStyleSheet("color: #FFB6C1; text-decoration: line-through; font-size: 13px; padding: 2px 8px;")
-                elif color == "yellow":
-                    t.setStyleSheet("color: #FFFFE0; text-decoration: line-through; font-size: 13px; padding: 2px 8px;")
-                elif color == "blue":
-                    t.setStyleSheet("color: #ADD8E6; text-decoration: line-through; font-size: 13px; padding: 2px 8px;")
-                else:
-                    t.setStyleSheet("color: #90EE90; text-decoration: line-through; font-size: 13px; padding: 2px 8px;")
-                tasks_layout.addWidget(t)
-
-            tasks_widget.setLayout(tasks_layout)
-            tasks_widget.setVisible(False)
-            self.history_list_layout.addWidget(tasks_widget)
-
-            def toggle_tasks(event, widget=tasks_widget):
-                widget.setVisible(not widget.isVisible())
-
-            date_label.mousePressEvent = lambda e, w=tasks_widget: toggle_tasks(e, w)
+        # Si nada cambió desde otro proceso, el modelo en memoria ya está al día
+        self.history_model.refresh()
+
+    def toggle_history_day(self, index):
+        if not index.parent().isValid():
+            self.history_view.setExpanded(index, not self.history_view.isExpanded(index))
 
     # Interfaz historial
     def toggle_history(self, checked):
@@ -1141,6 +1092,11 @@ class ProductivityWidget(QWidget):
                 self.setFixedSize(260, 120)
             self.history_toggle_button.setText("Historial (...")
 
+    def shutdown(self):
+        # Al salir se escribe lo pendiente y se espera al hilo de E/S
+        self.write_behind.flush(final=True)
+        self.io_worker.shutdown()
+
     # Movimiento
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -1174,16 +1130,74 @@ class ProductivityWidget(QWidget):
             event.accept()
 
 
+# --------------------------
+# Perfil de arranque
+# --------------------------
+class StartupProfile(QObject):
+    """Tiempos por fase hasta la primera pintura (--startup-profile).
+
+    Imprime la tabla y cierra la aplicación, para poder medir desde scripts.
+    Espera también a que carguen tareas y alarmas: cerrar con esas lecturas
+    en curso dejaría sus resultados llegando después de shutdown().
+    """
+
+    def __init__(self, started):
+        super().__init__()
+        self.marks = [("inicio", started)]
+        self._waiting = {"primera pintura", "datos cargados"}
+
+    def mark(self, name, when=None):
+        self.marks.append((name, when if when is not None else time.perf_counter()))
+
+    def watch(self, widget):
+        widget.installEventFilter(self)
+        widget.data_loaded.connect(lambda: self._done("datos cargados"))
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Tras el Paint, el siguiente ciclo del loop ya volcó el frame
+            QTimer.singleShot(0, lambda: self._done("primera pintura"))
+        return False
+
+    def _done(self, name):
+        self.mark(name)
+        self._waiting.discard(name)
+        if not self._waiting:
+            self.report()
+            QApplication.quit()
+
+    def report(self):
+        print("⏱️ Perfil de arranque")
+        for (_, previous), (name, when) in zip(self.marks, self.marks[1:]):
+            print(f"   {name:<22}{(when - previous) * 1000:8.1f} ms")
+        print(f"   {'total':<22}{(self.marks[-1][1] - self.marks[0][1]) * 1000:8.1f} ms")
+
+
 # --------------------------
 # Ejecutar aplicación
 # --------------------------
 if __name__ == "__main__":
+    profile = None
+    if "--startup-profile" in sys.argv:
+        sys.argv.remove("--startup-profile")
+        profile = StartupProfile(_STARTED)
+        profile.mark("imports", _IMPORTED)
+
     app = QApplication(sys.argv)
     font = QFont()
     font.setPointSize(QApplication.font().pointSize())
     app.setFont(font)
+    # Una sola hoja de estilos para toda la aplicación
+    theme.apply(app)
+    if profile:
+        profile.mark("QApplication y tema")
 
     widget = ProductivityWidget()
+    if profile:
+        profile.mark("construcción del widget")
+        profile.watch(widget)
     widget.show()
+    app.aboutToQuit.connect(widget.shutdown)
 
     sys.exit(app.exec())
\ No newline at end of file
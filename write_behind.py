@@ -0,0 +1,153 @@
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer
+
+from storage import iso_to_msecs
+
+
+def _resolve(removes):
+    # Una baja puede ser la copia enviada en un lote anterior: el hilo de E/S
+    # corre en orden, así que ese lote ya le asignó su id
+    ids = [r.get("id") if isinstance(r, dict) else r for r in removes]
+    return [i for i in ids if i is not None]
+
+
+def _apply_batch(storage, add_tasks, remove_tasks, add_alarms, remove_alarms):
+    # Corre en el hilo de E/S sobre copias; devuelve los ids asignados
+    storage.apply_batch(add_tasks=add_tasks, remove_tasks=_resolve(remove_tasks),
+                        add_alarms=add_alarms, remove_alarms=_resolve(remove_alarms))
+    return [t.get("id") for t in add_tasks], [a.get("id") for a in add_alarms]
+
+
+# --------------------------
+# Escritura diferida
+# --------------------------
+class WriteBehind(QObject):
+    """Agrupa los cambios de tareas activas y alarmas en una sola escritura.
+
+    Cada cambio re-arma un debounce corto; una ráfaga (por ejemplo agregar 500
+    tareas) termina en un único apply_batch del almacenamiento, que se ejecuta
+    en el hilo de E/S. Una tarea que se agrega y se borra antes del flush nunca
+    llega al disco.
+    """
+    DEBOUNCE_MS = 300
+    MAX_DELAY_MS = 2000
+
+    def __init__(self, io_worker, parent=None):
+        super().__init__(parent)
+        self.io_worker = io_worker
+        self._adds = {"tasks": {}, "alarms": {}}      # id(obj) -> obj
+        self._removes = {"tasks": [], "alarms": []}   # ids ya guardados
+        # Lotes enviados al hilo de E/S cuyos ids todavía no llegaron: cada uno
+        # {"tasks": {id(obj): (obj, copia)}, "alarms": {...}, "removed": {id(obj)}}
+        self._inflight = []
+        self._closed = False
+        self._since_first = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def add_task(self, task):
+        self._add("tasks", task)
+
+    def remove_task(self, task):
+        self._remove("tasks", task)
+
+    def add_alarm(self, alarm):
+        """False si la alarma no tiene hora válida: el almacenamiento
+        rechazaría el lote entero, así que ni se encola"""
+        if iso_to_msecs(alarm.get("reminder_time")) is None:
+            print("⚠️ Alarma sin hora válida, no se guarda:", alarm.get("text"))
+            return False
+        self._add("alarms", alarm)
+        return True
+
+    def remove_alarm(self, alarm):
+        self._remove("alarms", alarm)
+
+    def has_pending(self):
+        return any(self._adds.values()) or any(self._removes.values())
+
+    def _add(self, kind, obj):
+        self._adds[kind][id(obj)] = obj
+        self._schedule()
+
+    def _remove(self, kind, obj):
+        if self._adds[kind].pop(id(obj), None) is not None:
+            return
+        for batch in self._inflight:
+            if id(obj) in batch[kind]:
+                # Se borra cuando el lote en curso le asigne su id
+                batch["removed"].add(id(obj))
+                return
+        if obj.get("id") is not None:
+            self._removes[kind].append(obj["id"])
+            self._schedule()
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._since_first.start()
+        # Se pospone con cada cambio, pero sin pasar de MAX_DELAY_MS
+        remaining = self.MAX_DELAY_MS - self._since_first.elapsed()
+        self._timer.start(max(0, min(self.DEBOUNCE_MS, remaining)))
+
+    def flush(self, final=False):
+        """final=True al salir: se envía todo aunque haya un lote en curso.
+        Después de la escritura final no se envía nada más."""
+        self._timer.stop()
+        if self._closed:
+            return
+        if final:
+            self._closed = True
+        removes = self._removes
+        if self._inflight and final:
+            # Se encadena detrás del lote en curso: lo borrado mientras tanto
+            # viaja como la copia enviada, que ese lote ya tendrá con su id
+            for batch in self._inflight:
+                for kind in ("tasks", "alarms"):
+                    removes[kind] += [batch[kind][key][1] for key in batch["removed"] if key in batch[kind]]
+                batch["removed"].clear()
+        elif self._inflight:
+            # Un lote a la vez: los ids del anterior hacen falta para borrar
+            if self.has_pending():
+                self._timer.start(self.DEBOUNCE_MS)
+            return
+        if not any(self._adds.values()) and not any(removes.values()):
+            return
+        batch = {kind: {key: (obj, dict(obj)) for key, obj in objs.items()} for kind, objs in self._adds.items()}
+        batch["removed"] = set()
+        self._inflight.append(batch)
+        self._adds = {"tasks": {}, "alarms": {}}
+        self._removes = {"tasks": [], "alarms": []}
+        self.io_worker.submit(
+            _apply_batch,
+            [copy for _, copy in batch["tasks"].values()],
+            removes["tasks"],
+            [copy for _, copy in batch["alarms"].values()],
+            removes["alarms"],
+            on_done=lambda ids: self._batch_done(batch, ids),
+            on_error=lambda e: self._batch_failed(batch, e, removes),
+        )
+
+    def _batch_done(self, batch, ids):
+        task_ids, alarm_ids = ids
+        self._inflight.remove(batch)
+        for kind, new_ids in (("tasks", task_ids), ("alarms", alarm_ids)):
+            for (obj, _), new_id in zip(batch[kind].values(), new_ids):
+                obj["id"] = new_id
+                if id(obj) in batch["removed"] and new_id is not None:
+                    self._removes[kind].append(new_id)
+        if self.has_pending() and not self._closed:
+            self._schedule()
+
+    def _batch_failed(self, batch, error, removes):
+        # Se conservan los cambios y se reintenta más tarde
+        print("Error guardando tareas y alarmas:", error)
+        self._inflight.remove(batch)
+        for kind in ("tasks", "alarms"):
+            for key, (obj, _) in batch[kind].items():
+                if key not in batch["removed"]:
+                    self._adds[kind].setdefault(key, obj)
+            self._removes[kind] = removes[kind] + self._removes[kind]
+        if self._closed:
+            return
+        self._since_first.start()
+        self._timer.start(self.MAX_DELAY_MS)